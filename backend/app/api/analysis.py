@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from app.api.responses import RawJSONResponse
+from app.schemas.analysis import ANALYSIS_ADAPTER, AnalysisRequest, AnalysisResponse
+from app.services.analysis_service import analyze_batch
+
+router = APIRouter(prefix="/analysis", tags=["analysis"])
+
+
+@router.post("", response_model=AnalysisResponse, response_class=RawJSONResponse)
+async def analyze(payload: AnalysisRequest) -> RawJSONResponse:
+    """Perfect-play value of every legal move, for up to 10k boards per call."""
+    return RawJSONResponse(ANALYSIS_ADAPTER.dump_json(analyze_batch(payload.positions, payload.to_move)))
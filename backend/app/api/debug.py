@@ -0,0 +1,96 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.api.deps import get_container
+from app.container import Container
+
+profiles_router = APIRouter(prefix="/debug", tags=["debug"])
+traces_router = APIRouter(prefix="/debug", tags=["debug"])
+memory_router = APIRouter(prefix="/debug/memory", tags=["debug"])
+
+
+@profiles_router.get("/profiles")
+async def list_profiles(
+    container: Container = Depends(get_container),
+    limit: int = Query(default=20, ge=1, le=200),
+    path: Optional[str] = Query(default=None, description="only requests whose path starts with this"),
+) -> List[Dict[str, Any]]:
+    """Slowest recently profiled requests, with their hottest frames."""
+    return [r.as_dict() for r in container.profiles.slowest(limit, path)]
+
+
+@profiles_router.get("/profiles/{profile_id}", response_class=FileResponse)
+async def download_profile(profile_id: str, container: Container = Depends(get_container)) -> FileResponse:
+    """Folded stacks of one profile, for flamegraph.pl or speedscope."""
+    record = container.profiles.get(profile_id)
+    if record is None or not record.file:
+        raise HTTPException(status_code=404, detail="profile_not_found")
+    return FileResponse(record.file, media_type="text/plain", filename=f"{profile_id}.folded")
+
+
+@traces_router.get("/traces")
+async def list_traces(
+    container: Container = Depends(get_container),
+    limit: int = Query(default=20, ge=1, le=200),
+    min_duration_ms: float = Query(default=0.0, ge=0),
+    path: Optional[str] = Query(default=None, description="only requests whose path starts with this"),
+) -> List[Dict[str, Any]]:
+    """Most recent traced requests, newest first."""
+    return [t.summary() for t in container.traces.recent(limit, min_duration_ms, path)]
+
+
+@traces_router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, container: Container = Depends(get_container)) -> Dict[str, Any]:
+    """One trace as a tree of spans, with times in ms from the start of the request."""
+    trace = container.traces.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="trace_not_found")
+    return trace.tree()
+
+
+# Memory endpoints are sync: snapshots and gc walks block for up to seconds
+# and must stay off the event loop.
+@memory_router.get("")
+def memory_report(
+    container: Container = Depends(get_container),
+    top_types: int = Query(default=20, ge=1, le=200),
+) -> Dict[str, Any]:
+    """Process RSS/PSS, GC state, most common object types and sizes of the app's own structures."""
+    return container.memory.report(top_types)
+
+
+@memory_router.post("/tracemalloc/start")
+def start_tracemalloc(
+    container: Container = Depends(get_container),
+    frames: Optional[int] = Query(default=None, ge=1, le=64, description="frames per allocation (TRACEMALLOC_FRAMES)"),
+) -> Dict[str, Any]:
+    """Start tracemalloc if needed and take the baseline that /diff compares against."""
+    return container.memory.start(frames)
+
+
+@memory_router.post("/tracemalloc/stop")
+def stop_tracemalloc(container: Container = Depends(get_container)) -> Dict[str, Any]:
+    return container.memory.stop()
+
+
+@memory_router.post("/baseline")
+def reset_baseline(container: Container = Depends(get_container)) -> Dict[str, Any]:
+    try:
+        return container.memory.reset_baseline()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@memory_router.get("/diff")
+def memory_diff(
+    container: Container = Depends(get_container),
+    group_by: Literal["filename", "lineno", "traceback"] = Query(default="lineno"),
+    limit: int = Query(default=25, ge=1, le=500),
+) -> Dict[str, Any]:
+    """Allocation sites that grew the most since the baseline."""
+    try:
+        return container.memory.diff(group_by, limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
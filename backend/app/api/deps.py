@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from fastapi import Depends, Request
+
+from app.container import Container
+from app.core.deadline import Deadline
+from app.services.game_service import GameService
+from app.services.stats_service import StatsService
+
+
+def get_container(request: Request) -> Container:
+    return request.app.state.container
+
+
+def get_deadline(request: Request) -> Optional[Deadline]:
+    """The request's deadline (see DeadlineMiddleware), checked on the way in.
+
+    Sync dependencies run once a threadpool worker is free, so a request
+    that waited out its budget in the queue stops here, before a session is
+    opened.
+    """
+    deadline = getattr(request.state, "deadline", None)
+    if deadline is not None:
+        deadline.check("queued")
+    return deadline
+
+
+def maybe_session(container: Container = Depends(get_container), deadline: Optional[Deadline] = Depends(get_deadline)):
+    if not container.use_db:
+        # DB disabled; no session
+        yield None
+        return
+    # Import only when DB is enabled to avoid hard dependency when not used
+    from app.db.session import get_session
+    # Delegate lifecycle to get_session generator
+    yield from get_session(container.session_factory, container.pool_metrics, deadline)
+
+
+def maybe_read_session(container: Container = Depends(get_container), deadline: Optional[Deadline] = Depends(get_deadline)):
+    if not container.use_db:
+        yield None
+        return
+    from app.db.session import get_read_session
+
+    yield from get_read_session(container.session_factory, container.pool_metrics, deadline)
+
+
+def _service_for(container: Container, db: Any) -> GameService:
+    if db is not None:
+        # Dynamic import to avoid top-level dependency
+        from app.repositories.sqlalchemy import SQLAlchemyGameRepository
+
+        repo = SQLAlchemyGameRepository(db)
+        return GameService(
+            repo,
+            gemini_api_key=container.settings.gemini_api_key,
+            gemini_model=container.settings.gemini_model,
+            gemini_limits=container.gemini_limits,
+            book_path=container.settings.ai_book_path,
+            executor=container.strategy_executor,
+            ultimate_budget_s=container.settings.ultimate_budget_ms / 1000.0,
+            ultimate_workers=container.settings.ultimate_search_workers,
+        )
+    return container.memory_service
+
+
+def get_service(
+    container: Container = Depends(get_container),
+    db: Any = Depends(maybe_session),
+    deadline: Optional[Deadline] = Depends(get_deadline),
+) -> GameService:
+    return _service_for(container, db).with_deadline(deadline)
+
+
+def get_read_service(
+    container: Container = Depends(get_container),
+    db: Any = Depends(maybe_read_session),
+    deadline: Optional[Deadline] = Depends(get_deadline),
+) -> GameService:
+    """GameService for read-only endpoints; its session never commits."""
+    return _service_for(container, db).with_deadline(deadline)
+
+
+def get_stats_service(
+    container: Container = Depends(get_container),
+    db: Any = Depends(maybe_read_session),
+) -> StatsService:
+    if db is not None:
+        from app.repositories.sqlalchemy import SQLAlchemyStatsRepository
+
+        return StatsService(SQLAlchemyStatsRepository(db))
+    return StatsService(container.memory_repo.stats)
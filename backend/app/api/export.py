@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_container
+from app.container import Container
+from app.domain.enums import Difficulty, GameStatus
+from app.services.export import (
+    ExportFilter,
+    gzip_chunks,
+    iter_db_payloads,
+    iter_game_payloads,
+    ndjson_chunks,
+)
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+
+def _db_chunks(container: Container, flt: ExportFilter) -> Iterator[bytes]:
+    # Own session: the response streams after request dependencies have exited.
+    # Never committed; closing it ends the read transaction.
+    with container.session_factory() as db:
+        yield from ndjson_chunks(iter_db_payloads(db, flt))
+
+
+@router.get("/games", response_class=StreamingResponse)
+async def export_games(
+    container: Container = Depends(get_container),
+    status: Optional[List[GameStatus]] = Query(default=None),
+    difficulty: Optional[List[Difficulty]] = Query(default=None),
+    created_from: Optional[datetime] = Query(default=None, description="inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(default=None, description="exclusive upper bound on created_at"),
+    include_archived: bool = Query(default=True),
+    gzip: bool = Query(default=False),
+) -> StreamingResponse:
+    """Stream games as NDJSON, one GameRead object per line, in constant memory."""
+    flt = ExportFilter(
+        statuses=tuple(s.value for s in status or ()),
+        difficulties=tuple(d.value for d in difficulty or ()),
+        created_from=created_from,
+        created_to=created_to,
+        include_archived=include_archived,
+    )
+    if container.use_db:
+        chunks = _db_chunks(container, flt)
+    else:
+        chunks = ndjson_chunks(iter_game_payloads(container.memory_repo.values(), flt))
+
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": 'attachment; filename="games.ndjson.gz"'},
+        )
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
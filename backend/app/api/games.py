@@ -1,68 +1,124 @@
 from __future__ import annotations
 
+import base64
+import binascii
+import json
 import logging
-from typing import Any
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 
+from app.api.responses import RawJSONResponse
+from app.core.deadline import DeadlineExceeded
+from app.core.tracing import span, traced
 from app.schemas.errors import ErrorResponse
 from app.schemas.game import (
     CreateGameRequest,
     CreateGameResponse,
+    GamePage,
     MoveRequest,
     MoveResponse,
 )
+from app.schemas.serializers import dump_game, dump_move, dump_page, summary_payload
 from app.services.game_service import GameService
-from app.repositories.memory import InMemoryGameRepository
-from app.core.settings import Settings
+from app.api.deps import get_read_service, get_service
+from app.domain.enums import Difficulty, GameStatus
 from app.domain.exceptions import GameOverError, InvalidMoveError
+from app.domain.game import as_utc
+from app.repositories.base import GameListQuery, PageKey
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/games", tags=["games"])
 
-_settings = Settings.from_env()
-_memory_repo = InMemoryGameRepository()
-_memory_service = GameService(
-    _memory_repo,
-    gemini_api_key=_settings.gemini_api_key,
-    gemini_model=_settings.gemini_model,
-)
-_use_db = bool(_settings.database_url)
-
-def maybe_session():
-    if not _use_db:
-        # DB disabled; no session
-        yield None
-        return
-    # Import only when DB is enabled to avoid hard dependency when not used
-    from app.db.session import get_session
-    # Delegate lifecycle to get_session generator
-    yield from get_session()
-
-
-def get_service(db: Any = Depends(maybe_session)) -> GameService:
-    if _use_db and db is not None:
-        # Dynamic import to avoid top-level dependency
-        from app.repositories.sqlalchemy import SQLAlchemyGameRepository
-
-        repo = SQLAlchemyGameRepository(db)
-        return GameService(
-            repo,
-            gemini_api_key=_settings.gemini_api_key,
-            gemini_model=_settings.gemini_model,
-        )
-    return _memory_service
+
+def game_etag(game_id: str, updated_at: datetime) -> str:
+    # Every state change bumps updated_at, so (id, updated_at) identifies a representation
+    return f'"{game_id}.{int(updated_at.timestamp() * 1_000_000)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+# Clients must revalidate with If-None-Match before reusing a cached copy
+_CACHE_HEADERS = {"Cache-Control": "no-cache"}
 
 
-@router.post("", response_model=CreateGameResponse, responses={400: {"model": ErrorResponse}})
-async def create_game(payload: CreateGameRequest, svc: GameService = Depends(get_service)) -> CreateGameResponse:
+def encode_cursor(key: PageKey) -> str:
+    raw = json.dumps([key[0].isoformat(), key[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> PageKey:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, game_id = json.loads(raw)
+        return as_utc(datetime.fromisoformat(created_at)), str(game_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="invalid_cursor")
+
+
+@router.get("", response_model=GamePage, response_class=RawJSONResponse, responses={400: {"model": ErrorResponse}})
+@traced("api.list_games")
+def list_games(
+    svc: GameService = Depends(get_read_service),
+    status_: Optional[List[GameStatus]] = Query(default=None, alias="status"),
+    difficulty: Optional[List[Difficulty]] = Query(default=None),
+    created_from: Optional[datetime] = Query(default=None, description="inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(default=None, description="exclusive upper bound on created_at"),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+) -> RawJSONResponse:
+    """List games newest first with keyset pagination on (created_at, id).
+
+    Sync, so the keyset query runs in the threadpool rather than on the
+    event loop.
+    """
+    query = GameListQuery(
+        statuses=tuple(s.value for s in status_ or ()),
+        difficulties=tuple(d.value for d in difficulty or ()),
+        created_from=created_from,
+        created_to=created_to,
+    )
+    after = decode_cursor(cursor) if cursor else None
+    # One extra row tells whether another page exists without a COUNT
+    rows = svc.list_games(query, after, limit + 1)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor((rows[-1].created_at, rows[-1].id))
+    with span("api.serialize"):
+        body = dump_page([summary_payload(r) for r in rows], next_cursor)
+    return RawJSONResponse(body)
+
+
+def _raise_if_expired(svc: GameService, exc: Exception) -> None:
+    # A statement cancelled by the deadline's statement_timeout surfaces as a DB error
+    if svc.deadline is not None and svc.deadline.expired:
+        raise DeadlineExceeded("db") from exc
+
+
+# create_game and post_move are sync so FastAPI runs them in the threadpool:
+# choosing an AI move can block on Gemini for up to GEMINI_TIMEOUT_S, which
+# must not stall the event loop for every other request.
+@router.post("", response_model=CreateGameResponse, response_class=RawJSONResponse, responses={400: {"model": ErrorResponse}, 504: {"model": ErrorResponse}})
+@traced("api.create_game")
+def create_game(payload: CreateGameRequest, svc: GameService = Depends(get_service)) -> RawJSONResponse:
     try:
         first_is_human = payload.first_player == "human"
         game = svc.create_game(
             difficulty=payload.difficulty,
             first_player_is_human=first_is_human,
             human_symbol=payload.human_symbol,
+            mode=payload.mode,
         )
         logger.info(
             "create_game_ok",
@@ -71,72 +127,68 @@ async def create_game(payload: CreateGameRequest, svc: GameService = Depends(get
                 "difficulty": game.difficulty.value,
                 "first_player": payload.first_player,
                 "human_symbol": payload.human_symbol.value,
+                "mode": game.mode.value,
             },
         )
-        return CreateGameResponse(
-            id=game.id,
-            board=game.board.to_string(),
-            next_player=game.next_player,
-            difficulty=game.difficulty,
-            status=game.status,
-            human_symbol=game.human_symbol,
-            computer_symbol=game.computer_symbol,
-            moves=game.moves,
-            created_at=game.created_at,
-            updated_at=game.updated_at,
-        )
+        with span("api.serialize"):
+            body = dump_game(game)
+        return RawJSONResponse(body)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
+        _raise_if_expired(svc, e)
         logger.exception("create_game_failed")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.get("/{game_id}", response_model=CreateGameResponse, responses={404: {"model": ErrorResponse}})
-async def get_game(game_id: str, svc: GameService = Depends(get_service)) -> CreateGameResponse:
+@router.get("/{game_id}", response_model=CreateGameResponse, response_class=RawJSONResponse, responses={304: {"description": "Not Modified"}, 404: {"model": ErrorResponse}})
+@traced("api.get_game")
+async def get_game(
+    game_id: str,
+    svc: GameService = Depends(get_read_service),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    if if_none_match:
+        # Cheap version probe first; only materialize the game when the client copy is stale
+        version = svc.get_game_version(game_id)
+        if version is not None:
+            etag = game_etag(game_id, version)
+            if etag_matches(if_none_match, etag):
+                logger.debug("get_game_not_modified", extra={"game_id": game_id})
+                return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, **_CACHE_HEADERS})
     game = svc.get_game(game_id)
     if not game:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="game_not_found")
     logger.debug("get_game_ok", extra={"game_id": game_id, "status": game.status.value})
-    return CreateGameResponse(
-        id=game.id,
-        board=game.board.to_string(),
-        next_player=game.next_player,
-        difficulty=game.difficulty,
-        status=game.status,
-        human_symbol=game.human_symbol,
-        computer_symbol=game.computer_symbol,
-        moves=game.moves,
-        created_at=game.created_at,
-        updated_at=game.updated_at,
+    with span("api.serialize"):
+        body = dump_game(game)
+    return RawJSONResponse(
+        body,
+        headers={"ETag": game_etag(game.id, game.updated_at), **_CACHE_HEADERS},
     )
 
 
-@router.post("/{game_id}/moves", response_model=MoveResponse, responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}})
-async def post_move(game_id: str, payload: MoveRequest, svc: GameService = Depends(get_service)) -> MoveResponse:
+@router.post("/{game_id}/moves", response_model=MoveResponse, response_class=RawJSONResponse, responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}, 504: {"model": ErrorResponse}})
+@traced("api.post_move")
+def post_move(game_id: str, payload: MoveRequest, svc: GameService = Depends(get_service)) -> RawJSONResponse:
     try:
-        game, ai_move = svc.play_human_move(game_id, payload.position)
+        game, ai_move = svc.play_human_move(game_id, payload.position, payload.board)
         logger.info(
             "human_move_ok",
-            extra={"game_id": game_id, "human_pos": payload.position, "ai_pos": ai_move},
-        )
-        return MoveResponse(
-            id=game.id,
-            board=game.board.to_string(),
-            next_player=game.next_player,
-            difficulty=game.difficulty,
-            status=game.status,
-            human_symbol=game.human_symbol,
-            computer_symbol=game.computer_symbol,
-            moves=game.moves,
-            created_at=game.created_at,
-            updated_at=game.updated_at,
-            ai_move=ai_move,
+            extra={"game_id": game_id, "human_board": payload.board, "human_pos": payload.position, "ai_pos": ai_move},
         )
+        with span("api.serialize"):
+            body = dump_move(game, ai_move)
+        return RawJSONResponse(body)
     except KeyError:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="game_not_found")
     except GameOverError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except InvalidMoveError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except DeadlineExceeded:
+        raise
     except Exception as e:
+        _raise_if_expired(svc, e)
         logger.exception("post_move_failed")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
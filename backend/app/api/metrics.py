@@ -0,0 +1,13 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_container
+from app.container import Container
+
+router = APIRouter()
+
+
+@router.get("/metrics", tags=["metrics"])
+async def metrics(container: Container = Depends(get_container)) -> Dict[str, Any]:
+    return container.metrics.collect()
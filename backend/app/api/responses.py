@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from starlette.responses import Response
+
+
+class RawJSONResponse(Response):
+    """JSON response for bodies that are already encoded to bytes.
+
+    Endpoints return it with the output of app.schemas.serializers so FastAPI
+    skips response_model validation and the generic jsonable_encoder path.
+    """
+
+    media_type = "application/json"
@@ -1,9 +1,17 @@
 from fastapi import APIRouter
 
 from app.api.health import router as health_router
+from app.api.analysis import router as analysis_router
+from app.api.export import router as export_router
 from app.api.games import router as games_router
+from app.api.metrics import router as metrics_router
+from app.api.stats import router as stats_router
 
 
 api_router = APIRouter()
 api_router.include_router(health_router)
 api_router.include_router(games_router)
+api_router.include_router(metrics_router)
+api_router.include_router(stats_router)
+api_router.include_router(export_router)
+api_router.include_router(analysis_router)
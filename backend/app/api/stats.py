@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_stats_service
+from app.schemas.stats import StatsResponse
+from app.services.stats_service import StatsService
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+# Sync: the summary queries the database, which must not block the event loop
+@router.get("", response_model=StatsResponse)
+def get_stats(svc: StatsService = Depends(get_stats_service)) -> Dict[str, Any]:
+    return svc.summary()
@@ -0,0 +1,180 @@
+"""Move finished games older than N days from games into games_archive.
+
+Works in bounded batches, each in its own short transaction, so row locks
+are held for one batch only and live traffic is never blocked for long:
+
+    uv run python -m app.cli.archive_games --older-than-days 30 --batch-size 1000
+
+Schedule it (cron, k8s CronJob) to keep the hot table, its indexes and vacuum
+work proportional to recent traffic instead of total history.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.logging import configure_logging
+from app.core.settings import get_settings
+from app.db.models import GameArchiveModel, GameModel
+from app.db.session import build_engine, build_session_factory
+from app.domain.enums import GameMode, GameStatus
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = [s.value for s in GameStatus if s != GameStatus.IN_PROGRESS]
+
+
+def _archivable(cutoff: datetime):
+    return (
+        GameModel.status.in_(FINISHED_STATUSES),
+        GameModel.updated_at < cutoff,
+        # games_archive holds 9-cell boards; ultimate games stay in the hot table
+        GameModel.mode == GameMode.CLASSIC.value,
+    )
+
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    relkind = db.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass('games_archive')")
+    ).scalar_one_or_none()
+    return relkind == "p"
+
+
+def _month_start(ts: datetime) -> datetime:
+    return ts.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(ts: datetime) -> datetime:
+    return (ts + timedelta(days=32)).replace(day=1)
+
+
+def ensure_partitions(db: Session, first: datetime, last: datetime) -> None:
+    """Create monthly games_archive partitions covering [first, last]."""
+    month = _month_start(first)
+    while month <= last:
+        upper = _next_month(month)
+        name = f"games_archive_p{month:%Y%m}"
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF games_archive "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+        month = upper
+
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int, *, partitioned: bool = False) -> int:
+    """Archive up to batch_size finished games last updated before cutoff.
+
+    Runs in the caller's transaction. Rows locked by in-flight requests are
+    skipped (FOR UPDATE SKIP LOCKED) and picked up by a later run.
+    """
+    rows = db.execute(
+        select(GameModel.id, GameModel.updated_at)
+        .where(*_archivable(cutoff))
+        .order_by(GameModel.updated_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        return 0
+    ids: List[str] = [r.id for r in rows]
+    if partitioned:
+        ensure_partitions(db, rows[0].updated_at, rows[-1].updated_at)
+
+    db.execute(
+        insert(GameArchiveModel).from_select(
+            ["id", "board", "difficulty", "status", "human_symbol", "moves", "created_at", "finished_at"],
+            select(
+                GameModel.id,
+                GameModel.board,
+                GameModel.difficulty,
+                GameModel.status,
+                GameModel.human_symbol,
+                GameModel.moves,
+                GameModel.created_at,
+                GameModel.updated_at,
+            ).where(GameModel.id.in_(ids)),
+        )
+    )
+    db.execute(delete(GameModel).where(GameModel.id.in_(ids)))
+    return len(ids)
+
+
+def archive(
+    session_factory: sessionmaker[Session],
+    cutoff: datetime,
+    *,
+    batch_size: int = 1000,
+    pause_s: float = 0.0,
+    max_batches: Optional[int] = None,
+) -> int:
+    with session_factory() as db:
+        partitioned = is_partitioned(db)
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        start = time.perf_counter()
+        with session_factory.begin() as db:
+            moved = archive_batch(db, cutoff, batch_size, partitioned=partitioned)
+        batches += 1
+        total += moved
+        logger.info(
+            "archive_batch_done",
+            extra={"moved": moved, "total": total, "duration_ms": round((time.perf_counter() - start) * 1000, 1)},
+        )
+        if moved < batch_size:
+            break
+        if pause_s:
+            # Give autovacuum and replicas room between batches
+            time.sleep(pause_s)
+    return total
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Archive finished games older than N days.")
+    parser.add_argument("--older-than-days", type=float, required=True)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    parser.add_argument("--max-batches", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="only count eligible games")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    configure_logging(settings.log_level)
+    engine = build_engine(settings)
+    session_factory = build_session_factory(engine)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+    try:
+        if args.dry_run:
+            with session_factory() as db:
+                eligible = db.execute(
+                    select(func.count())
+                    .select_from(GameModel)
+                    .where(*_archivable(cutoff))
+                ).scalar_one()
+            print(f"{eligible} finished games last updated before {cutoff.isoformat()}")
+            return
+        start = time.perf_counter()
+        total = archive(
+            session_factory,
+            cutoff,
+            batch_size=args.batch_size,
+            pause_s=args.pause,
+            max_batches=args.max_batches,
+        )
+        print(f"archived {total} games in {time.perf_counter() - start:.1f}s")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Rebuild the game outcome rollup from the games and games_archive tables.
+
+Run once after deploying the stats migration (or whenever the rollup is
+suspected to have drifted):
+
+    uv run python -m app.cli.backfill_stats
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from collections import Counter
+from typing import Optional, Sequence
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from app.core.logging import configure_logging
+from app.core.settings import get_settings
+from app.db.models import GameArchiveModel, GameModel, GameOutcomeStatModel
+from app.db.session import build_engine, build_session_factory
+from app.domain.enums import GameMode, GameStatus
+from app.domain.stats import OutcomeKey, outcome_key_from
+from app.repositories.sqlalchemy import SQLAlchemyStatsRepository
+
+logger = logging.getLogger(__name__)
+
+
+def backfill(db: Session, *, batch_size: int = 5000) -> Counter[OutcomeKey]:
+    """Replace the rollup with counts recomputed from finished games.
+
+    Runs in the caller's transaction. On PostgreSQL the rollup is locked first
+    so games finishing concurrently wait and are counted exactly once, after
+    the rebuilt rows are in place.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE game_outcome_stats IN EXCLUSIVE MODE"))
+
+    hot = select(
+        GameModel.difficulty,
+        GameModel.status,
+        GameModel.human_symbol,
+        GameModel.board,
+        GameModel.moves,
+    ).where(
+        GameModel.status != GameStatus.IN_PROGRESS.value,
+        # Only classic games have rollup dimensions (see outcome_key)
+        GameModel.mode == GameMode.CLASSIC.value,
+    )
+    # Archived games were counted when they finished and must stay counted
+    archived = select(
+        GameArchiveModel.difficulty,
+        GameArchiveModel.status,
+        GameArchiveModel.human_symbol,
+        GameArchiveModel.board,
+        GameArchiveModel.moves,
+    )
+    counts: Counter[OutcomeKey] = Counter()
+    for stmt in (hot, archived):
+        for row in db.execute(stmt.execution_options(yield_per=batch_size)):
+            key = outcome_key_from(row.difficulty, row.status, row.human_symbol, row.board, row.moves)
+            if key is not None:
+                counts[key] += 1
+
+    db.execute(delete(GameOutcomeStatModel))
+    SQLAlchemyStatsRepository(db).increment(counts)
+    return counts
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the game outcome stats rollup.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows fetched per round trip")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    configure_logging(settings.log_level)
+    engine = build_engine(settings)
+    try:
+        start = time.perf_counter()
+        with build_session_factory(engine).begin() as db:
+            counts = backfill(db, batch_size=args.batch_size)
+        logger.info(
+            "stats_backfill_done",
+            extra={
+                "games": sum(counts.values()),
+                "rows": len(counts),
+                "duration_s": round(time.perf_counter() - start, 2),
+            },
+        )
+        print(f"backfilled {sum(counts.values())} games into {len(counts)} rollup rows")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Solve an n x n, k-in-a-row variant offline and write its position book.
+
+The search solves every position reachable from the empty board, for either
+first player, with symmetric positions merged. It is exact, so time and
+memory grow with the variant: 4x4 takes about 1.5 minutes and 450 MiB here.
+--max-plies keeps only positions with at most that many stones; the
+runtime strategy searches the rest.
+
+    uv run python -m app.cli.build_book --size 4 --k 4 --out books/4x4-k4.book
+    uv run python -m app.cli.build_book --size 3 --out books/3x3-k3.book
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import time
+from typing import Optional, Sequence
+
+from app.core.logging import configure_logging
+from app.core.settings import get_settings
+from app.domain.ai.book import Book, build, decode_value, variant, write_book
+from app.domain.ai.solver import RESULT_NAMES
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build a solved-position book.")
+    parser.add_argument("--size", type=int, required=True, help="board side length (3..8)")
+    parser.add_argument("--k", type=int, help="stones in a row to win (default: size)")
+    parser.add_argument("--out", help="output file (default: books/<size>x<size>-k<k>.book)")
+    parser.add_argument("--max-plies", type=int, help="only store positions with at most this many stones")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    configure_logging(settings.log_level)
+    try:
+        v = variant(args.size, args.k or args.size)
+    except ValueError as e:
+        parser.error(str(e))
+    out = args.out or os.path.join("books", f"{v.name}.book")
+    if os.path.dirname(out):
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+
+    logger.info("book_build_started", extra={"variant": v.name, "max_plies": args.max_plies})
+    start = time.perf_counter()
+    entries, search = build(v, max_plies=args.max_plies)
+    solved_s = time.perf_counter() - start
+    size = write_book(out, v, entries, max_plies=args.max_plies)
+
+    # Read it back through the runtime path before anyone deploys it
+    book = Book(out)
+    try:
+        results = {}
+        for first, o_first in (("x", False), ("o", True)):
+            hit = book.lookup(0, 0, o_first)
+            if hit is None or hit != decode_value(search.memo[v.key(0, 0, o_first)]):
+                raise SystemExit(f"{out}: verification failed for the empty board")
+            results[f"{first}_first"] = f"{RESULT_NAMES[hit[0]]} in {hit[1]}"
+        entries_written = len(book)
+    finally:
+        book.close()
+    logger.info(
+        "book_build_done",
+        extra={
+            "variant": v.name,
+            "out": out,
+            "positions_solved": len(search.memo),
+            "entries": entries_written,
+            "bytes": size,
+            "solve_s": round(solved_s, 1),
+            "exact_keys": v.exact_keys,
+            **results,
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Export games as NDJSON (optionally gzip) for offline analysis.
+
+Streams rows through a server-side cursor and writes them as they arrive, so
+memory use does not depend on table size:
+
+    uv run python -m app.cli.export_games --out games.ndjson.gz --gzip --status x_won --since 2026-01-01
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Optional, Sequence
+
+from app.core.logging import configure_logging
+from app.core.settings import get_settings
+from app.db.session import build_engine, build_session_factory
+from app.domain.enums import Difficulty, GameStatus
+from app.services.export import ExportFilter, gzip_chunks, iter_db_payloads, ndjson_chunks
+
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export games as NDJSON.")
+    parser.add_argument("--out", default="-", help="output file, '-' for stdout (default)")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output")
+    parser.add_argument("--status", action="append", choices=[s.value for s in GameStatus], default=[])
+    parser.add_argument("--difficulty", action="append", choices=[d.value for d in Difficulty], default=[])
+    parser.add_argument("--since", type=datetime.fromisoformat, help="created_at lower bound (inclusive, ISO 8601)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="created_at upper bound (exclusive, ISO 8601)")
+    parser.add_argument("--no-archive", action="store_true", help="skip games_archive")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows fetched per round trip")
+    args = parser.parse_args(argv)
+
+    settings = get_settings()
+    configure_logging(settings.log_level)
+    flt = ExportFilter(
+        statuses=tuple(args.status),
+        difficulties=tuple(args.difficulty),
+        created_from=args.since,
+        created_to=args.until,
+        include_archived=not args.no_archive,
+    )
+    engine = build_engine(settings)
+    out = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    start = time.perf_counter()
+    written = 0
+    try:
+        with build_session_factory(engine)() as db:
+            chunks = ndjson_chunks(iter_db_payloads(db, flt, batch_size=args.batch_size))
+            for chunk in gzip_chunks(chunks) if args.gzip else chunks:
+                out.write(chunk)
+                written += len(chunk)
+        out.flush()
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        engine.dispose()
+    logger.info(
+        "export_done",
+        extra={"bytes": written, "duration_s": round(time.perf_counter() - start, 2)},
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Bulk-load game records from NDJSON or CSV into the games table.
+
+Accepts the output of app.cli.export_games (plain or gzip). Records are
+validated against the Board rules, and the valid ones are inserted in large
+batches: COPY through a staging table on PostgreSQL, executemany elsewhere.
+Ids that already exist, in games or games_archive, are skipped.
+
+    uv run python -m app.cli.import_games games.ndjson.gz --batch-size 10000
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import sys
+from typing import IO, Optional, Sequence
+
+from app.core.logging import configure_logging
+from app.core.settings import get_settings
+from app.db.session import build_engine, build_session_factory
+from app.services.bulk_import import ImportReport, import_records, read_csv, read_ndjson
+
+
+def _open(path: str) -> IO[str]:
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk-import games from NDJSON or CSV.")
+    parser.add_argument("source", help="input file (.ndjson, .csv, optionally .gz) or '-' for stdin")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="defaults to the file extension, else ndjson")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.source.removesuffix(".gz").endswith(".csv") else "ndjson")
+    settings = get_settings()
+    configure_logging(settings.log_level)
+    engine = build_engine(settings)
+    report = ImportReport()
+    try:
+        with _open(args.source) as stream:
+            records = read_csv(stream) if fmt == "csv" else read_ndjson(stream)
+            import_records(build_session_factory(engine), records, batch_size=args.batch_size, report=report)
+    finally:
+        engine.dispose()
+        print(
+            f"read {report.read}, inserted {report.inserted}, duplicates {report.duplicates}, "
+            f"rejected {report.rejected} in {report.elapsed_s:.2f}s ({report.rows_per_second:,.0f} rows/s)"
+        )
+        for reason, n in report.reject_reasons.most_common():
+            print(f"  rejected {reason}: {n}")
+
+
+if __name__ == "__main__":
+    main()
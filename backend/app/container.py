@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import logging
+import sys
+import threading
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Dict
+
+from app.core.deadline import DeadlineStats
+from app.core.metrics import MetricsRegistry
+from app.core.settings import Settings
+from app.domain.ai.executor import StrategyExecutor, StrategyOptions
+from app.domain.ai.factory import strategy_for, ultimate_strategy_for
+from app.domain.ai.resilience import UpstreamLimits
+from app.domain.ai.solver import solved_table
+from app.domain.board import interned_sizes, preload_boards
+from app.domain.enums import Difficulty
+from app.repositories.memory import InMemoryGameRepository
+from app.services.game_service import GameService
+
+if TYPE_CHECKING:
+    from app.core.capture import TrafficCapture
+    from app.core.idempotency import Idempotency
+    from app.core.memory import MemoryDiagnostics
+    from app.core.profiling import ProfileStore
+    from app.core.tracing import TraceStore
+    from app.domain.ai.ultimate import UltimateSearchStrategy
+    from app.db.pool import PoolMetrics
+    from sqlalchemy.engine import Engine
+    from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+def _runtime_sizes() -> Dict[str, Any]:
+    loggers = logging.Logger.manager.loggerDict
+    return {
+        "modules": len(sys.modules),
+        "loggers": len(loggers),
+        "log_handlers": sum(len(getattr(lg, "handlers", ())) for lg in loggers.values()) + len(logging.getLogger().handlers),
+        "threads": threading.active_count(),
+    }
+
+
+class Container:
+    """Process-wide singletons owned by one application instance.
+
+    Everything is built lazily on first access and at most once. The app
+    lifespan calls warm_up() before serving traffic, so the first request does
+    not pay for construction, and close() on shutdown.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+
+    @property
+    def use_db(self) -> bool:
+        return bool(self.settings.database_url)
+
+    @cached_property
+    def engine(self) -> "Engine":
+        # Import only when DB is enabled to avoid hard dependency when not used
+        from app.db.session import build_engine
+
+        logger.info("db_engine_created")
+        return build_engine(self.settings)
+
+    @cached_property
+    def pool_metrics(self) -> "PoolMetrics":
+        from app.db.pool import PoolMetrics
+
+        pool_metrics = PoolMetrics(
+            self.engine,
+            pool_size=self.settings.db_pool_size,
+            max_overflow=self.settings.db_max_overflow,
+        )
+        self.metrics.register("db_pool", pool_metrics.snapshot)
+        return pool_metrics
+
+    @cached_property
+    def session_factory(self) -> "sessionmaker[Session]":
+        from app.db.session import build_session_factory
+
+        return build_session_factory(self.engine)
+
+    @cached_property
+    def metrics(self) -> MetricsRegistry:
+        return MetricsRegistry()
+
+    @cached_property
+    def profiles(self) -> "ProfileStore":
+        from app.core.profiling import ProfileStore
+
+        store = ProfileStore(self.settings.profile_dir, keep=self.settings.profile_keep)
+        self.metrics.register("profiling", store.snapshot)
+        return store
+
+    @cached_property
+    def traces(self) -> "TraceStore":
+        from app.core.tracing import OTLPFileExporter, TraceStore
+
+        exporter = None
+        if self.settings.trace_export_path:
+            exporter = OTLPFileExporter(self.settings.trace_export_path, service_name=self.settings.app_name)
+        store = TraceStore(keep=self.settings.trace_keep, exporter=exporter)
+        self.metrics.register("tracing", store.snapshot)
+        return store
+
+    @cached_property
+    def deadlines(self) -> DeadlineStats:
+        stats = DeadlineStats()
+        self.metrics.register("deadlines", stats.snapshot)
+        return stats
+
+    @cached_property
+    def capture(self) -> "TrafficCapture":
+        from app.core.capture import TrafficCapture
+
+        s = self.settings
+        capture = TrafficCapture(s.capture_dir, sample_rate=s.capture_sample_rate, max_games=s.capture_max_games)
+        self.metrics.register("capture", capture.snapshot)
+        return capture
+
+    @cached_property
+    def idempotency(self) -> "Idempotency":
+        from app.core.idempotency import Idempotency
+
+        s = self.settings
+        if s.idempotency_store == "db":
+            if not self.use_db:
+                raise RuntimeError("IDEMPOTENCY_STORE=db requires DATABASE_URL")
+            from app.repositories.sqlalchemy import SQLAlchemyIdempotencyStore
+
+            store = SQLAlchemyIdempotencyStore(self.session_factory)
+        else:
+            from app.repositories.memory import InMemoryIdempotencyStore
+
+            store = InMemoryIdempotencyStore(max_entries=s.idempotency_max_entries)
+        idempotency = Idempotency(store, ttl_s=s.idempotency_ttl_s, lock_s=s.idempotency_lock_s)
+        self.metrics.register("idempotency", idempotency.snapshot)
+        return idempotency
+
+    @cached_property
+    def memory(self) -> "MemoryDiagnostics":
+        from app.core.memory import MemoryDiagnostics
+
+        diagnostics = MemoryDiagnostics(frames=self.settings.tracemalloc_frames)
+        # Sources read self.__dict__ so a report never builds what is not in use
+        diagnostics.register("memory_repo", self._memory_repo_sizes)
+        diagnostics.register("boards", interned_sizes)
+        diagnostics.register("solver", lambda: {"positions": len(solved_table())})
+        diagnostics.register("caches", self._cache_sizes)
+        diagnostics.register("diagnostics", self._diagnostics_sizes)
+        diagnostics.register("runtime", _runtime_sizes)
+        return diagnostics
+
+    def _memory_repo_sizes(self) -> Dict[str, Any]:
+        repo = self.__dict__.get("memory_repo")
+        return repo.sizes() if repo is not None else {"in_use": False}
+
+    def _cache_sizes(self) -> Dict[str, Any]:
+        from app.core.memory import lru_cache_info
+        from app.domain.ai.book import open_book
+        from app.services.analysis_service import analyze_position
+
+        return {
+            "strategy_for": lru_cache_info(strategy_for),
+            "ultimate_strategy_for": lru_cache_info(ultimate_strategy_for),
+            "analyze_position": lru_cache_info(analyze_position),
+            "open_book": lru_cache_info(open_book),
+        }
+
+    def _diagnostics_sizes(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        for name in ("profiles", "traces"):
+            store = self.__dict__.get(name)
+            if store is not None:
+                out[name] = store.snapshot()
+        return out
+
+    @cached_property
+    def gemini_limits(self) -> UpstreamLimits:
+        return UpstreamLimits(
+            timeout_s=self.settings.gemini_timeout_s,
+            max_concurrency=self.settings.gemini_max_concurrency,
+            breaker_failures=self.settings.gemini_breaker_failures,
+            breaker_reset_s=self.settings.gemini_breaker_reset_s,
+            batch_window_s=self.settings.gemini_batch_window_ms / 1000.0,
+            batch_max_size=self.settings.gemini_batch_max_size,
+            move_budget_s=self.settings.strategy_budget_hard_ms / 1000.0,
+        )
+
+    @cached_property
+    def strategy_executor(self) -> StrategyExecutor:
+        executor = StrategyExecutor(
+            StrategyOptions(
+                gemini_api_key=self.settings.gemini_api_key,
+                gemini_model=self.settings.gemini_model,
+                gemini_limits=self.gemini_limits,
+                book_path=self.settings.ai_book_path,
+            ),
+            budgets_s={
+                Difficulty.EASY: self.settings.strategy_budget_easy_ms / 1000.0,
+                Difficulty.MEDIUM: self.settings.strategy_budget_medium_ms / 1000.0,
+                Difficulty.HARD: self.settings.strategy_budget_hard_ms / 1000.0,
+            },
+            workers=self.settings.strategy_workers,
+            kind=self.settings.strategy_pool,
+        )
+        self.metrics.register("strategy_executor", executor.snapshot)
+        return executor
+
+    @cached_property
+    def memory_repo(self) -> InMemoryGameRepository:
+        return InMemoryGameRepository()
+
+    @cached_property
+    def memory_service(self) -> GameService:
+        return GameService(
+            self.memory_repo,
+            gemini_api_key=self.settings.gemini_api_key,
+            gemini_model=self.settings.gemini_model,
+            gemini_limits=self.gemini_limits,
+            book_path=self.settings.ai_book_path,
+            executor=self.strategy_executor,
+            ultimate_budget_s=self.settings.ultimate_budget_ms / 1000.0,
+            ultimate_workers=self.settings.ultimate_search_workers,
+        )
+
+    def warm_up(self) -> None:
+        solved_table()
+        preload_boards()
+        for difficulty in Difficulty:
+            strategy = strategy_for(
+                difficulty,
+                gemini_api_key=self.settings.gemini_api_key,
+                gemini_model=self.settings.gemini_model,
+                gemini_limits=self.gemini_limits,
+                book_path=self.settings.ai_book_path,
+            )
+            snapshot = getattr(strategy, "snapshot", None)
+            if snapshot is not None:
+                # Breaker state, shed and timeout counts of the upstream path
+                self.metrics.register(f"ai_{difficulty.value}", snapshot)
+        self.strategy_executor.start()
+        ultimate = self._ultimate_search()
+        ultimate.start()
+        self.metrics.register("ultimate_search", ultimate.snapshot)
+        if self.settings.memory_debug_enabled and self.settings.tracemalloc_on_start:
+            # After warm-up, so the baseline already holds the startup tables
+            self.memory.start()
+        if self.use_db:
+            self.session_factory
+            self.pool_metrics
+        else:
+            self.memory_service
+        if self.settings.idempotency_enabled:
+            # Built here rather than by create_app, so a DB store's engine is per worker
+            self.idempotency
+
+    def _ultimate_search(self) -> "UltimateSearchStrategy":
+        # The HARD engine owns the search processes
+        return ultimate_strategy_for(  # type: ignore[return-value]
+            Difficulty.HARD,
+            budget_s=self.settings.ultimate_budget_ms / 1000.0,
+            workers=self.settings.ultimate_search_workers,
+        )
+
+    def close(self) -> None:
+        traces = self.__dict__.get("traces")
+        if traces is not None:
+            # Flush the export file; the store itself lives as long as the app
+            traces.close()
+        capture = self.__dict__.get("capture")
+        if capture is not None:
+            capture.close()
+        executor = self.__dict__.pop("strategy_executor", None)
+        if executor is not None:
+            executor.shutdown()
+            self.metrics.unregister("strategy_executor")
+        # Stops the search processes if any were started; cheap otherwise
+        self._ultimate_search().shutdown()
+        self.metrics.unregister("ultimate_search")
+        if self.settings.idempotency_store == "db" and self.__dict__.pop("idempotency", None) is not None:
+            # Its sessions come from the engine disposed below
+            self.metrics.unregister("idempotency")
+        engine = self.__dict__.pop("engine", None)
+        self.__dict__.pop("session_factory", None)
+        if self.__dict__.pop("pool_metrics", None) is not None:
+            self.metrics.unregister("db_pool")
+        if engine is not None:
+            engine.dispose()
+            logger.info("db_engine_disposed")
@@ -0,0 +1,78 @@
+"""A bounded queue drained by a per-process background thread.
+
+Shared by the trace exporter and the traffic capture, which both write to
+disk off the request path from apps built before the launcher forks.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+class BackgroundWriter(ABC):
+    """Hand items to a daemon thread through a bounded queue.
+
+    put() only enqueues, so the caller never waits on the thread's work.
+    The queue is bounded; items beyond it are dropped and counted.
+
+    The thread is started by the first put() in a process, not here: the
+    launcher builds the app before forking its workers, and a thread started
+    in the parent would not exist in them. Subclasses implement _run(), which
+    drains the queue until it yields None, and may override _starting() to
+    set up per-process state before the thread starts.
+    """
+
+    thread_name = "background-writer"
+
+    def __init__(self, max_queue: int) -> None:
+        self.max_queue = max_queue
+        self._queue: "Optional[queue.Queue[Any]]" = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the thread has been started in this process."""
+        return self._queue is not None and self._pid == os.getpid()
+
+    def open(self) -> "queue.Queue[Any]":
+        """This process's queue, starting its thread on first use."""
+        q = self._queue
+        if q is not None and self._pid == os.getpid():
+            return q
+        with self._lock:
+            if self._queue is None or self._pid != os.getpid():
+                self._starting()
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._thread = threading.Thread(target=self._run, args=(self._queue,), name=self.thread_name, daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+            return self._queue
+
+    def put(self, item: Any) -> None:
+        try:
+            self.open().put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _starting(self) -> None:
+        """Called with the lock held before this process's thread starts."""
+
+    @abstractmethod
+    def _run(self, q: "queue.Queue[Any]") -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Drain and stop this process's thread; a later put() starts a new one."""
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                return
+            q, thread = self._queue, self._thread
+            self._queue, self._thread, self._pid = None, None, None
+        q.put(None)
+        thread.join(timeout=5)
@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.background import BackgroundWriter
+
+logger = logging.getLogger(__name__)
+
+# Capture files are gzipped JSON lines. The first line is a header:
+#   {"v": 1, "started_at": "<iso8601>", "pid": 123}
+# and every other line one request, as a compact array:
+#   [t_ms, game, op, status, latency_ms, body]
+# t_ms is when the request arrived, from the start of the capture; game is a
+# number local to the file, standing in for the game id (0 for a create that
+# failed); op is create, move or get; body holds only the fields in _FIELDS,
+# or {"if_none_match": true} for a conditional get, and is null otherwise.
+CAPTURE_VERSION = 1
+
+CREATE, MOVE, GET = "create", "move", "get"
+
+_ROUTES = {
+    ("POST", "/games"): CREATE,
+    ("POST", "/games/{game_id}/moves"): MOVE,
+    ("GET", "/games/{game_id}"): GET,
+}
+
+# Everything else a client sends (ids, headers, keys, free text) is dropped
+_FIELDS = {
+    CREATE: ("difficulty", "first_player", "human_symbol", "mode"),
+    MOVE: ("position", "board"),
+}
+_MAX_VALUE_LENGTH = 16
+
+
+def sanitize(op: str, raw: bytes) -> Optional[Dict[str, Any]]:
+    """The whitelisted scalar fields of a request body, or None."""
+    fields = _FIELDS.get(op)
+    if not fields or not raw:
+        return None
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    out: Dict[str, Any] = {}
+    for name in fields:
+        value = data.get(name)
+        if isinstance(value, bool) or value is None:
+            continue
+        if isinstance(value, int) or (isinstance(value, str) and len(value) <= _MAX_VALUE_LENGTH):
+            out[name] = value
+    return out or None
+
+
+class CaptureWriter(BackgroundWriter):
+    """Append capture records to a gzip file from a background thread.
+
+    Each process that writes opens its own file in directory. write() only
+    enqueues, so the request path never waits on compression or disk. The
+    stream is sync-flushed whenever the queue drains, so a file cut short
+    by a crash still reads back up to its last flush.
+    """
+
+    thread_name = "traffic-capture"
+
+    def __init__(self, directory: str, max_queue: int = 10000, on_open: Optional[Callable[[], None]] = None) -> None:
+        super().__init__(max_queue)
+        self.directory = directory
+        self.on_open = on_open
+        self.path: Optional[str] = None
+        self._header: Dict[str, Any] = {}
+        self.start = 0.0
+        self.written = 0
+
+    def _starting(self) -> None:
+        pid = os.getpid()
+        os.makedirs(self.directory, exist_ok=True)
+        now = datetime.now(timezone.utc)
+        # The suffix keeps apart apps built in the same process and second
+        self.path = os.path.join(self.directory, f"capture-{now:%Y%m%dT%H%M%SZ}-{pid}-{os.urandom(3).hex()}.ndjson.gz")
+        self._header = {"v": CAPTURE_VERSION, "started_at": now.isoformat(), "pid": pid}
+        # Record times are offsets from here, the header's started_at
+        self.start = time.perf_counter()
+        if self.on_open is not None:
+            self.on_open()
+        logger.info("traffic_capture_started", extra={"path": self.path})
+
+    def write(self, record: list) -> None:
+        self.put(record)
+
+    def _run(self, q: "queue.Queue[Optional[list]]") -> None:
+        with gzip.open(self.path, "wt", encoding="utf-8") as fh:
+            fh.write(json.dumps(self._header, separators=(",", ":")) + "\n")
+            while True:
+                record = q.get()
+                if record is None:
+                    return
+                try:
+                    fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    self.written += 1
+                    if q.empty():
+                        fh.flush()
+                        fh.buffer.flush(zlib.Z_SYNC_FLUSH)
+                except Exception:
+                    logger.exception("capture_write_failed")
+
+
+class TrafficCapture:
+    """Per-game request sequences for games sampled at creation.
+
+    A game is sampled (sample_rate) when it is created, and then every
+    create, move and fetch of it is recorded, so each captured game is a
+    complete sequence, including where a player gave up. Games created
+    before the capture started are never recorded. Game ids are replaced by
+    a per-file number; at most max_games ids are remembered, oldest first.
+    Each worker writes its own file, opened by the first request it serves.
+    """
+
+    def __init__(self, directory: str, sample_rate: float = 1.0, max_games: int = 10000) -> None:
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_games = max_games
+        self._writer = CaptureWriter(directory, on_open=self._new_file)
+        self._games: "OrderedDict[str, int]" = OrderedDict()
+        self._next = 1
+        self._lock = threading.Lock()
+        self.games = 0
+        self.forgotten = 0
+
+    def _new_file(self) -> None:
+        # Game numbers are per file; a forked worker starts its own
+        with self._lock:
+            self._games.clear()
+            self._next = 1
+
+    def elapsed_ms(self) -> float:
+        self._writer.open()
+        return (time.perf_counter() - self._writer.start) * 1e3
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def game_number(self, game_id: str) -> Optional[int]:
+        with self._lock:
+            number = self._games.get(game_id)
+            if number is not None:
+                self._games.move_to_end(game_id)
+            return number
+
+    def add_game(self, game_id: str) -> int:
+        with self._lock:
+            number = self._next
+            self._next += 1
+            self._games[game_id] = number
+            self.games += 1
+            if len(self._games) > self.max_games:
+                self._games.popitem(last=False)
+                self.forgotten += 1
+            return number
+
+    def record(self, t_ms: float, game: int, op: str, status: int, latency_ms: float, body: Optional[Dict[str, Any]]) -> None:
+        self._writer.write([round(t_ms, 1), game, op, status, round(latency_ms, 2), body])
+
+    def close(self) -> None:
+        self._writer.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            tracked = len(self._games)
+        writer = self._writer if self._writer.running else None
+        return {
+            "path": writer.path if writer else None,
+            "sample_rate": self.sample_rate,
+            "games": self.games,
+            "tracked_games": tracked,
+            "forgotten_games": self.forgotten,
+            "written": writer.written if writer else 0,
+            "dropped": writer.dropped if writer else 0,
+        }
+
+
+def read_capture(path: str) -> Tuple[Dict[str, Any], Iterator[List[Any]]]:
+    """The header of a capture file and an iterator over its records."""
+    fh = gzip.open(path, "rt", encoding="utf-8")
+    try:
+        header = json.loads(fh.readline())
+    except Exception:
+        fh.close()
+        raise
+    if header.get("v") != CAPTURE_VERSION:
+        fh.close()
+        raise ValueError(f"{path}: unsupported capture version {header.get('v')!r}")
+
+    def records() -> Iterator[List[Any]]:
+        with fh:
+            try:
+                for line in fh:
+                    if line.strip():
+                        yield json.loads(line)
+            except (EOFError, zlib.error, ValueError):
+                # Cut short by a crash: keep what was flushed
+                logger.warning("capture_truncated", extra={"path": path})
+
+    return header, records()
+
+
+class CaptureMiddleware:
+    """Record game requests for TrafficCapture.
+
+    Only installed when CAPTURE_ENABLED is set. Other routes, and requests
+    for games that were not sampled, pay for a dict lookup.
+    """
+
+    def __init__(self, app: ASGIApp, capture: TrafficCapture) -> None:
+        self.app = app
+        self.capture = capture
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/games"):
+            await self.app(scope, receive, send)
+            return
+        capture = self.capture
+        t_ms = capture.elapsed_ms()
+        method = scope["method"]
+        # A create is sampled before it runs; other requests need a known game
+        sample_create = method == "POST" and scope["path"] == "/games" and capture.sampled()
+        game: Optional[int] = None
+        if not sample_create:
+            parts = scope["path"].split("/")
+            if len(parts) < 3 or (game := capture.game_number(parts[2])) is None:
+                await self.app(scope, receive, send)
+                return
+
+        body: List[bytes] = []
+        out: List[bytes] = []
+        status = 500
+
+        async def receive_tee() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                body.append(message.get("body", b""))
+            return message
+
+        async def send_tee(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif sample_create and message["type"] == "http.response.body":
+                out.append(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_tee, send_tee)
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1e3
+            route = scope.get("route")
+            op = _ROUTES.get((method, getattr(route, "path", None)))
+            if op is not None:
+                if op == CREATE:
+                    game = self._created(b"".join(out)) if status < 400 else 0
+                if game is not None:
+                    if op == GET:
+                        fields = {"if_none_match": True} if any(n == b"if-none-match" for n, _ in scope["headers"]) else None
+                    else:
+                        fields = sanitize(op, b"".join(body))
+                    capture.record(t_ms, game, op, status, latency_ms, fields)
+
+    def _created(self, raw: bytes) -> Optional[int]:
+        try:
+            game_id = json.loads(raw)["id"]
+        except (ValueError, KeyError, TypeError):
+            return None
+        return self.capture.add_game(str(game_id))
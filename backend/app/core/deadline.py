@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(RuntimeError):
+    """The request's time budget ran out; stage says where it was noticed."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__("deadline_exceeded")
+        self.stage = stage
+
+
+@dataclass(frozen=True, slots=True)
+class Deadline:
+    """An absolute point on the monotonic clock by which a request must answer.
+
+    reserve_s is kept back when capping a budget for work that still has to
+    be followed by more (a move still has to be saved and serialized).
+    """
+
+    at: float
+    reserve_s: float = 0.0
+
+    @classmethod
+    def after(cls, seconds: float, reserve_s: float = 0.0) -> "Deadline":
+        return cls(time.monotonic() + seconds, reserve_s)
+
+    def remaining(self) -> float:
+        return self.at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, stage: str) -> None:
+        if self.remaining() <= 0:
+            raise DeadlineExceeded(stage)
+
+    def cap(self, budget_s: float, stage: str) -> float:
+        """budget_s, shortened to the time left less the reserve; raises when none is left."""
+        left = self.remaining() - self.reserve_s
+        if left <= 0:
+            raise DeadlineExceeded(stage)
+        return min(budget_s, left)
+
+
+class DeadlineStats:
+    """Requests that carried a deadline, and where the ones that missed it stopped."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self._exceeded: Counter[str] = Counter()
+
+    def started(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def exceeded(self, stage: str) -> None:
+        with self._lock:
+            self._exceeded[stage] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "exceeded": sum(self._exceeded.values()), "by_stage": dict(self._exceeded)}
+
+
+def parse_budget_ms(raw: bytes) -> Optional[float]:
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
+
+
+class DeadlineMiddleware:
+    """Turn the proxy's time budget header into request.state.deadline.
+
+    The header carries the milliseconds the client will still wait, as
+    edge proxies send it, so clocks need not agree. Without the header the
+    default budget applies (none when 0). A request whose budget is already
+    spent gets 504 before any work starts. The deadline is measured from
+    here, so install this outermost.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        stats: DeadlineStats,
+        header: str = "x-request-timeout-ms",
+        default_s: float = 0.0,
+        reserve_s: float = 0.0,
+    ) -> None:
+        self.app = app
+        self.stats = stats
+        self.header = header.lower().encode("latin-1")
+        self.default_s = default_s
+        self.reserve_s = reserve_s
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        arrived = time.monotonic()
+        budget_s: Optional[float] = None
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                ms = parse_budget_ms(value)
+                if ms is not None:
+                    budget_s = ms / 1000.0
+                break
+        if budget_s is None:
+            if self.default_s <= 0:
+                await self.app(scope, receive, send)
+                return
+            budget_s = self.default_s
+
+        self.stats.started()
+        if budget_s <= 0:
+            self.stats.exceeded("arrival")
+            await send_deadline_exceeded(send)
+            return
+        scope.setdefault("state", {})["deadline"] = Deadline(arrived + budget_s, self.reserve_s)
+        await self.app(scope, receive, send)
+
+
+async def send_deadline_exceeded(send: Send) -> None:
+    body = json.dumps({"detail": "deadline_exceeded"}).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": 504, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
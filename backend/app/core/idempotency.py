@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.repositories.base import IdempotencyStore, StoredResponse
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+
+# Not kept: a retry should run again rather than replay a transient failure
+_UNCACHEABLE = frozenset({408, 409, 425, 429})
+
+
+def _digest(*parts: bytes) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(len(part).to_bytes(8, "big"))
+        h.update(part)
+    return h.hexdigest()
+
+
+def request_fingerprint(method: str, path: str, query: bytes, body: bytes) -> str:
+    return _digest(method.encode(), path.encode(), query, body)
+
+
+def store_key(method: str, path: str, idem_key: str) -> str:
+    """The key an entry is stored under: a fixed 64 characters however long the path."""
+    return _digest(method.encode(), path.encode(), idem_key.encode("latin-1"))
+
+
+class Idempotency:
+    """A store plus the retention policy and counters of the middleware."""
+
+    def __init__(self, store: IdempotencyStore, ttl_s: float = 86400.0, lock_s: float = 60.0) -> None:
+        self.store = store
+        self.ttl_s = ttl_s
+        # How long a claim lasts if its request never finishes (crash, kill)
+        self.lock_s = lock_s
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {"requests": 0, "replayed": 0, "in_progress": 0, "mismatched": 0, "stored": 0, "not_stored": 0}
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    async def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.store.blocking:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        return await self.call(self.store.begin, key, fingerprint, self.lock_s)
+
+    async def settle(self, key: str, fingerprint: str, status: int, content_type: Optional[str], body: bytes) -> None:
+        if status >= 500 or status in _UNCACHEABLE:
+            await self.release(key)
+            return
+        await self.call(self.store.complete, key, StoredResponse(fingerprint, status, content_type, body), self.ttl_s)
+        self.count("stored")
+
+    async def release(self, key: str) -> None:
+        await self.call(self.store.release, key)
+        self.count("not_stored")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {"ttl_s": self.ttl_s, "lock_s": self.lock_s, **counts, **self.store.snapshot()}
+
+
+class IdempotencyMiddleware:
+    """Replay the stored response for a POST repeated with the same Idempotency-Key.
+
+    The first request with a key claims it and runs. Its response (anything
+    but a 5xx or a transient 4xx) is stored for ttl_s, and repeats get that
+    response back without reaching the endpoint, so no strategy or repository
+    work is done twice. A repeat that arrives while the first request still
+    runs gets 409 with Retry-After. Reusing a key for a different request
+    (method, path, query or body) is a 422. Requests without the header pass
+    straight through.
+
+    The store is looked up through get_idempotency on each keyed request,
+    so installing the middleware builds nothing: a DB store's engine is only
+    created by the worker's lifespan, never in the launcher before it forks.
+    """
+
+    def __init__(self, app: ASGIApp, get_idempotency: Callable[[], Idempotency], methods: Tuple[str, ...] = ("POST",)) -> None:
+        self.app = app
+        self.get_idempotency = get_idempotency
+        self.methods = methods
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+        raw_key: Optional[bytes] = None
+        for name, value in scope.get("headers", ()):
+            if name == IDEMPOTENCY_HEADER:
+                raw_key = value
+                break
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        idem_key = raw_key.decode("latin-1").strip()
+        if not idem_key or len(idem_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, {"detail": "invalid_idempotency_key"})
+            return
+
+        idem = self.get_idempotency()
+        idem.count("requests")
+        # Bodies here are small JSON documents; read it whole to fingerprint it
+        chunks: List[bytes] = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        method, path = scope["method"], scope["path"]
+        fingerprint = request_fingerprint(method, path, scope.get("query_string", b""), body)
+        key = store_key(method, path, idem_key)
+
+        existing = await idem.begin(key, fingerprint)
+        if existing is not None:
+            if existing.fingerprint != fingerprint:
+                idem.count("mismatched")
+                await _send_json(send, 422, {"detail": "idempotency_key_reused"})
+            elif existing.status is None:
+                idem.count("in_progress")
+                await _send_json(send, 409, {"detail": "request_in_progress"}, [(b"retry-after", b"1")])
+            else:
+                idem.count("replayed")
+                logger.debug("idempotent_replay", extra={"path": path, "status": existing.status})
+                headers = [(b"content-length", str(len(existing.body)).encode()), (REPLAYED_HEADER, b"true")]
+                if existing.content_type:
+                    headers.append((b"content-type", existing.content_type.encode("latin-1")))
+                await send({"type": "http.response.start", "status": existing.status, "headers": headers})
+                await send({"type": "http.response.body", "body": existing.body})
+            return
+
+        replayed_body = False
+
+        async def receive_replay() -> Message:
+            nonlocal replayed_body
+            if not replayed_body:
+                replayed_body = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+        content_type: Optional[str] = None
+        out: List[bytes] = []
+        settled = False
+
+        async def send_capture(message: Message) -> None:
+            nonlocal status, content_type, settled
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type":
+                        content_type = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                out.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    # Stored before the client sees the end, so a fast retry finds it
+                    settled = True
+                    await idem.settle(key, fingerprint, status, content_type, b"".join(out))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_replay, send_capture)
+        finally:
+            if not settled:
+                await idem.release(key)
+
+
+async def _send_json(send: Send, status: int, content: Dict[str, Any], extra: Optional[List[Tuple[bytes, bytes]]] = None) -> None:
+    body = json.dumps(content).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *(extra or [])]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import gc
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.metrics import MetricsRegistry, MetricsSource
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+# Allocations made by the diagnostics themselves and by the import system
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+GROUP_BY = ("filename", "lineno", "traceback")
+
+
+def memory_usage(pid: int | str = "self") -> Optional[Dict[str, int]]:
+    """RSS/PSS breakdown in KiB from /proc/<pid>/smaps_rollup (Linux only).
+
+    PSS splits each shared page between the processes mapping it. The sum
+    of PSS over workers is their real footprint, while the sum of RSS
+    counts shared pages once per worker.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="ascii") as fh:
+            lines = fh.read().splitlines()
+    except OSError:
+        return None
+    out: Dict[str, int] = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        if key in _SMAPS_FIELDS:
+            out[key.lower()] = int(rest.split()[0])
+    return out
+
+
+def _short_path(filename: str) -> str:
+    # Site-packages and the app both read better relative to their sys.path entry
+    best = filename
+    for entry in sys.path:
+        if entry and filename.startswith(entry + os.sep) and len(filename) - len(entry) - 1 < len(best):
+            best = filename[len(entry) + 1 :]
+    return best
+
+
+def _type_name(cls: type) -> str:
+    return cls.__qualname__ if cls.__module__ == "builtins" else f"{cls.__module__}.{cls.__qualname__}"
+
+
+def approx_deep_size(objects: Iterable[Any], sample: int = 200, shared: Tuple[type, ...] = ()) -> Dict[str, Any]:
+    """Average bytes reachable from each object, measured on a sample.
+
+    Walks gc referents, skipping classes, modules, functions and instances
+    of the shared types (process-wide objects such as interned boards,
+    which the items only point to). Anything else reachable from several
+    sampled items is counted once.
+    """
+    items = list(objects)
+    if not items:
+        return {"items": 0, "avg_bytes": 0, "approx_bytes": 0}
+    step = max(1, len(items) // sample)
+    sampled = items[::step][:sample]
+    seen: set[int] = set()
+    skip = (type, type(sys), type(approx_deep_size), type(len), *shared)
+    total = 0
+    stack: List[Any] = list(sampled)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, skip):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)
+        stack.extend(gc.get_referents(obj))
+    avg = total / len(sampled)
+    return {"items": len(items), "sampled": len(sampled), "avg_bytes": round(avg), "approx_bytes": round(avg * len(items))}
+
+
+def lru_cache_info(fn: Any) -> Dict[str, Any]:
+    info = fn.cache_info()
+    return {"entries": info.currsize, "maxsize": info.maxsize, "hits": info.hits, "misses": info.misses}
+
+
+class MemoryDiagnostics:
+    """tracemalloc snapshots diffed against a baseline, plus per-structure sizes.
+
+    tracemalloc can be started at runtime; it only sees allocations made
+    after that, which is what a growth investigation needs: start it (this
+    also takes the baseline), let traffic run, then diff. While tracing,
+    every allocation pays for a traceback lookup, so stop it when done.
+    Structure sizes come from sources registered by the components that
+    own the structures.
+    """
+
+    def __init__(self, frames: int = 1) -> None:
+        self.frames = frames
+        self.structures = MetricsRegistry()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._baseline_at: Optional[datetime] = None
+        # Snapshots are large and slow; one at a time
+        self._lock = threading.Lock()
+
+    def register(self, name: str, source: MetricsSource) -> None:
+        self.structures.register(name, source)
+
+    def tracemalloc_status(self) -> Dict[str, Any]:
+        tracing = tracemalloc.is_tracing()
+        out: Dict[str, Any] = {
+            "tracing": tracing,
+            "frames": tracemalloc.get_traceback_limit() if tracing else self.frames,
+            "baseline_at": self._baseline_at.isoformat() if self._baseline_at else None,
+        }
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            out.update(traced_kib=current // 1024, peak_kib=peak // 1024, overhead_kib=tracemalloc.get_tracemalloc_memory() // 1024)
+        return out
+
+    def start(self, frames: Optional[int] = None) -> Dict[str, Any]:
+        """Start tracemalloc if it is not running and take a fresh baseline."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames or self.frames)
+            self._take_baseline()
+        return self.tracemalloc_status()
+
+    def stop(self) -> Dict[str, Any]:
+        with self._lock:
+            tracemalloc.stop()
+            self._baseline = None
+            self._baseline_at = None
+        return self.tracemalloc_status()
+
+    def reset_baseline(self) -> Dict[str, Any]:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc_not_running")
+            self._take_baseline()
+        return self.tracemalloc_status()
+
+    def _take_baseline(self) -> None:
+        gc.collect()
+        self._baseline = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+        self._baseline_at = datetime.now(timezone.utc)
+
+    def diff(self, group_by: str = "lineno", limit: int = 25) -> Dict[str, Any]:
+        """Top allocation sites by growth since the baseline."""
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {', '.join(GROUP_BY)}")
+        with self._lock:
+            if not tracemalloc.is_tracing() or self._baseline is None:
+                raise RuntimeError("tracemalloc_not_running")
+            start = time.perf_counter()
+            # Garbage that a collection would free is not growth
+            gc.collect()
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            stats = snapshot.compare_to(self._baseline, group_by)
+        growth = sum(s.size_diff for s in stats)
+        top = []
+        for stat in stats[:limit]:
+            frames = []
+            for f in stat.traceback:
+                frame: Dict[str, Any] = {"file": _short_path(f.filename)}
+                if group_by != "filename":
+                    frame.update(line=f.lineno, code=linecache.getline(f.filename, f.lineno).strip())
+                frames.append(frame)
+            top.append(
+                {
+                    "size_diff_kib": round(stat.size_diff / 1024, 1),
+                    "size_kib": round(stat.size / 1024, 1),
+                    "count_diff": stat.count_diff,
+                    "count": stat.count,
+                    "frames": frames,
+                }
+            )
+        return {
+            "baseline_at": self._baseline_at.isoformat() if self._baseline_at else None,
+            "group_by": group_by,
+            "growth_kib": round(growth / 1024, 1),
+            "snapshot_ms": round((time.perf_counter() - start) * 1e3, 1),
+            "top": top,
+        }
+
+    def report(self, top_types: int = 20) -> Dict[str, Any]:
+        """Process memory, GC state, most common object types and registered structure sizes."""
+        objects = gc.get_objects()
+        types = Counter(_type_name(type(o)) for o in objects)
+        del objects
+        return {
+            "process_kib": memory_usage(),
+            "gc": {
+                "counts": gc.get_count(),
+                "tracked_objects": sum(types.values()),
+                "frozen_objects": gc.get_freeze_count(),
+                "uncollectable": len(gc.garbage),
+            },
+            "top_types": [{"type": name, "count": n} for name, n in types.most_common(top_types)],
+            "tracemalloc": self.tracemalloc_status(),
+            "structures": self.structures.collect(),
+        }
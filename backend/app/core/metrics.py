@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import logging
+from threading import Lock
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+MetricsSource = Callable[[], Dict[str, Any]]
+
+
+class MetricsRegistry:
+    """Named snapshot callables collected on demand by GET /metrics.
+
+    Components register a source when they are built; nothing is computed
+    until a scrape happens, so registration is free on the request path.
+    """
+
+    def __init__(self) -> None:
+        self._sources: Dict[str, MetricsSource] = {}
+        self._lock = Lock()
+
+    def register(self, name: str, source: MetricsSource) -> None:
+        with self._lock:
+            self._sources[name] = source
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._sources.pop(name, None)
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            sources = dict(self._sources)
+        out: Dict[str, Dict[str, Any]] = {}
+        for name, source in sources.items():
+            try:
+                out[name] = source()
+            except Exception:
+                logger.exception("metrics_source_failed", extra={"source": name})
+                out[name] = {"error": "unavailable"}
+        return out
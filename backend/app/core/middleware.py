@@ -2,37 +2,62 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import Callable
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing import current_trace_id
 
 logger = logging.getLogger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable[[Request], Response]) -> Response:
+class RequestLoggingMiddleware:
+    """Log one line per HTTP request once its response has been sent.
+
+    Pure ASGI rather than BaseHTTPMiddleware: that re-sends the response
+    through its own stream and ends it cleanly even when the app raised
+    part-way through a streamed body, so a failed export would reach the
+    client looking complete. Here the error propagates to the server, which
+    drops the connection instead.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
         start = time.perf_counter()
-        client_host = request.client.host if request.client else "-"
-        ua = request.headers.get("user-agent", "-")
-        method = request.method
-        path = request.url.path
+        client = scope.get("client")
+        client_host = client[0] if client else "-"
+        ua = "-"
+        for name, value in scope.get("headers", ()):
+            if name == b"user-agent":
+                ua = value.decode("latin-1")
+                break
+        # Set by TracingMiddleware, which wraps this one
+        trace_id = current_trace_id()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
 
         try:
-            response = await call_next(request)
-            status = response.status_code
-            return response
+            await self.app(scope, receive, send_wrapper)
         finally:
             duration_ms = (time.perf_counter() - start) * 1000.0
             logger.info(
                 "http_request",
                 extra={
-                    "method": method,
-                    "path": path,
-                    "status": locals().get("status", 500),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
                     "duration_ms": round(duration_ms, 2),
                     "client": client_host,
                     "user_agent": ua[:200],
+                    **({"trace_id": trace_id} if trace_id else {}),
                 },
             )
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+
+Frame = str
+Stack = Tuple[Frame, ...]
+
+# Leaf frames of threads parked with nothing to do: the event loop waiting in
+# select() and worker threads waiting for a job. Samples ending here are idle.
+_IDLE_LEAVES = frozenset(
+    {
+        "Condition.wait",
+        "Event.wait",
+        "Queue.get",
+        "SimpleQueue.get",
+        "EpollSelector.select",
+        "KqueueSelector.select",
+        "PollSelector.select",
+        "SelectSelector.select",
+        "DevpollSelector.select",
+    }
+)
+_MAX_DEPTH = 128
+
+
+def _frame_name(code: Any) -> Frame:
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Wall-clock sampler: snapshots every thread's Python stack each interval.
+
+    A sampler sees all threads, so it covers both async handlers on the event
+    loop and sync handlers in the threadpool. Requests running concurrently
+    with the profiled one show up in its samples too.
+    """
+
+    def __init__(self, interval_s: float) -> None:
+        super().__init__(name="profile-sampler", daemon=True)
+        self.interval_s = interval_s
+        self.stacks: Counter[Stack] = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own = threading.get_ident()
+        names: Dict[Any, Frame] = {}
+        while not self._stop_event.wait(self.interval_s):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                leaf = frame.f_code.co_qualname
+                if leaf in _IDLE_LEAVES:
+                    continue
+                stack: List[Frame] = []
+                f: Any = frame
+                while f is not None and len(stack) < _MAX_DEPTH:
+                    code = f.f_code
+                    name = names.get(code)
+                    if name is None:
+                        name = names[code] = _frame_name(code)
+                    stack.append(name)
+                    f = f.f_back
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+@dataclass
+class ProfileRecord:
+    id: str
+    method: str
+    path: str
+    query: str
+    status: int
+    duration_ms: float
+    started_at: datetime
+    interval_ms: float
+    samples: int
+    max_concurrent_requests: int
+    top: List[Dict[str, Any]] = field(default_factory=list)
+    file: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["started_at"] = self.started_at.isoformat()
+        out["file"] = os.path.basename(self.file) if self.file else None
+        return out
+
+
+def top_frames(stacks: Counter[Stack], interval_ms: float, limit: int) -> List[Dict[str, Any]]:
+    """Frames with the most samples at the leaf (self) and on the stack (total)."""
+    self_counts: Counter[Frame] = Counter()
+    total_counts: Counter[Frame] = Counter()
+    for stack, n in stacks.items():
+        self_counts[stack[-1]] += n
+        for frame in set(stack):
+            total_counts[frame] += n
+    return [
+        {
+            "frame": frame,
+            "self_ms": round(n * interval_ms, 1),
+            "total_ms": round(total_counts[frame] * interval_ms, 1),
+        }
+        for frame, n in self_counts.most_common(limit)
+    ]
+
+
+class ProfileStore:
+    """The most recent request profiles, with their folded-stack files on disk.
+
+    Only one request is profiled at a time (try_acquire), which bounds the
+    overhead to a single sampler thread. Files of evicted records are deleted.
+    """
+
+    def __init__(self, directory: Optional[str], keep: int, top: int = 15) -> None:
+        self.directory = directory
+        self.top = top
+        self._records: Deque[ProfileRecord] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+        self.profiled = 0
+        self.skipped_busy = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def try_acquire(self) -> bool:
+        if self._active.acquire(blocking=False):
+            return True
+        self.skipped_busy += 1
+        return False
+
+    def release(self) -> None:
+        self._active.release()
+
+    def add(self, record: ProfileRecord, stacks: Counter[Stack]) -> None:
+        record.top = top_frames(stacks, record.interval_ms, self.top)
+        if self.directory:
+            slug = re.sub(r"[^A-Za-z0-9]+", "_", record.path).strip("_") or "root"
+            record.file = os.path.join(self.directory, f"{record.id}-{record.method.lower()}-{slug}.folded")
+            # Folded stacks: one "root;...;leaf count" line each, readable by
+            # flamegraph.pl and speedscope
+            with open(record.file, "w", encoding="utf-8") as fh:
+                for stack, n in stacks.most_common():
+                    fh.write(";".join(stack) + f" {n}\n")
+        with self._lock:
+            if len(self._records) == self._records.maxlen:
+                self._discard(self._records[0])
+            self._records.append(record)
+            self.profiled += 1
+
+    def _discard(self, record: ProfileRecord) -> None:
+        if record.file:
+            try:
+                os.remove(record.file)
+            except OSError:
+                pass
+
+    def get(self, profile_id: str) -> Optional[ProfileRecord]:
+        with self._lock:
+            return next((r for r in self._records if r.id == profile_id), None)
+
+    def slowest(self, limit: int, path_prefix: Optional[str] = None) -> List[ProfileRecord]:
+        with self._lock:
+            records = [r for r in self._records if not path_prefix or r.path.startswith(path_prefix)]
+        records.sort(key=lambda r: r.duration_ms, reverse=True)
+        return records[:limit]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            kept = len(self._records)
+        return {"profiled": self.profiled, "skipped_busy": self.skipped_busy, "kept": kept}
+
+
+class ProfilingMiddleware:
+    """Profile a sampled fraction of requests, plus any sent with X-Profile: 1.
+
+    Only installed when PROFILE_ENABLED is set; unsampled requests pay for a
+    random() call and a header scan.
+    """
+
+    def __init__(self, app: ASGIApp, store: ProfileStore, sample_rate: float, interval_s: float) -> None:
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval_s = interval_s
+        self._inflight = 0
+
+    def _wanted(self, scope: Scope) -> bool:
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return True
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER:
+                return value.strip().lower() in (b"1", b"true", b"yes", b"on")
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self._inflight += 1
+        try:
+            if not self._wanted(scope) or not self.store.try_acquire():
+                await self.app(scope, receive, send)
+                return
+            try:
+                await self._profile(scope, receive, send)
+            finally:
+                self.store.release()
+        finally:
+            self._inflight -= 1
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profile_id = uuid.uuid4().hex[:12]
+        status = 500
+        max_inflight = self._inflight
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, max_inflight
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (PROFILE_ID_HEADER, profile_id.encode())]
+            max_inflight = max(max_inflight, self._inflight)
+            await send(message)
+
+        started_at = datetime.now(timezone.utc)
+        sampler = StackSampler(self.interval_s)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000.0
+            sampler.stop()
+            record = ProfileRecord(
+                id=profile_id,
+                method=scope["method"],
+                path=scope["path"],
+                query=scope.get("query_string", b"").decode("latin-1"),
+                status=status,
+                duration_ms=round(duration_ms, 2),
+                started_at=started_at,
+                interval_ms=self.interval_s * 1000.0,
+                samples=sampler.samples,
+                max_concurrent_requests=max_inflight,
+            )
+            # Aggregation and file IO stay off the event loop
+            await anyio.to_thread.run_sync(self.store.add, record, sampler.stacks)
+            logger.info(
+                "request_profiled",
+                extra={"profile_id": profile_id, "path": record.path, "duration_ms": record.duration_ms},
+            )
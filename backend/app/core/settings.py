@@ -1,17 +1,22 @@
 import os
+from functools import lru_cache
 from typing import List, Optional
 
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
 
-load_dotenv()
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
 
 
 class Settings(BaseModel):
     """Application settings loaded from environment variables.
 
-    Uses python-dotenv to read a local .env file if present.
+    get_settings() uses python-dotenv to read a local .env file if present.
     """
 
     app_name: str = Field(default="tic-tac-toe-backend")
@@ -20,15 +25,81 @@ class Settings(BaseModel):
     host: str = Field(default="0.0.0.0")
     port: int = Field(default=8000)
 
+    # Server (app/server.py, started by main.py)
+    web_concurrency: int = Field(default=1)  # worker processes
+    server_loop: str = Field(default="auto")  # auto picks uvloop when installed
+    server_http: str = Field(default="auto")  # auto picks httptools when installed
+    server_drain_timeout_s: float = Field(default=30.0)
+
     # CORS
     cors_origins: List[str] = Field(default_factory=lambda: ["*"])
 
     # Database
     database_url: Optional[str] = Field(default=None)
+    db_pool_size: int = Field(default=5)
+    db_max_overflow: int = Field(default=10)
+    db_pool_timeout: float = Field(default=30.0)  # seconds to wait for a pooled connection
+    db_pool_recycle: int = Field(default=1800)  # seconds; -1 disables recycling
+    db_pool_pre_ping: bool = Field(default=True)
+
+    # Request profiling (off unless PROFILE_ENABLED is set)
+    profile_enabled: bool = Field(default=False)
+    profile_sample_rate: float = Field(default=0.0)  # fraction of requests; X-Profile: 1 always profiles
+    profile_interval_ms: float = Field(default=5.0)
+    profile_dir: Optional[str] = Field(default="profiles")
+    profile_keep: int = Field(default=50)
+
+    # Request tracing (off unless TRACE_ENABLED is set)
+    trace_enabled: bool = Field(default=False)
+    trace_sample_rate: float = Field(default=0.0)  # fraction of requests; X-Trace: 1 or a sampled traceparent always traces
+    trace_keep: int = Field(default=200)
+    trace_export_path: Optional[str] = Field(default=None)  # OTLP/JSON lines file; unset keeps traces in memory only
+
+    # Traffic capture for benchmarks.replay (off unless CAPTURE_ENABLED is set)
+    capture_enabled: bool = Field(default=False)
+    capture_dir: str = Field(default="captures")  # one gzipped file per worker process
+    capture_sample_rate: float = Field(default=1.0)  # fraction of new games recorded, with all their requests
+    capture_max_games: int = Field(default=10000)  # game ids remembered per worker; older games stop being recorded
+
+    # Memory diagnostics (GET /debug/memory, tracemalloc diffs); off unless MEMORY_DEBUG_ENABLED is set
+    memory_debug_enabled: bool = Field(default=False)
+    tracemalloc_on_start: bool = Field(default=False)  # trace from startup; otherwise start it via the API
+    tracemalloc_frames: int = Field(default=1)  # frames kept per allocation; more gives tracebacks at more cost
+
+    # Strategy execution: dedicated pool and per-difficulty move budgets (0 runs inline)
+    strategy_pool: str = Field(default="thread")  # "thread" or "process"
+    strategy_workers: int = Field(default=4)
+    strategy_budget_easy_ms: float = Field(default=50.0)
+    strategy_budget_medium_ms: float = Field(default=100.0)
+    strategy_budget_hard_ms: float = Field(default=2500.0)  # keep above GEMINI_TIMEOUT_S plus GEMINI_BATCH_WINDOW_MS
+
+    # Ultimate games: HARD moves search in parallel within this budget
+    ultimate_budget_ms: float = Field(default=1000.0)
+    ultimate_search_workers: int = Field(default=1)  # search processes per web worker; 1 searches inline, 0 uses every core
+
+    # Request deadlines: the proxy's time budget, in ms the client will still wait
+    deadline_header: str = Field(default="X-Request-Timeout-Ms")  # e.g. x-envoy-expected-rq-timeout-ms behind Envoy
+    deadline_default_ms: float = Field(default=0.0)  # budget for requests without the header; 0 means none
+    deadline_reserve_ms: float = Field(default=25.0)  # kept back from AI move budgets to save and answer
+
+    # Idempotency-Key on POST /games and moves; "db" shares keys across workers and needs DATABASE_URL
+    idempotency_enabled: bool = Field(default=True)
+    idempotency_store: str = Field(default="memory")  # memory | db
+    idempotency_ttl_s: float = Field(default=86400.0)
+    idempotency_max_entries: int = Field(default=10000)  # memory store only; oldest keys go first
+    idempotency_lock_s: float = Field(default=60.0)  # a claim whose request never finished expires after this
 
     # AI
     gemini_api_key: Optional[str] = Field(default=None)
     gemini_model: str = Field(default="gemini-2.0-flash")
+    gemini_timeout_s: float = Field(default=2.0)  # per-move deadline; the heuristic answers after that
+    gemini_max_concurrency: int = Field(default=8)  # Gemini calls in flight per process; extra HARD moves fall back
+    gemini_breaker_failures: int = Field(default=5)
+    gemini_breaker_reset_s: float = Field(default=30.0)
+    gemini_batch_window_ms: float = Field(default=0.0)  # 0 disables batching of concurrent HARD moves
+    gemini_batch_max_size: int = Field(default=8)
+    # Solved-position book (app.cli.build_book) for HARD when Gemini is not configured
+    ai_book_path: Optional[str] = Field(default=None)
 
     class Config:
         extra = "ignore"
@@ -48,8 +119,62 @@ class Settings(BaseModel):
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             host=os.getenv("HOST", "0.0.0.0"),
             port=int(os.getenv("PORT", "8000")),
+            web_concurrency=int(os.getenv("WEB_CONCURRENCY", "1")),
+            server_loop=os.getenv("SERVER_LOOP", "auto"),
+            server_http=os.getenv("SERVER_HTTP", "auto"),
+            server_drain_timeout_s=float(os.getenv("SERVER_DRAIN_TIMEOUT_S", "30")),
             cors_origins=origins,
             database_url=os.getenv("DATABASE_URL"),
+            db_pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            db_pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            db_pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            db_pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+            profile_enabled=_env_bool("PROFILE_ENABLED", False),
+            profile_sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            profile_interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+            profile_dir=os.getenv("PROFILE_DIR", "profiles") or None,
+            profile_keep=int(os.getenv("PROFILE_KEEP", "50")),
+            trace_enabled=_env_bool("TRACE_ENABLED", False),
+            trace_sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0")),
+            trace_keep=int(os.getenv("TRACE_KEEP", "200")),
+            trace_export_path=os.getenv("TRACE_EXPORT_PATH") or None,
+            capture_enabled=_env_bool("CAPTURE_ENABLED", False),
+            capture_dir=os.getenv("CAPTURE_DIR", "captures"),
+            capture_sample_rate=float(os.getenv("CAPTURE_SAMPLE_RATE", "1")),
+            capture_max_games=int(os.getenv("CAPTURE_MAX_GAMES", "10000")),
+            memory_debug_enabled=_env_bool("MEMORY_DEBUG_ENABLED", False),
+            tracemalloc_on_start=_env_bool("TRACEMALLOC_ON_START", False),
+            tracemalloc_frames=int(os.getenv("TRACEMALLOC_FRAMES", "1")),
+            strategy_pool=os.getenv("STRATEGY_POOL", "thread"),
+            strategy_workers=int(os.getenv("STRATEGY_WORKERS", "4")),
+            strategy_budget_easy_ms=float(os.getenv("STRATEGY_BUDGET_EASY_MS", "50")),
+            strategy_budget_medium_ms=float(os.getenv("STRATEGY_BUDGET_MEDIUM_MS", "100")),
+            strategy_budget_hard_ms=float(os.getenv("STRATEGY_BUDGET_HARD_MS", "2500")),
+            ultimate_budget_ms=float(os.getenv("ULTIMATE_BUDGET_MS", "1000")),
+            ultimate_search_workers=int(os.getenv("ULTIMATE_SEARCH_WORKERS", "1")),
+            deadline_header=os.getenv("DEADLINE_HEADER", "X-Request-Timeout-Ms"),
+            deadline_default_ms=float(os.getenv("DEADLINE_DEFAULT_MS", "0")),
+            deadline_reserve_ms=float(os.getenv("DEADLINE_RESERVE_MS", "25")),
+            idempotency_enabled=_env_bool("IDEMPOTENCY_ENABLED", True),
+            idempotency_store=os.getenv("IDEMPOTENCY_STORE", "memory"),
+            idempotency_ttl_s=float(os.getenv("IDEMPOTENCY_TTL_S", "86400")),
+            idempotency_max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000")),
+            idempotency_lock_s=float(os.getenv("IDEMPOTENCY_LOCK_S", "60")),
             gemini_api_key=os.getenv("GEMINI_API_KEY"),
             gemini_model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash"),
+            gemini_timeout_s=float(os.getenv("GEMINI_TIMEOUT_S", "2")),
+            gemini_max_concurrency=int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+            gemini_breaker_failures=int(os.getenv("GEMINI_BREAKER_FAILURES", "5")),
+            gemini_breaker_reset_s=float(os.getenv("GEMINI_BREAKER_RESET_S", "30")),
+            gemini_batch_window_ms=float(os.getenv("GEMINI_BATCH_WINDOW_MS", "0")),
+            gemini_batch_max_size=int(os.getenv("GEMINI_BATCH_MAX_SIZE", "8")),
+            ai_book_path=os.getenv("AI_BOOK_PATH") or None,
         )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return process-wide settings, reading .env exactly once."""
+    load_dotenv()
+    return Settings.from_env()
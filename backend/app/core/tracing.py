@@ -0,0 +1,410 @@
+"""In-process tracing: nested, timed spans for sampled requests.
+
+TracingMiddleware starts a trace for a sampled request and makes its root
+span current through a context variable. span() and @traced open child
+spans under whatever span is current. Context variables follow the request
+into FastAPI's threadpool (and into the strategy pool, which copies the
+context), so handlers, services, strategies and repositories all attach to
+the same trace. An unsampled request has no current span; span() then
+returns a shared no-op after one ContextVar lookup.
+
+Finished traces are kept in a TraceStore (ring buffer, /debug/traces) and
+can also be appended to a file as OTLP/JSON, one ExportTraceServiceRequest
+per line, the format read by the OpenTelemetry Collector's otlpjsonfile
+receiver.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.background import BackgroundWriter
+
+logger = logging.getLogger(__name__)
+
+TRACE_HEADER = b"x-trace"
+TRACEPARENT_HEADER = b"traceparent"
+TRACE_ID_HEADER = b"x-trace-id"
+
+# Spans past this many in one trace are counted, not kept
+_MAX_SPANS = 256
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Trace:
+    """Spans of one request. Spans append themselves when they end, from any thread."""
+
+    __slots__ = ("trace_id", "spans", "dropped", "anchor_ns", "root")
+
+    def __init__(self, trace_id: str) -> None:
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.dropped = 0
+        # Span times are perf_counter_ns (monotonic, comparable across threads);
+        # this turns them into Unix time for export
+        self.anchor_ns = time.time_ns() - time.perf_counter_ns()
+        self.root: Optional[Span] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms if self.root else 0.0
+
+    @property
+    def started_at(self) -> datetime:
+        start = self.root.start_ns if self.root else 0
+        return datetime.fromtimestamp((self.anchor_ns + start) / 1e9, tz=timezone.utc)
+
+    def summary(self) -> Dict[str, Any]:
+        root = self.root
+        return {
+            "trace_id": self.trace_id,
+            "name": root.name if root else None,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "status": root.attributes.get("http.status_code") if root else None,
+            "spans": len(self.spans),
+            "dropped_spans": self.dropped,
+        }
+
+    def tree(self) -> Dict[str, Any]:
+        """The trace as nested spans, children in start order, times relative to the root."""
+        origin = self.root.start_ns if self.root else 0
+        nodes = {s.span_id: {**s.as_dict(origin), "children": []} for s in sorted(self.spans, key=lambda s: s.start_ns)}
+        roots: List[Dict[str, Any]] = []
+        for s in sorted(self.spans, key=lambda s: s.start_ns):
+            parent = nodes.get(s.parent_id) if s.parent_id else None
+            (parent["children"] if parent is not None else roots).append(nodes[s.span_id])
+        return {**self.summary(), "spans": roots}
+
+
+class Span:
+    """One timed operation. Use as a context manager; it becomes current inside the block."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start_ns", "end_ns", "error", "_token")
+
+    def __init__(self, trace: Trace, name: str, parent_id: Optional[str], attributes: Dict[str, Any]) -> None:
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token: Any = None
+
+    def set(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, _tb: Any) -> bool:
+        self.end_ns = time.perf_counter_ns()
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"[:200]
+        _current.reset(self._token)
+        trace = self.trace
+        if len(trace.spans) < _MAX_SPANS:
+            trace.spans.append(self)
+        else:
+            trace.dropped += 1
+        return False
+
+    def as_dict(self, origin_ns: int) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ms": round((self.start_ns - origin_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *_exc: Any) -> bool:
+        return False
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Child span of the current span, or a no-op when the request is not traced."""
+    parent = _current.get()
+    if parent is None:
+        return NOOP_SPAN
+    return Span(parent.trace, name, parent.span_id, attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+    """The current span, for adding attributes; a no-op when not traced."""
+    return _current.get() or NOOP_SPAN
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace.trace_id if current is not None else None
+
+
+def traced(name: str, **attributes: Any) -> Callable[[F], F]:
+    """Decorator: run the function inside span(name) when the request is traced."""
+
+    def decorate(fn: F) -> F:
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                parent = _current.get()
+                if parent is None:
+                    return await fn(*args, **kwargs)
+                with Span(parent.trace, name, parent.span_id, dict(attributes)):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            parent = _current.get()
+            if parent is None:
+                return fn(*args, **kwargs)
+            with Span(parent.trace, name, parent.span_id, dict(attributes)):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_json(trace: Trace, service_name: str) -> Dict[str, Any]:
+    """One trace as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for s in trace.spans:
+        out: Dict[str, Any] = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            # SPAN_KIND_SERVER for the request, SPAN_KIND_INTERNAL below it
+            "kind": 2 if s is trace.root else 1,
+            "startTimeUnixNano": str(trace.anchor_ns + s.start_ns),
+            "endTimeUnixNano": str(trace.anchor_ns + s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            # STATUS_CODE_ERROR, or STATUS_CODE_UNSET
+            "status": {"code": 2, "message": s.error} if s.error else {},
+        }
+        if s.parent_id:
+            out["parentSpanId"] = s.parent_id
+        spans.append(out)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+            }
+        ]
+    }
+
+
+class OTLPFileExporter(BackgroundWriter):
+    """Append traces to a file as OTLP/JSON lines from a background thread.
+
+    export() only enqueues, so the request path never waits on encoding or
+    disk. Workers share the file; each line is a single append, so lines
+    never interleave.
+    """
+
+    thread_name = "trace-exporter"
+
+    def __init__(self, path: str, service_name: str, max_queue: int = 1000) -> None:
+        super().__init__(max_queue)
+        self.path = path
+        self.service_name = service_name
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.exported = 0
+
+    def export(self, trace: Trace) -> None:
+        self.put(trace)
+
+    def _run(self, q: "queue.Queue[Optional[Trace]]") -> None:
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            while True:
+                trace = q.get()
+                if trace is None:
+                    return
+                try:
+                    line = json.dumps(otlp_json(trace, self.service_name), separators=(",", ":")) + "\n"
+                    os.write(fd, line.encode("utf-8"))
+                    self.exported += 1
+                except Exception:
+                    logger.exception("trace_export_failed")
+        finally:
+            os.close(fd)
+
+
+class TraceStore:
+    """The most recent finished traces, plus the optional file exporter."""
+
+    def __init__(self, keep: int, exporter: Optional[OTLPFileExporter] = None) -> None:
+        self._traces: Deque[Trace] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self.exporter = exporter
+        self.traced = 0
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces.append(trace)
+            self.traced += 1
+        if self.exporter is not None:
+            self.exporter.export(trace)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            return next((t for t in self._traces if t.trace_id == trace_id), None)
+
+    def recent(self, limit: int, min_duration_ms: float = 0.0, path_prefix: Optional[str] = None) -> List[Trace]:
+        with self._lock:
+            traces = list(self._traces)
+        out = []
+        for t in reversed(traces):
+            if t.duration_ms < min_duration_ms:
+                continue
+            if path_prefix and not str(t.root.attributes.get("http.target", "") if t.root else "").startswith(path_prefix):
+                continue
+            out.append(t)
+            if len(out) >= limit:
+                break
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            kept = len(self._traces)
+        out: Dict[str, Any] = {"traced": self.traced, "kept": kept}
+        if self.exporter is not None:
+            out.update(exported=self.exporter.exported, export_dropped=self.exporter.dropped)
+        return out
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def _parse_traceparent(value: bytes) -> Optional[Tuple[str, str, bool]]:
+    # W3C Trace Context: version-traceid-parentid-flags
+    parts = value.decode("latin-1").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+class TracingMiddleware:
+    """Trace a sampled fraction of requests, plus any sent with X-Trace: 1 or
+    a sampled W3C traceparent (whose trace id is then kept).
+
+    Only installed when TRACE_ENABLED is set.
+    """
+
+    def __init__(self, app: ASGIApp, store: TraceStore, sample_rate: float) -> None:
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+
+    def _sampled(self, scope: Scope) -> Tuple[Optional[str], Optional[str]]:
+        """(trace id, remote parent span id) when the request is traced, else (None, None)."""
+        forced = False
+        remote: Optional[Tuple[str, str, bool]] = None
+        for name, value in scope.get("headers", ()):
+            if name == TRACEPARENT_HEADER:
+                remote = _parse_traceparent(value)
+            elif name == TRACE_HEADER:
+                forced = value.strip().lower() in (b"1", b"true", b"yes", b"on")
+        if remote is not None and remote[2]:
+            return remote[0], remote[1]
+        if forced or (self.sample_rate > 0 and random.random() < self.sample_rate):
+            if remote is not None:
+                return remote[0], remote[1]
+            return os.urandom(16).hex(), None
+        return None, None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trace_id, parent_id = self._sampled(scope)
+        if trace_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(trace_id)
+        root = Span(trace, f"{scope['method']} {scope['path']}", parent_id, {"http.method": scope["method"], "http.target": scope["path"]})
+        trace.root = root
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = [*message.get("headers", []), (TRACE_ID_HEADER, trace_id.encode())]
+            await send(message)
+
+        try:
+            with root:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            if route is not None and getattr(route, "path", None):
+                # The route template groups traces of the same endpoint
+                root.name = f"{scope['method']} {route.path}"
+            root.set("http.status_code", status)
+            self.store.add(trace)
@@ -3,12 +3,15 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import List, Optional
 
-from sqlalchemy import DateTime, Integer, String
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, LargeBinary, SmallInteger, String
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
 
+# Postgres integer array; JSON list on SQLite (local runs, bulk-import tests)
+MovesType = ARRAY(Integer).with_variant(JSON(), "sqlite")
+
 
 class GameModel(Base):
     __tablename__ = "games"
@@ -16,8 +19,8 @@ class GameModel(Base):
     # Use string UUIDs for portability
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
 
-    # Board stored as 9-character string with 'x', 'o', ' '
-    board: Mapped[str] = mapped_column(String(9), nullable=False)
+    # Board stored as 9-character string with 'x', 'o', ' ' (81 for ultimate games)
+    board: Mapped[str] = mapped_column(String(81), nullable=False)
 
     next_player: Mapped[str] = mapped_column(String(1), nullable=False)  # 'x' | 'o'
     difficulty: Mapped[str] = mapped_column(String(16), nullable=False)  # easy|medium|hard
@@ -26,8 +29,73 @@ class GameModel(Base):
     human_symbol: Mapped[str] = mapped_column(String(1), nullable=False)
     computer_symbol: Mapped[str] = mapped_column(String(1), nullable=False)
 
-    # Moves in numpad positions (1..9)
-    moves: Mapped[Optional[List[int]]] = mapped_column(ARRAY(Integer), nullable=True, default=list)
+    mode: Mapped[str] = mapped_column(String(16), nullable=False, default="classic", server_default="classic")  # classic|ultimate
+
+    # Moves in numpad positions (1..9); board * 10 + cell for ultimate games
+    moves: Mapped[Optional[List[int]]] = mapped_column(MovesType, nullable=True, default=list)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Status filters and "finished before T" scans (archival, exports)
+        Index("ix_games_status_updated_at", "status", "updated_at"),
+        # Keyset pagination for GET /games, newest first, optionally per status
+        Index("ix_games_created_at_id", "created_at", "id"),
+        Index("ix_games_status_created_at_id", "status", "created_at", "id"),
+    )
+
+
+class GameArchiveModel(Base):
+    """Finished games moved out of the hot games table by app.cli.archive_games.
+
+    Compact: next_player and computer_symbol are derivable from the final
+    board, moves and human_symbol. With GAMES_ARCHIVE_PARTITIONED the table is
+    range-partitioned by finished_at on PostgreSQL (see the migration).
+    """
+
+    __tablename__ = "games_archive"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    board: Mapped[str] = mapped_column(String(9), nullable=False)
+    difficulty: Mapped[str] = mapped_column(String(16), nullable=False)
+    status: Mapped[str] = mapped_column(String(32), nullable=False)
+    human_symbol: Mapped[str] = mapped_column(String(1), nullable=False)
+    moves: Mapped[Optional[List[int]]] = mapped_column(MovesType, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class GameOutcomeStatModel(Base):
+    """Rollup of finished games, incremented when a game reaches a terminal status.
+
+    One row per dimension combination (at most a few hundred rows), so stats
+    reads never scan the games table.
+    """
+
+    __tablename__ = "game_outcome_stats"
+
+    difficulty: Mapped[str] = mapped_column(String(16), primary_key=True)
+    first_player: Mapped[str] = mapped_column(String(8), primary_key=True)  # human|computer
+    human_symbol: Mapped[str] = mapped_column(String(1), primary_key=True)
+    opening_move: Mapped[int] = mapped_column(SmallInteger, primary_key=True)  # numpad 1..9
+    result: Mapped[str] = mapped_column(String(8), primary_key=True)  # win|draw|loss (human view)
+
+    games: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class IdempotencyKeyModel(Base):
+    """Stored responses for Idempotency-Key replays (IDEMPOTENCY_STORE=db).
+
+    A row with a null status_code is a claim held by a request still running.
+    Expired rows are reclaimed on reuse and purged by the store.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 of method, path and Idempotency-Key
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)  # sha256 of the request
+    status_code: Mapped[Optional[int]] = mapped_column(SmallInteger, nullable=True)
+    content_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    body: Mapped[Optional[bytes]] = mapped_column(LargeBinary, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
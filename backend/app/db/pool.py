@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Number of recent checkout waits kept for percentile estimates
+_WAIT_WINDOW = 1024
+
+
+class PoolMetrics:
+    """Connection pool usage for sizing pools against Postgres max_connections.
+
+    In-use counts come from pool checkout/checkin events. Checkout wait is
+    measured by the session dependencies around the first connection
+    acquisition, so it includes pre-ping when that is enabled.
+    """
+
+    def __init__(self, engine: Engine, *, pool_size: int, max_overflow: int) -> None:
+        self._engine = engine
+        self._capacity = pool_size + max(max_overflow, 0)
+        self._pool_size = pool_size
+        self._max_overflow = max_overflow
+        self._lock = Lock()
+        self._in_use = 0
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_count = 0
+        self._wait_total_s = 0.0
+        self._wait_max_s = 0.0
+        self._waits: Deque[float] = deque(maxlen=_WAIT_WINDOW)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_checkout(self, _dbapi_conn: Any, _record: Any, _proxy: Any) -> None:
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            if self._in_use > self._peak_in_use:
+                self._peak_in_use = self._in_use
+
+    def _on_checkin(self, _dbapi_conn: Any, _record: Any) -> None:
+        with self._lock:
+            self._in_use = max(self._in_use - 1, 0)
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self._wait_count += 1
+            self._wait_total_s += seconds
+            if seconds > self._wait_max_s:
+                self._wait_max_s = seconds
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self._timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            observed = len(waits)
+            in_use = self._in_use
+            data: Dict[str, Any] = {
+                "pool_size": self._pool_size,
+                "max_overflow": self._max_overflow,
+                "in_use": in_use,
+                "peak_in_use": self._peak_in_use,
+                "utilization": round(in_use / self._capacity, 4) if self._capacity else None,
+                "checkouts": self._checkouts,
+                "checkout_timeouts": self._timeouts,
+                "checkout_wait_ms": {
+                    "avg": round(self._wait_total_s / max(self._wait_count, 1) * 1000, 3),
+                    "p50": round(waits[observed // 2] * 1000, 3) if waits else 0.0,
+                    "p99": round(waits[min(observed - 1, observed * 99 // 100)] * 1000, 3) if waits else 0.0,
+                    "max": round(self._wait_max_s * 1000, 3),
+                },
+            }
+        data["pool_status"] = self._engine.pool.status()
+        return data
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
+import time
 from typing import Generator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.deadline import Deadline
 from app.core.settings import Settings
+from app.core.tracing import span
+from app.db.pool import PoolMetrics
 import logging
 
-settings = Settings.from_env()
 logger = logging.getLogger(__name__)
 
 def _normalize_url(url: str) -> str:
@@ -17,24 +21,69 @@ def _normalize_url(url: str) -> str:
         return url.replace("postgres://", "postgresql+psycopg2://", 1)
     return url
 
-_engine = create_engine(_normalize_url(settings.database_url)) if settings.database_url else None
-_SessionLocal = sessionmaker(bind=_engine, autocommit=False, autoflush=False) if _engine else None
 
-
-def get_engine():
-    if _engine is None:
+def build_engine(settings: Settings) -> Engine:
+    if not settings.database_url:
         raise RuntimeError("DATABASE_URL not configured; engine is unavailable")
-    return _engine
+    url = _normalize_url(settings.database_url)
+    options = {"pool_pre_ping": settings.db_pool_pre_ping}
+    # SQLite (local runs) uses single-connection pools that reject sizing options
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    return create_engine(url, **options)
+
+
+def build_session_factory(engine: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
 
-def get_session() -> Generator[Session, None, None]:
-    if _SessionLocal is None:
-        raise RuntimeError("DATABASE_URL not configured; cannot create DB session")
-    db: Session = _SessionLocal()
+def _checkout(db: Session, pool_metrics: Optional[PoolMetrics]) -> None:
+    # Acquire the connection up front so pool wait time is measured per request
+    if pool_metrics is None:
+        return
+    start = time.perf_counter()
+    try:
+        with span("db.checkout"):
+            db.connection()
+    except PoolTimeoutError:
+        pool_metrics.observe_timeout()
+        raise
+    pool_metrics.observe_wait(time.perf_counter() - start)
+
+
+def _apply_deadline(db: Session, deadline: Optional[Deadline]) -> None:
+    """Bound every statement of the transaction by the time the request has left.
+
+    PostgreSQL only: a transaction-local statement_timeout, so a query still
+    running when the client gives up is cancelled server-side. Elsewhere the
+    service checkpoints are the only bound.
+    """
+    if deadline is None or db.get_bind().dialect.name != "postgresql":
+        return
+    deadline.check("db")
+    ms = max(1, int(deadline.remaining() * 1000))
+    db.execute(text("SELECT set_config('statement_timeout', :ms, true)"), {"ms": str(ms)})
+
+
+def get_session(
+    session_factory: sessionmaker[Session],
+    pool_metrics: Optional[PoolMetrics] = None,
+    deadline: Optional[Deadline] = None,
+) -> Generator[Session, None, None]:
+    db: Session = session_factory()
     try:
         logger.debug("db_session_opened")
+        _checkout(db, pool_metrics)
+        _apply_deadline(db, deadline)
         yield db
-        db.commit()
+        # Pending INSERT/UPDATEs are flushed here, so this span includes them
+        with span("db.commit"):
+            db.commit()
         logger.debug("db_session_committed")
     except Exception:
         logger.exception("db_session_error")
@@ -44,3 +93,24 @@ def get_session() -> Generator[Session, None, None]:
     finally:
         db.close()
         logger.debug("db_session_closed")
+
+
+def get_read_session(
+    session_factory: sessionmaker[Session],
+    pool_metrics: Optional[PoolMetrics] = None,
+    deadline: Optional[Deadline] = None,
+) -> Generator[Session, None, None]:
+    """Session for pure reads: never flushes or commits.
+
+    close() returns the connection with a rollback, which ends the implicit
+    read transaction without a COMMIT round trip.
+    """
+    db: Session = session_factory(autoflush=False)
+    try:
+        logger.debug("db_read_session_opened")
+        _checkout(db, pool_metrics)
+        _apply_deadline(db, deadline)
+        yield db
+    finally:
+        db.close()
+        logger.debug("db_read_session_closed")
@@ -10,7 +10,8 @@ class Strategy(ABC):
     """Strategy interface for AI players.
 
     select_move returns the external position (1..9, numpad layout)
-    where the AI intends to play.
+    where the AI intends to play. Strategies for ultimate games take an
+    UltimateBoard and return board * 10 + cell instead.
     """
 
     @abstractmethod
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Generic, List, Optional, TypeVar
+
+from app.core.tracing import span
+from app.domain.ai.gemini import GeminiStrategy, ModelFactory, genai_model_factory
+from app.domain.ai.resilience import UpstreamLimits, UpstreamTimeout
+from app.domain.board import Board
+from app.domain.enums import Player
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Output budget per position in a batched answer: {"id": 12, "position": 5},
+_TOKENS_PER_ITEM = 16
+
+
+@dataclass
+class _Pending(Generic[T, R]):
+    item: T
+    future: "Future[R]" = field(default_factory=Future)
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collect items submitted from many threads into small batches.
+
+    A collector thread waits for the first item, then keeps collecting for
+    up to window_s or until max_size items are pending, and hands the batch
+    to handler on a dispatch pool. handler must resolve every future in the
+    batch (result or exception).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[_Pending[T, R]]], None],
+        window_s: float,
+        max_size: int,
+        workers: int,
+        name: str = "batcher",
+    ) -> None:
+        self.window_s = window_s
+        self.max_size = max_size
+        self._handler = handler
+        self._queue: "queue.SimpleQueue[_Pending[T, R]]" = queue.SimpleQueue()
+        self._dispatch = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-dispatch")
+        self._collector = threading.Thread(target=self._collect, name=f"{name}-collector", daemon=True)
+        self._start_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+    def submit(self, item: T) -> "Future[R]":
+        if not self._collector.is_alive():
+            with self._start_lock:
+                if not self._collector.is_alive():
+                    self._collector.start()
+        pending: _Pending[T, R] = _Pending(item)
+        self._queue.put(pending)
+        return pending.future
+
+    def _collect(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window_s
+            while len(batch) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.largest = max(self.largest, len(batch))
+            self._dispatch.submit(self._run, batch)
+
+    def _run(self, batch: List[_Pending[T, R]]) -> None:
+        try:
+            self._handler(batch)
+        except Exception as e:
+            for p in batch:
+                if not p.future.done():
+                    p.future.set_exception(e)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            batches, items, largest = self.batches, self.items, self.largest
+        return {
+            "batches": batches,
+            "batched_items": items,
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "largest_batch": largest,
+            "window_ms": self.window_s * 1000.0,
+            "max_batch_size": self.max_size,
+        }
+
+
+@dataclass(frozen=True)
+class _Position:
+    board: Board
+    me: Player
+
+
+class BatchingGeminiStrategy(GeminiStrategy):
+    """GeminiStrategy that asks for several games' moves in one upstream call.
+
+    Concurrent HARD moves are gathered by a MicroBatcher and sent as one
+    prompt that asks for a JSON array of moves. Each answer then goes through
+    the usual validation and guardrails for its own game. The batch is one
+    call as far as the concurrency limit, deadline and breaker are concerned.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        model: str = "gemini-2.0-flash",
+        limits: Optional[UpstreamLimits] = None,
+        model_factory: ModelFactory = genai_model_factory,
+    ) -> None:
+        super().__init__(api_key, model=model, limits=limits, model_factory=model_factory)
+        self._batcher: MicroBatcher[_Position, Optional[int]] = MicroBatcher(
+            self._run_batch,
+            window_s=self.limits.batch_window_s,
+            max_size=self.limits.batch_max_size,
+            workers=self.limits.max_concurrency,
+            name="gemini-batch",
+        )
+
+    def _model_position(self, board: Board, me: Player) -> Optional[int]:
+        # Covers the batching window and the shared upstream call
+        with span("gemini.batch", model=self.model_name):
+            future = self._batcher.submit(_Position(board, me))
+            # The batch may wait out the window before its call starts
+            wait_s = self.limits.batch_window_s + self.limits.timeout_s + 0.5
+            if self.limits.move_budget_s > 0:
+                # The executor gives up on the move then; waiting longer only holds its worker
+                wait_s = min(wait_s, self.limits.move_budget_s)
+            try:
+                return future.result(timeout=wait_s)
+            except TimeoutError:
+                raise UpstreamTimeout()
+
+    def _build_batch_prompt(self, positions: List[_Position]) -> str:
+        items = [
+            {
+                "id": i,
+                "board": p.board.to_string(),
+                "to_play": p.me.value,
+                "available": p.board.available_positions(),
+            }
+            for i, p in enumerate(positions)
+        ]
+        prompt = (
+            "You are a perfect Tic-Tac-Toe engine. For each position below, choose the best move "
+            "for the side in to_play.\n"
+            "Boards are 9-char strings in NUMPAD order (rows: 7 8 9 / 4 5 6 / 1 2 3).\n"
+            "Each char is 'x', 'o', or space for empty.\n\n"
+            "Positions (JSON):\n"
+            f"{json.dumps(items, separators=(',', ':'))}\n\n"
+            "Respond ONLY as a JSON array with one object per position and nothing else:\n"
+            "[{\"id\": <id>, \"position\": <integer 1..9 from that position's available list>}]\n"
+        )
+        return prompt.strip()
+
+    @staticmethod
+    def _parse_batch(text: str) -> Dict[int, int]:
+        try:
+            data = json.loads(text)
+        except Exception:
+            return {}
+        if isinstance(data, dict):
+            # Some answers wrap the array, e.g. {"moves": [...]}
+            data = next((v for v in data.values() if isinstance(v, list)), [])
+        out: Dict[int, int] = {}
+        if isinstance(data, list):
+            for entry in data:
+                if isinstance(entry, dict) and isinstance(entry.get("id"), int) and isinstance(entry.get("position"), int):
+                    out[entry["id"]] = entry["position"]
+        return out
+
+    def _run_batch(self, batch: List[_Pending[_Position, Optional[int]]]) -> None:
+        # Games in the same position share one slot in the prompt
+        unique: Dict[_Position, int] = {}
+        for p in batch:
+            unique.setdefault(p.item, len(unique))
+        positions = list(unique)
+        try:
+            text = self._guard.call(
+                self._generate,
+                self._build_batch_prompt(positions),
+                _TOKENS_PER_ITEM * len(positions) + 16,
+            )
+        except Exception as e:
+            for p in batch:
+                p.future.set_exception(e)
+            return
+        logger.info("gemini_batch_response", extra={"size": len(positions), "text": text[:200]})
+        answers = self._parse_batch(text)
+        for p in batch:
+            # Missing or invalid answers become None; _guarded falls back per game
+            p.future.set_result(answers.get(unique[p.item]))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**super().snapshot(), "batching": self._batcher.snapshot()}
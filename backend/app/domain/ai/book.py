@@ -0,0 +1,386 @@
+"""Solved-position books for n x n, k-in-a-row variants.
+
+A book maps canonical positions (one per symmetry class) reachable from
+the empty board to their value under perfect play. The solver stops at a
+win in one, so positions only reachable past a missed win are left out;
+BookStrategy searches those. Books are built
+offline by app.cli.build_book, because 4x4 and larger boards take far too
+long to solve at startup. At runtime they are opened with mmap: opening
+reads a 32-byte header, and every worker process maps the same page-cache
+pages instead of holding a private table.
+
+File layout, version 1, little-endian:
+
+    header  32 bytes     magic, version, size, k, max_plies, flags, count
+    keys    count x u64  canonical position keys, sorted ascending
+    values  count x u16  (value + 1) << 8 | plies to the end
+
+Positions are bitmasks with cell r * size + c at bit r * size + c, i.e.
+row-major from the top left. That is also the order of the 3x3 Board's
+state string (7 8 9 / 4 5 6 / 1 2 3).
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.tracing import current_span, traced
+from app.domain.ai.base import Strategy
+from app.domain.ai.solver import DRAW, LOSS, WIN, _better
+from app.domain.board import INDEX_TO_EXTERNAL, Board
+from app.domain.enums import Player
+
+MAGIC = b"TTTBOOK\x00"
+VERSION = 1
+_HEADER = struct.Struct("<8sHBBBB2xQ8x")
+assert _HEADER.size == 32
+
+# Square boards: identity, three rotations, four reflections
+_SYMMETRIES: Tuple[Callable[[int, int, int], Tuple[int, int]], ...] = (
+    lambda r, c, n: (r, c),
+    lambda r, c, n: (c, n - 1 - r),
+    lambda r, c, n: (n - 1 - r, n - 1 - c),
+    lambda r, c, n: (n - 1 - c, r),
+    lambda r, c, n: (r, n - 1 - c),
+    lambda r, c, n: (n - 1 - r, c),
+    lambda r, c, n: (c, r),
+    lambda r, c, n: (n - 1 - c, n - 1 - r),
+)
+
+
+def encode_value(value: int, dist: int) -> int:
+    return (value + 1) << 8 | dist
+
+
+def decode_value(code: int) -> Tuple[int, int]:
+    return (code >> 8) - 1, code & 0xFF
+
+
+class Variant:
+    """Geometry of one n x n board with k in a row to win: lines and symmetry keys."""
+
+    def __init__(self, size: int, k: int) -> None:
+        if not 3 <= size <= 8:
+            raise ValueError("size must be between 3 and 8")
+        if not 3 <= k <= size:
+            raise ValueError("k must be between 3 and size")
+        self.size = size
+        self.k = k
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.lines = self._lines()
+        self.lines_by_cell = tuple(tuple(line for line in self.lines if line >> c & 1) for c in range(self.cells))
+        # Per symmetry, one 256-entry table per byte of the mask: a transform
+        # is a handful of lookups instead of a loop over cells
+        chunks = (self.cells + 7) // 8
+        self._tables = tuple(self._byte_tables(sym, chunks) for sym in _SYMMETRIES)
+        # Up to 5x5 both masks and the side to move fit in 64 bits, so the
+        # key is the canonical position itself; larger boards hash it
+        self.exact_keys = 2 * self.cells + 1 <= 64
+
+    @property
+    def name(self) -> str:
+        return f"{self.size}x{self.size}-k{self.k}"
+
+    def _lines(self) -> Tuple[int, ...]:
+        n, k = self.size, self.k
+        out: List[int] = []
+        for r in range(n):
+            for c in range(n):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < n and 0 <= end_c < n:
+                        out.append(sum(1 << ((r + dr * i) * n + c + dc * i) for i in range(k)))
+        return tuple(out)
+
+    def _byte_tables(self, sym: Callable[[int, int, int], Tuple[int, int]], chunks: int) -> Tuple[Tuple[int, ...], ...]:
+        n = self.size
+        dest = []
+        for cell in range(self.cells):
+            r, c = sym(cell // n, cell % n, n)
+            dest.append(r * n + c)
+        tables = []
+        for chunk in range(chunks):
+            table = []
+            for byte in range(256):
+                out = 0
+                for bit in range(8):
+                    cell = chunk * 8 + bit
+                    if byte >> bit & 1 and cell < self.cells:
+                        out |= 1 << dest[cell]
+                table.append(out)
+            tables.append(tuple(table))
+        return tuple(tables)
+
+    def key(self, x: int, o: int, o_to_move: bool) -> int:
+        """Key shared by every symmetric image of the position."""
+        best = -1
+        for tables in self._tables:
+            tx = to = shift = 0
+            for table in tables:
+                tx |= table[x >> shift & 0xFF]
+                to |= table[o >> shift & 0xFF]
+                shift += 8
+            packed = tx << self.cells | to
+            if best < 0 or packed < best:
+                best = packed
+        best |= int(o_to_move) << (2 * self.cells)
+        if self.exact_keys:
+            return best
+        raw = best.to_bytes((2 * self.cells + 8) // 8, "little")
+        return int.from_bytes(blake2b(raw, digest_size=8).digest(), "little")
+
+    def wins(self, mask: int, cell: int) -> bool:
+        """Whether mask has k in a row through cell (the stone just placed)."""
+        return any(mask & line == line for line in self.lines_by_cell[cell])
+
+    def center_distance(self, cell: int) -> float:
+        mid = (self.size - 1) / 2
+        return abs(cell // self.size - mid) + abs(cell % self.size - mid)
+
+
+@lru_cache(maxsize=None)
+def variant(size: int, k: int) -> Variant:
+    return Variant(size, k)
+
+
+class SearchBudgetExceeded(Exception):
+    """The fallback search visited more positions than it was allowed."""
+
+
+class Search:
+    """Exact negamax over canonical positions, memoised per instance.
+
+    Used offline to build books (no book, no node limit) and at runtime for
+    positions missing from a book, where node_limit bounds the work and the
+    book answers any position it does contain.
+    """
+
+    def __init__(
+        self,
+        variant: Variant,
+        book: Optional["Book"] = None,
+        node_limit: Optional[int] = None,
+        record_plies: Optional[int] = None,
+    ) -> None:
+        self.variant = variant
+        self.book = book
+        self.node_limit = node_limit
+        self.memo: Dict[int, int] = {}
+        self.nodes = 0
+        # Builder only: keys of positions with at most this many stones
+        self.record_plies = record_plies
+        self.recorded: Dict[int, int] = {}
+
+    def value(self, mine: int, theirs: int, o_to_move: bool) -> int:
+        """Encoded (value, plies to the end) for the side to move, whose stones are mine."""
+        x, o = (theirs, mine) if o_to_move else (mine, theirs)
+        key = self.variant.key(x, o, o_to_move)
+        hit = self.memo.get(key)
+        if hit is not None:
+            return hit
+        if self.book is not None:
+            code = self.book.get(key)
+            if code is not None:
+                return code
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchBudgetExceeded()
+        v = self.variant
+        occupied = mine | theirs
+        empty = v.full & ~occupied
+        best = (LOSS - 1, 0)
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            child = mine | bit
+            if v.wins(child, bit.bit_length() - 1):
+                outcome = (WIN, 1)
+            elif child | theirs == v.full:
+                outcome = (DRAW, 1)
+            else:
+                child_value, child_dist = decode_value(self.value(theirs, child, not o_to_move))
+                outcome = (-child_value, child_dist + 1)
+            if _better(outcome, best):
+                best = outcome
+                if outcome == (WIN, 1):
+                    break
+        code = encode_value(*best) if best[0] >= LOSS else encode_value(DRAW, 0)
+        self.memo[key] = code
+        if self.record_plies is not None and bin(occupied).count("1") <= self.record_plies:
+            self.recorded[key] = code
+        return code
+
+
+def build(variant: Variant, max_plies: Optional[int] = None) -> Tuple[Dict[int, int], Search]:
+    """Solve the variant from the empty board for either first player.
+
+    Returns the entries to write (positions with at most max_plies stones,
+    all of them when None) and the search, for its statistics.
+    """
+    search = Search(variant, record_plies=max_plies if max_plies is not None else variant.cells)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, variant.cells * 4 + 100))
+    try:
+        for o_first in (False, True):
+            search.value(0, 0, o_first)
+    finally:
+        sys.setrecursionlimit(limit)
+    return search.recorded, search
+
+
+def write_book(path: str, variant: Variant, entries: Dict[int, int], max_plies: Optional[int] = None) -> int:
+    """Write entries as a version-1 book; returns the file size in bytes."""
+    keys = sorted(entries)
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        variant.size,
+        variant.k,
+        variant.cells if max_plies is None else max_plies,
+        int(variant.exact_keys),
+        len(keys),
+    )
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(header)
+        fh.write(struct.pack(f"<{len(keys)}Q", *keys))
+        fh.write(struct.pack(f"<{len(keys)}H", *(entries[k] for k in keys)))
+    # Readers never see a half-written book
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+class Book:
+    """Read-only, memory-mapped book. Lookups are a binary search over the mapped keys."""
+
+    def __init__(self, path: str) -> None:
+        if sys.byteorder != "little":
+            raise ValueError("books are little-endian and are read in place")
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mm) < _HEADER.size:
+                raise ValueError(f"{path}: not a book")
+            magic, version, size, k, max_plies, _flags, count = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: not a book")
+            if version != VERSION:
+                raise ValueError(f"{path}: book version {version}, expected {VERSION}")
+            if len(self._mm) != _HEADER.size + count * 10:
+                raise ValueError(f"{path}: truncated book")
+        except Exception:
+            self._mm.close()
+            raise
+        if hasattr(self._mm, "madvise"):
+            # Lookups jump around the file; readahead would only waste page cache
+            self._mm.madvise(mmap.MADV_RANDOM)
+        self.variant = variant(size, k)
+        self.max_plies = max_plies
+        view = memoryview(self._mm)
+        keys_end = _HEADER.size + count * 8
+        self._keys = view[_HEADER.size : keys_end].cast("Q")
+        self._values = view[keys_end:].cast("H")
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, key: int) -> Optional[int]:
+        """Encoded value for a position key, or None when it is not in the book."""
+        i = bisect_left(self._keys, key)
+        if i < self._count and self._keys[i] == key:
+            return self._values[i]
+        return None
+
+    def lookup(self, x: int, o: int, o_to_move: bool) -> Optional[Tuple[int, int]]:
+        code = self.get(self.variant.key(x, o, o_to_move))
+        return decode_value(code) if code is not None else None
+
+    def close(self) -> None:
+        self._keys.release()
+        self._values.release()
+        self._mm.close()
+
+
+@lru_cache(maxsize=None)
+def open_book(path: str) -> Book:
+    """The process-wide Book for path; opened once, shared by every strategy."""
+    return Book(path)
+
+
+class BookStrategy(Strategy):
+    """Perfect play from a book, with a bounded search for positions it lacks.
+
+    best_cell works on any variant. select_move adapts the 3x3 Board and so
+    needs a 3x3, three-in-a-row book. When the search runs out of budget the
+    move is chosen by a win/block/centre heuristic.
+    """
+
+    def __init__(self, book: Book, node_limit: int = 200_000) -> None:
+        self.book = book
+        self.variant = book.variant
+        self.node_limit = node_limit
+
+    def evaluate(self, x: int, o: int, o_to_move: bool) -> List[Tuple[int, int, int]]:
+        """(cell, value for the side to move, plies to the end) for each legal move."""
+        v = self.variant
+        mine, theirs = (o, x) if o_to_move else (x, o)
+        search = Search(v, book=self.book, node_limit=self.node_limit)
+        out: List[Tuple[int, int, int]] = []
+        empty = v.full & ~(mine | theirs)
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            cell = bit.bit_length() - 1
+            child = mine | bit
+            if v.wins(child, cell):
+                value, dist = WIN, 1
+            elif child | theirs == v.full:
+                value, dist = DRAW, 1
+            else:
+                child_value, child_dist = decode_value(search.value(theirs, child, not o_to_move))
+                value, dist = -child_value, child_dist + 1
+            out.append((cell, value, dist))
+        return out
+
+    def best_cell(self, x: int, o: int, o_to_move: bool) -> int:
+        try:
+            evaluated = self.evaluate(x, o, o_to_move)
+        except SearchBudgetExceeded:
+            current_span().set("search_budget_exceeded", True)
+            return self._heuristic_cell(x, o, o_to_move)
+        if not evaluated:
+            raise RuntimeError("No available moves")
+        best = evaluated[0]
+        for candidate in evaluated[1:]:
+            if _better(candidate[1:], best[1:]):
+                best = candidate
+        return best[0]
+
+    def _heuristic_cell(self, x: int, o: int, o_to_move: bool) -> int:
+        v = self.variant
+        mine, theirs = (o, x) if o_to_move else (x, o)
+        legal = [c for c in range(v.cells) if not (mine | theirs) >> c & 1]
+        for stones in (mine, theirs):
+            for cell in legal:
+                if v.wins(stones | 1 << cell, cell):
+                    return cell
+        return min(legal, key=v.center_distance)
+
+    @traced("strategy.book")
+    def select_move(self, board: Board, me: Player) -> int:
+        x = o = 0
+        for idx, cell in enumerate(board.state):
+            if cell == "x":
+                x |= 1 << idx
+            elif cell == "o":
+                o |= 1 << idx
+        return INDEX_TO_EXTERNAL[self.best_cell(x, o, me is Player.O)]
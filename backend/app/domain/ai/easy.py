@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import random
 
+from app.core.tracing import traced
 from app.domain.board import Board
 from app.domain.enums import Player
 from app.domain.ai.base import Strategy
 
 
 class RandomStrategy(Strategy):
+    @traced("strategy.random")
     def select_move(self, board: Board, me: Player) -> int:
         choices = board.available_positions()
         if not choices:
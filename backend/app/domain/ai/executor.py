@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core.deadline import Deadline
+from app.core.tracing import current_span, span
+from app.domain.ai.factory import strategy_for
+from app.domain.ai.pool import WorkerPool
+from app.domain.ai.resilience import UpstreamLimits
+from app.domain.board import Board
+from app.domain.enums import Difficulty, Player
+
+logger = logging.getLogger(__name__)
+
+# Where a move goes when its strategy misses the budget or fails
+CHEAPER: Dict[Difficulty, Optional[Difficulty]] = {
+    Difficulty.HARD: Difficulty.MEDIUM,
+    Difficulty.MEDIUM: Difficulty.EASY,
+    Difficulty.EASY: None,
+}
+
+
+@dataclass(frozen=True)
+class StrategyOptions:
+    """Everything needed to build a strategy, picklable for process workers."""
+
+    gemini_api_key: Optional[str] = None
+    gemini_model: str = "gemini-2.0-flash"
+    gemini_limits: Optional[UpstreamLimits] = None
+    book_path: Optional[str] = None
+
+    def strategy(self, difficulty: Difficulty) -> Any:
+        return strategy_for(
+            difficulty,
+            gemini_api_key=self.gemini_api_key,
+            gemini_model=self.gemini_model,
+            gemini_limits=self.gemini_limits,
+            book_path=self.book_path,
+        )
+
+
+def _warm_worker() -> None:
+    from app.domain.ai.solver import solved_table
+    from app.domain.board import preload_boards
+
+    solved_table()
+    preload_boards()
+
+
+def _select_in_worker(options: StrategyOptions, difficulty: Difficulty, state: str, me: Player) -> int:
+    # Runs in a pool process; strategy_for is cached per process
+    return options.strategy(difficulty).select_move(Board.from_string(state), me)
+
+
+@dataclass
+class _DifficultyStats:
+    calls: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    fallbacks: int = 0
+    deadline_capped: int = 0
+    started: int = 0
+    queue_wait_ms_total: float = 0.0
+    run_ms_total: float = 0.0
+    run_ms_max: float = 0.0
+
+
+class StrategyExecutor:
+    """Run strategy.select_move on a dedicated pool under a per-difficulty budget.
+
+    A move that misses its budget (queue wait included) or raises is
+    answered by the next cheaper difficulty, inline: HARD falls back to
+    MEDIUM, MEDIUM to EASY, EASY to the first legal move. A budget of 0
+    runs that difficulty inline with no limit.
+
+    Threads suit strategies that block on I/O (Gemini). Processes keep
+    CPU-bound engines off the request workers' GIL, at the cost of pickling
+    the board and one IPC round trip per move. Neither kind can interrupt a
+    move that overruns. The move keeps its worker until it finishes, and the
+    queue depth metric shows when that starts to back up.
+
+    A request deadline shortens the budget to the time the request has
+    left, so a move for a client about to give up is downgraded rather
+    than computed in full.
+    """
+
+    def __init__(
+        self,
+        options: StrategyOptions,
+        budgets_s: Dict[Difficulty, float],
+        workers: int = 4,
+        kind: str = "thread",
+    ) -> None:
+        self.options = options
+        self.budgets_s = budgets_s
+        self.workers = workers
+        self.kind = kind
+        # Thread workers skip the warm-up: they share this process's tables
+        self._pool = WorkerPool(
+            workers,
+            kind,
+            initializer=_warm_worker if kind == "process" else None,
+            thread_name_prefix="strategy",
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._max_queued = 0
+        self._running = 0
+        self._stats = {d: _DifficultyStats() for d in Difficulty}
+
+    def start(self) -> None:
+        """Bring the pool up before traffic arrives."""
+        self._pool.start()
+
+    def _run_local(self, difficulty: Difficulty, state: str, me: Player, submitted: float) -> int:
+        # Thread pool body: queue accounting happens where the work starts
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            stats = self._stats[difficulty]
+            stats.started += 1
+            stats.queue_wait_ms_total += (time.perf_counter() - submitted) * 1e3
+        start = time.perf_counter()
+        try:
+            return _select_in_worker(self.options, difficulty, state, me)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1e3
+            with self._lock:
+                self._running -= 1
+                stats.run_ms_total += elapsed
+                stats.run_ms_max = max(stats.run_ms_max, elapsed)
+
+    def _submit(self, difficulty: Difficulty, board: Board, me: Player) -> "Future[int]":
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        submitted = time.perf_counter()
+        pool = self._pool.get()
+        if self.kind == "thread":
+            # Carry the request's context over, so strategy spans join its trace
+            ctx = contextvars.copy_context()
+            future = pool.submit(ctx.run, self._run_local, difficulty, board.state, me, submitted)
+
+            def _done(f: Future) -> None:
+                # A cancelled move never reached _run_local
+                if f.cancelled():
+                    with self._lock:
+                        self._queued -= 1
+
+        else:
+            future = pool.submit(_select_in_worker, self.options, difficulty, board.state, me)
+
+            def _done(_f: Future) -> None:
+                # A process pool has no start hook; the move counts as queued until it completes
+                with self._lock:
+                    self._queued -= 1
+
+        future.add_done_callback(_done)
+        return future
+
+    def select_move(self, difficulty: Difficulty, board: Board, me: Player, deadline: Optional[Deadline] = None) -> int:
+        budget = self.budgets_s.get(difficulty, 0.0)
+        if budget <= 0:
+            if deadline is not None:
+                deadline.check("strategy")
+            return self.options.strategy(difficulty).select_move(board, me)
+        capped = False
+        if deadline is not None:
+            configured = budget
+            budget = deadline.cap(budget, "strategy")
+            capped = budget < configured
+        with self._lock:
+            self._stats[difficulty].calls += 1
+            self._stats[difficulty].deadline_capped += capped
+        future = self._submit(difficulty, board, me)
+        try:
+            return future.result(timeout=budget)
+        except TimeoutError:
+            # Drop it if it never started; a running move cannot be interrupted
+            future.cancel()
+            with self._lock:
+                self._stats[difficulty].timeouts += 1
+            current_span().set("budget_exceeded", True)
+            logger.warning("strategy_budget_exceeded", extra={"difficulty": difficulty.value, "budget_ms": budget * 1e3, "deadline_capped": capped})
+        except Exception:
+            with self._lock:
+                self._stats[difficulty].errors += 1
+            current_span().set("failed", True)
+            logger.exception("strategy_failed", extra={"difficulty": difficulty.value})
+        return self._fallback(difficulty, board, me)
+
+    def _fallback(self, difficulty: Difficulty, board: Board, me: Player) -> int:
+        with self._lock:
+            self._stats[difficulty].fallbacks += 1
+        cheaper = CHEAPER[difficulty]
+        while cheaper is not None:
+            try:
+                with span("strategy.fallback", difficulty=cheaper.value):
+                    return self.options.strategy(cheaper).select_move(board, me)
+            except Exception:
+                logger.exception("strategy_fallback_failed", extra={"difficulty": cheaper.value})
+                cheaper = CHEAPER[cheaper]
+        return board.legal_moves[0]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            per_difficulty = {}
+            for d, s in self._stats.items():
+                per_difficulty[d.value] = {
+                    "budget_ms": self.budgets_s.get(d, 0.0) * 1e3,
+                    "calls": s.calls,
+                    "timeouts": s.timeouts,
+                    "errors": s.errors,
+                    "fallbacks": s.fallbacks,
+                    "deadline_capped": s.deadline_capped,
+                    "avg_queue_wait_ms": round(s.queue_wait_ms_total / s.started, 3) if s.started else 0.0,
+                    "avg_run_ms": round(s.run_ms_total / s.started, 3) if s.started else 0.0,
+                    "max_run_ms": round(s.run_ms_max, 3),
+                }
+            return {
+                "pool": self.kind,
+                "workers": self.workers,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queued,
+                "running": self._running if self.kind == "thread" else None,
+                "difficulties": per_difficulty,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
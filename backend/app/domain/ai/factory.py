@@ -1,22 +1,54 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from app.domain.enums import Difficulty
 from app.domain.ai.base import Strategy
 from app.domain.ai.easy import RandomStrategy
 from app.domain.ai.medium import HeuristicStrategy
+from app.domain.ai.resilience import UpstreamLimits
 
+# Strategies are stateless, so one shared instance per configuration is enough
+@lru_cache(maxsize=None)
 def strategy_for(
     difficulty: Difficulty,
     gemini_api_key: str | None = None,
     gemini_model: str = "gemini-2.0-flash",
+    gemini_limits: UpstreamLimits | None = None,
+    book_path: str | None = None,
 ) -> Strategy:
     if difficulty == Difficulty.EASY:
         return RandomStrategy()
     if difficulty == Difficulty.MEDIUM:
         return HeuristicStrategy()
-    # HARD: prefer Gemini if API key is provided; otherwise fallback to heuristic
+    # HARD: prefer Gemini if API key is provided, then a solved-position book,
+    # otherwise fallback to heuristic
     if gemini_api_key:
+        if gemini_limits is not None and gemini_limits.batch_window_s > 0:
+            from .batching import BatchingGeminiStrategy
+
+            return BatchingGeminiStrategy(api_key=gemini_api_key, model=gemini_model, limits=gemini_limits)
         from .gemini import GeminiStrategy
 
-        return GeminiStrategy(api_key=gemini_api_key, model=gemini_model)
+        return GeminiStrategy(api_key=gemini_api_key, model=gemini_model, limits=gemini_limits)
+    if book_path:
+        from .book import BookStrategy, open_book
+
+        book = open_book(book_path)
+        if (book.variant.size, book.variant.k) != (3, 3):
+            raise ValueError(f"{book_path}: a {book.variant.name} book cannot play the 3x3 game")
+        return BookStrategy(book)
     return HeuristicStrategy()
+
+
+@lru_cache(maxsize=None)
+def ultimate_strategy_for(difficulty: Difficulty, budget_s: float = 1.0, workers: int = 1) -> Strategy:
+    """Strategy for ultimate games; moves come back as board * 10 + cell."""
+    from .ultimate import UltimateRandomStrategy, UltimateSearchStrategy
+
+    if difficulty == Difficulty.EASY:
+        return UltimateRandomStrategy()
+    if difficulty == Difficulty.MEDIUM:
+        # Two plies: takes boards and blocks the reply, no deeper plans
+        return UltimateSearchStrategy(budget_s=budget_s, workers=1, max_depth=2)
+    return UltimateSearchStrategy(budget_s=budget_s, workers=workers)
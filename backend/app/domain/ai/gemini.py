@@ -3,22 +3,91 @@ from __future__ import annotations
 import logging
 import re
 import json
-from typing import Optional
+import threading
+from typing import Any, Callable, Dict, Optional
 
+from app.core.tracing import current_span, span, traced
 from app.domain.board import Board
 from app.domain.enums import Player
 from app.domain.ai.base import Strategy
+from app.domain.ai.resilience import GuardedCaller, Rejected, UpstreamLimits, UpstreamTimeout
 
 # Lazy imports for the Gemini SDK to avoid hard dependency at import time
 # We'll import inside the strategy call and gracefully fallback if unavailable.
 
 logger = logging.getLogger(__name__)
 
+# Builds the model client; anything with generate_content(prompt, **kwargs)
+# returning an object with .text works, e.g. a fake slow model.
+ModelFactory = Callable[[str, str], Any]
+
+_GENERATION_CONFIG = {
+    "temperature": 0.0,
+    "top_p": 0.0,
+    "top_k": 1,
+    "max_output_tokens": 16,
+    "response_mime_type": "application/json",
+}
+
+
+def genai_model_factory(api_key: str, model_name: str) -> Any:
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name, generation_config=_GENERATION_CONFIG)
+
 
 class GeminiStrategy(Strategy):
-    def __init__(self, api_key: Optional[str], model: str = "gemini-2.0-flash") -> None:
+    """HARD moves from Gemini, with the heuristic as the local fallback.
+
+    Upstream calls go through a GuardedCaller: at most max_concurrency in
+    flight, each bounded by timeout_s, behind a circuit breaker. A shed,
+    timed out or short-circuited call falls back immediately, so a slow
+    upstream costs a HARD move at most timeout_s.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        model: str = "gemini-2.0-flash",
+        limits: Optional[UpstreamLimits] = None,
+        model_factory: ModelFactory = genai_model_factory,
+    ) -> None:
         self.api_key = api_key
         self.model_name = model
+        self.limits = limits or UpstreamLimits()
+        self._model_factory = model_factory
+        self._model: Any = None
+        self._model_lock = threading.Lock()
+        self._guard = GuardedCaller(self.limits, name="gemini")
+
+    def _get_model(self) -> Any:
+        # The client is reusable; build it once instead of per move
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._model_factory(self.api_key, self.model_name)
+        return self._model
+
+    def _generate(self, prompt: str, max_output_tokens: Optional[int] = None) -> str:
+        # request_options lets the SDK abandon the HTTP call at the same deadline
+        kwargs: Dict[str, Any] = {"request_options": {"timeout": self.limits.timeout_s}}
+        if max_output_tokens is not None:
+            # Merged over the model's generation config for this call only
+            kwargs["generation_config"] = {"max_output_tokens": max_output_tokens}
+        response = self._get_model().generate_content(prompt, **kwargs)
+        text = (getattr(response, "text", None) or "").strip()
+        if not text:
+            try:
+                if response.candidates and response.candidates[0].content.parts:
+                    text = "".join(p.text for p in response.candidates[0].content.parts if getattr(p, "text", None))
+                    text = text.strip()
+            except Exception:
+                pass
+        return text
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"model": self.model_name, **self._guard.snapshot()}
 
     def _fallback(self, board: Board, me: Player) -> int:
         # Local import to avoid circular dependency
@@ -33,7 +102,7 @@ class GeminiStrategy(Strategy):
 
     @staticmethod
     def _find_immediate_win(board: Board, me: Player) -> Optional[int]:
-        for pos in board.available_positions():
+        for pos in board.legal_moves:
             try:
                 if board.with_move(pos, me).winner() == me:
                     return pos
@@ -44,7 +113,7 @@ class GeminiStrategy(Strategy):
     @staticmethod
     def _find_block(board: Board, me: Player) -> Optional[int]:
         opp = GeminiStrategy._opponent(me)
-        for pos in board.available_positions():
+        for pos in board.legal_moves:
             try:
                 if board.with_move(pos, opp).winner() == opp:
                     return pos
@@ -68,6 +137,7 @@ class GeminiStrategy(Strategy):
         )
         return prompt.strip()
 
+    @traced("strategy.gemini")
     def select_move(self, board: Board, me: Player) -> int:
         # Ensure an API key is configured
         if not self.api_key:
@@ -75,69 +145,64 @@ class GeminiStrategy(Strategy):
             return self._fallback(board, me)
 
         try:
-            import google.generativeai as genai
+            pos = self._model_position(board, me)
+        except Rejected as e:
+            logger.info("gemini_call_skipped", extra={"reason": e.reason})
+            current_span().set("fallback", e.reason)
+            return self._fallback(board, me)
+        except UpstreamTimeout:
+            logger.warning("gemini_timeout", extra={"timeout_s": self.limits.timeout_s})
+            current_span().set("fallback", "timeout")
+            return self._fallback(board, me)
         except Exception:
-            logger.exception("The Gemini SDK is not available")
+            logger.exception("gemini_inference_error")
+            current_span().set("fallback", "error")
             return self._fallback(board, me)
+        return self._guarded(board, me, pos)
 
+    def _model_position(self, board: Board, me: Player) -> Optional[int]:
+        """The model's raw choice; raises Rejected, UpstreamTimeout or the SDK's error."""
+        with span("gemini.generate", model=self.model_name):
+            text = self._guard.call(self._generate, self._build_prompt(board, me))
+        logger.info("gemini_raw_response", extra={"text": text[:200]})
+        return self._parse_position(text)
+
+    @staticmethod
+    def _parse_position(text: str) -> Optional[int]:
+        pos: Optional[int] = None
         try:
-            genai.configure(api_key=self.api_key)
-            generation_config = {
-                "temperature": 0.0,
-                "top_p": 0.0,
-                "top_k": 1,
-                "max_output_tokens": 16,
-                "response_mime_type": "application/json",
-            }
-            model = genai.GenerativeModel(self.model_name, generation_config=generation_config)
-
-            prompt = self._build_prompt(board, me)
-            response = model.generate_content(prompt)
-            text = (getattr(response, "text", None) or "").strip()
-            if not text:
-                try:
-                    if response.candidates and response.candidates[0].content.parts:
-                        text = "".join(p.text for p in response.candidates[0].content.parts if getattr(p, "text", None))
-                        text = text.strip()
-                except Exception:
-                    pass
-
-            logger.info("gemini_raw_response", extra={"text": text[:200]})
-
-            pos: Optional[int] = None
-            try:
-                data = json.loads(text)
-                if isinstance(data, dict) and isinstance(data.get("position"), int):
-                    pos = int(data["position"])
-            except Exception:
-                pos = None
-
-            if pos is None:
-                m = re.search(r"\b([1-9])\b", text)
-                if m:
-                    pos = int(m.group(1))
-
-            # Validate availability
-            if pos is None or pos not in board.available_positions():
-                return self._fallback(board, me)
-
-            # Guardrails: don't miss immediate win; block immediate opponent win
-            win = self._find_immediate_win(board, me)
-            if win and win in board.available_positions() and win != pos:
-                logger.info("The Gemini guardrail to win is activated", extra={"chosen": pos, "override": win})
-                return win
-            block = self._find_block(board, me)
-            if block and block in board.available_positions() and block != pos:
-                logger.info("The Gemini guardrail to block is activated", extra={"chosen": pos, "override": block})
-                return block
-
-            # Early-game preference: take center if available (strong heuristic)
-            total_marks = board.to_string().count("x") + board.to_string().count("o")
-            if total_marks <= 1 and 5 in board.available_positions() and pos != 5:
-                logger.info("The Gemini guardrail to prefer the center was activated", extra={"chosen": pos, "override": 5})
-                return 5
-
-            return pos
+            data = json.loads(text)
+            if isinstance(data, dict) and isinstance(data.get("position"), int):
+                pos = int(data["position"])
         except Exception:
-            logger.exception("gemini_inference_error")
+            pos = None
+
+        if pos is None:
+            m = re.search(r"\b([1-9])\b", text)
+            if m:
+                pos = int(m.group(1))
+        return pos
+
+    def _guarded(self, board: Board, me: Player, pos: Optional[int]) -> int:
+        """Validate the model's answer and apply the win/block/center guardrails."""
+        # Validate availability
+        if pos is None or pos not in board.available_positions():
             return self._fallback(board, me)
+
+        # Guardrails: don't miss immediate win; block immediate opponent win
+        win = self._find_immediate_win(board, me)
+        if win and win in board.available_positions() and win != pos:
+            logger.info("The Gemini guardrail to win is activated", extra={"chosen": pos, "override": win})
+            return win
+        block = self._find_block(board, me)
+        if block and block in board.available_positions() and block != pos:
+            logger.info("The Gemini guardrail to block is activated", extra={"chosen": pos, "override": block})
+            return block
+
+        # Early-game preference: take center if available (strong heuristic)
+        total_marks = board.to_string().count("x") + board.to_string().count("o")
+        if total_marks <= 1 and 5 in board.available_positions() and pos != 5:
+            logger.info("The Gemini guardrail to prefer the center was activated", extra={"chosen": pos, "override": 5})
+            return 5
+
+        return pos
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from typing import Iterable, List
 
+from app.core.tracing import traced
 from app.domain.board import Board
 from app.domain.enums import Player
 from app.domain.ai.base import Strategy
@@ -13,29 +14,31 @@ CENTER = 5
 
 
 class HeuristicStrategy(Strategy):
+    @traced("strategy.heuristic")
     def select_move(self, board: Board, me: Player) -> int:
+        # Interned boards: legal_moves and with_move are lookups, not rebuilds
+        legal = board.legal_moves
         # 1) Win if possible
-        for pos in board.available_positions():
-            if board.with_move(pos, me).winner() == me:
+        for pos in legal:
+            if board.with_move(pos, me).winner() is me:
                 return pos
         # 2) Block opponent win
         opp = me.other
-        for pos in board.available_positions():
-            if board.with_move(pos, opp).winner() == opp:
+        for pos in legal:
+            if board.with_move(pos, opp).winner() is opp:
                 return pos
         # 3) Take center
-        if CENTER in board.available_positions():
+        if CENTER in legal:
             return CENTER
         # 4) Take a corner
         for pos in PRIORITY_CORNERS:
-            if pos in board.available_positions():
+            if pos in legal:
                 return pos
         # 5) Take a side
         for pos in PRIORITY_SIDES:
-            if pos in board.available_positions():
+            if pos in legal:
                 return pos
         # fallback (shouldn't happen)
-        avail = board.available_positions()
-        if not avail:
+        if not legal:
             raise RuntimeError("No available moves")
-        return avail[0]
+        return legal[0]
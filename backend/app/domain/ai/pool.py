@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class WorkerPool:
+    """A thread or process pool for move selection, created on first use.
+
+    Process workers start from forkserver, never by forking a process that
+    already runs threads, and run initializer once each. Spawning and
+    warming them costs far more than any move budget, so the lifespan calls
+    start() to bring them all up before traffic arrives.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        kind: str = "process",
+        initializer: Optional[Callable[[], None]] = None,
+        thread_name_prefix: str = "pool",
+    ) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError(f"unknown strategy pool kind: {kind!r}")
+        self.workers = workers
+        self.kind = kind
+        self.initializer = initializer
+        self.thread_name_prefix = thread_name_prefix
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Executor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    if self.kind == "process":
+                        ctx = multiprocessing.get_context("forkserver")
+                        self._pool = ProcessPoolExecutor(self.workers, mp_context=ctx, initializer=self.initializer)
+                    else:
+                        self._pool = ThreadPoolExecutor(
+                            self.workers, thread_name_prefix=self.thread_name_prefix, initializer=self.initializer
+                        )
+        return self._pool
+
+    def start(self) -> None:
+        """Create the pool, and spawn and warm every process worker now."""
+        pool = self.get()
+        if self.kind == "process":
+            for f in [pool.submit(int) for _ in range(self.workers)]:
+                f.result()
+
+    def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+@dataclass(frozen=True)
+class UpstreamLimits:
+    """Bounds for calls to a remote move provider (Gemini)."""
+
+    timeout_s: float = 2.0  # per-move deadline for the upstream call
+    max_concurrency: int = 8  # upstream calls in flight per process; extra moves are shed
+    breaker_failures: int = 5  # consecutive failures or timeouts that open the breaker
+    breaker_reset_s: float = 30.0  # how long the breaker stays open before a probe
+    batch_window_s: float = 0.0  # > 0 gathers concurrent moves into one call (see batching.py)
+    batch_max_size: int = 8
+    move_budget_s: float = 0.0  # the caller's whole budget per move, if any; a batched move stops waiting by then
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe.
+
+    closed: calls flow; breaker_failures consecutive failures open it.
+    open: calls are refused until reset_s has passed, then one probe is let
+    through (half_open). The probe's outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int, reset_s: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened_total = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_s:
+                    return False
+                self._state = HALF_OPEN
+                self._probing = False
+            # half-open: exactly one probe at a time
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def release_probe(self) -> None:
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("circuit_closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened_total += 1
+                    logger.warning("circuit_opened", extra={"consecutive_failures": self._failures})
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "opened_total": self.opened_total,
+            }
+
+
+class Rejected(Exception):
+    """The call was not attempted: breaker open or no concurrency slot free."""
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class UpstreamTimeout(Exception):
+    """The call did not finish within the deadline."""
+
+
+class GuardedCaller:
+    """Run blocking upstream calls with a concurrency cap, a deadline and a breaker.
+
+    Calls run on a private pool sized to the cap. A slot is held until the
+    call really finishes, so a hung upstream cannot be oversubscribed by
+    callers that already gave up on it. When no slot is free the call is
+    shed at once rather than queued.
+    """
+
+    def __init__(self, limits: UpstreamLimits, name: str = "upstream") -> None:
+        self.limits = limits
+        self.breaker = CircuitBreaker(limits.breaker_failures, limits.breaker_reset_s)
+        self._slots = threading.BoundedSemaphore(limits.max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=limits.max_concurrency, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counts = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0, "shed": 0, "short_circuited": 0}
+
+    def _count(self, key: str, delta: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += delta
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def call(self, fn: Callable[..., T], *args: Any, timeout_s: Optional[float] = None) -> T:
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise Rejected("circuit_open")
+        if not self._slots.acquire(blocking=False):
+            self._count("shed")
+            # Shedding is not an upstream failure, but a probe that never ran
+            # must hand the half-open slot back
+            self.breaker.release_probe()
+            raise Rejected("concurrency_limit")
+        with self._lock:
+            self._in_flight += 1
+            self._counts["calls"] += 1
+        future = self._pool.submit(fn, *args)
+        future.add_done_callback(self._release)
+        try:
+            result = future.result(timeout=timeout_s if timeout_s is not None else self.limits.timeout_s)
+        except TimeoutError:
+            self._count("timeouts")
+            self.breaker.record_failure()
+            raise UpstreamTimeout()
+        except Exception:
+            self._count("failures")
+            self.breaker.record_failure()
+            raise
+        self._count("successes")
+        self.breaker.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            in_flight = self._in_flight
+        return {
+            "breaker": self.breaker.snapshot(),
+            "in_flight": in_flight,
+            "max_concurrency": self.limits.max_concurrency,
+            "timeout_s": self.limits.timeout_s,
+            **counts,
+        }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.board import EXTERNAL_ORDER, WIN_PATTERNS
+from app.domain.enums import Player
+
+# Values are from the point of view of the side to move
+WIN, DRAW, LOSS = 1, 0, -1
+RESULT_NAMES = {WIN: "win", DRAW: "draw", LOSS: "loss"}
+
+# (board state, side to move) -> (value, plies to the end under perfect play)
+SolvedTable = Dict[Tuple[str, str], Tuple[int, int]]
+
+_OTHER = {"x": "o", "o": "x"}
+_table: SolvedTable = {}
+_lock = Lock()
+
+
+def _winner(state: str) -> Optional[str]:
+    for a, b, c in WIN_PATTERNS:
+        mark = state[a]
+        if mark != " " and mark == state[b] == state[c]:
+            return mark
+    return None
+
+
+def _solve(state: str, to_move: str) -> Tuple[int, int]:
+    key = (state, to_move)
+    hit = _table.get(key)
+    if hit is not None:
+        return hit
+    # Winners prefer the fastest win; losers drag the game out
+    best: Optional[Tuple[int, int]] = None
+    for idx, cell in enumerate(state):
+        if cell != " ":
+            continue
+        child = state[:idx] + to_move + state[idx + 1 :]
+        if _winner(child) == to_move:
+            outcome = (WIN, 1)
+        elif " " not in child:
+            outcome = (DRAW, 1)
+        else:
+            value, dist = _solve(child, _OTHER[to_move])
+            outcome = (-value, dist + 1)
+        if best is None or _better(outcome, best):
+            best = outcome
+    result = best if best is not None else (DRAW, 0)
+    _table[key] = result
+    return result
+
+
+def _better(a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+    if a[0] != b[0]:
+        return a[0] > b[0]
+    # Same value: shorter if winning, longer if losing; draws are all equal
+    return a[1] < b[1] if a[0] == WIN else a[1] > b[1]
+
+
+@lru_cache(maxsize=1)
+def solved_table() -> SolvedTable:
+    """Solve every position reachable from the empty board, for either first player.
+
+    Built once per process (a few thousand entries, tens of milliseconds) and
+    read-only afterwards. Positions outside it are solved on first use.
+    """
+    with _lock:
+        for first in ("x", "o"):
+            _solve(" " * 9, first)
+    return _table
+
+
+def evaluate_moves(state: str, to_move: Player) -> List[Tuple[int, int, int]]:
+    """(numpad position, value for to_move, plies to the end) for each legal move.
+
+    state must be a valid 9-char board in EXTERNAL_ORDER with no winner yet.
+    """
+    solved_table()
+    me = to_move.value
+    out: List[Tuple[int, int, int]] = []
+    for idx, cell in enumerate(state):
+        if cell != " ":
+            continue
+        child = state[:idx] + me + state[idx + 1 :]
+        if _winner(child) == me:
+            value, dist = WIN, 1
+        elif " " not in child:
+            value, dist = DRAW, 1
+        else:
+            child_value, child_dist = _solve(child, _OTHER[me])
+            value, dist = -child_value, child_dist + 1
+        out.append((EXTERNAL_ORDER[idx], value, dist))
+    return out
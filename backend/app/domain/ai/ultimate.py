@@ -0,0 +1,461 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.tracing import current_span, traced
+from app.domain.ai.base import Strategy
+from app.domain.ai.pool import WorkerPool
+from app.domain.board import EXTERNAL_ORDER, EXTERNAL_TO_INDEX, WIN_PATTERNS
+from app.domain.enums import Player
+from app.domain.ultimate import UltimateBoard
+
+logger = logging.getLogger(__name__)
+
+# The search works on bitmasks: bit i of a board mask is cell EXTERNAL_ORDER[i],
+# bit i of a grid mask (meta, closed) is board EXTERNAL_ORDER[i]. A move is
+# board_index * 9 + cell_index.
+FULL = 0x1FF
+LINES: Tuple[int, ...] = tuple(sum(1 << i for i in p) for p in WIN_PATTERNS)
+WON = bytes(any(m & line == line for line in LINES) for m in range(512))
+BITS: Tuple[Tuple[int, ...], ...] = tuple(tuple(i for i in range(9) if m >> i & 1) for m in range(512))
+POPCOUNT = bytes(m.bit_count() for m in range(512))
+# Winning lines through each cell: 4 for the centre, 3 for corners, 2 for edges
+LINE_WEIGHT = tuple(sum(1 for line in LINES if line >> i & 1) for i in range(9))
+
+WIN_SCORE = 1_000_000
+# Scores this close to WIN_SCORE are forced wins or losses, not estimates
+PROVEN = WIN_SCORE - 1000
+_INF = WIN_SCORE + 1
+
+# Evaluation weights, in the side-to-move's favour
+_BOARD_WON = 60  # per board won, times the lines through it
+_META_TWO = 400  # two boards of a still open meta line
+_META_ONE = 40
+_SUB_TWO = 8  # two cells of a still open line inside an undecided board
+_SUB_ONE = 1
+_FREE_MOVE = 30  # the side to move may pick any open board
+
+# Evaluation terms are pure functions of small keys; reachable keys are bounded
+# (3^9 per board, 4^9 for the grid), so the caches are too
+_sub_cache: Dict[int, int] = {}
+_meta_cache: Dict[int, int] = {}
+
+
+class _Timeout(Exception):
+    pass
+
+
+def _line_score(mine: int, theirs: int, dead: int, two: int, one: int) -> int:
+    score = 0
+    for line in LINES:
+        if not (theirs | dead) & line:
+            n = POPCOUNT[mine & line]
+            score += two if n == 2 else one if n == 1 else 0
+        if not (mine | dead) & line:
+            n = POPCOUNT[theirs & line]
+            score -= two if n == 2 else one if n == 1 else 0
+    return score
+
+
+def _sub_score(x: int, o: int) -> int:
+    # x's view of one undecided board
+    key = x << 9 | o
+    score = _sub_cache.get(key)
+    if score is None:
+        score = _sub_cache[key] = _line_score(x, o, 0, _SUB_TWO, _SUB_ONE)
+    return score
+
+
+def _meta_score(mx: int, mo: int, drawn: int) -> int:
+    # x's view of the grid: boards won, and meta lines still open to each side
+    key = (mx << 9 | mo) << 9 | drawn
+    score = _meta_cache.get(key)
+    if score is None:
+        score = _line_score(mx, mo, drawn, _META_TWO, _META_ONE)
+        for i in BITS[mx]:
+            score += _BOARD_WON * LINE_WEIGHT[i]
+        for i in BITS[mo]:
+            score -= _BOARD_WON * LINE_WEIGHT[i]
+        _meta_cache[key] = score
+    return score
+
+
+Position = Tuple[Tuple[int, ...], Tuple[int, ...], int]
+
+
+def position_of(board: UltimateBoard) -> Position:
+    """(x masks, o masks, forced board index or -1), picklable for workers."""
+    xs = [0] * 9
+    os_ = [0] * 9
+    for b, sub in enumerate(board.boards):
+        for i, c in enumerate(sub.state):
+            if c == "x":
+                xs[b] |= 1 << i
+            elif c == "o":
+                os_[b] |= 1 << i
+    forced = EXTERNAL_TO_INDEX[board.active] if board.active is not None else -1
+    return tuple(xs), tuple(os_), forced
+
+
+def to_move(m: int) -> int:
+    """Internal move to the API encoding, board * 10 + cell in numpad layout."""
+    b, c = divmod(m, 9)
+    return EXTERNAL_ORDER[b] * 10 + EXTERNAL_ORDER[c]
+
+
+class _Search:
+    """Alpha-beta negamax over one position, made and unmade in place."""
+
+    def __init__(self, position: Position, deadline: float) -> None:
+        xs, os_, forced = position
+        self.masks = [list(xs), list(os_)]
+        mx = mo = closed = 0
+        for b in range(9):
+            if WON[xs[b]]:
+                mx |= 1 << b
+            elif WON[os_[b]]:
+                mo |= 1 << b
+            if (xs[b] | os_[b]) == FULL:
+                closed |= 1 << b
+        self.meta = [mx, mo]
+        self.closed = closed | mx | mo
+        self.forced = forced
+        self.deadline = deadline
+        self.nodes = 0
+
+    def moves(self) -> List[int]:
+        xs, os_ = self.masks
+        f = self.forced
+        if f >= 0:
+            base = f * 9
+            return [base + c for c in BITS[FULL & ~(xs[f] | os_[f])]]
+        out: List[int] = []
+        for b in BITS[FULL & ~self.closed]:
+            base = b * 9
+            out.extend(base + c for c in BITS[FULL & ~(xs[b] | os_[b])])
+        return out
+
+    def evaluate(self, side: int) -> int:
+        xs, os_ = self.masks
+        mx, mo = self.meta
+        closed = self.closed
+        score = _meta_score(mx, mo, closed & ~(mx | mo))
+        for b in BITS[FULL & ~closed]:
+            score += _sub_score(xs[b], os_[b]) * LINE_WEIGHT[b]
+        if side:
+            score = -score
+        return score + _FREE_MOVE if self.forced < 0 else score
+
+    def negamax(self, side: int, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 1023 and time.monotonic() > self.deadline:
+            raise _Timeout
+        if depth == 0:
+            return self.evaluate(side)
+        mine = self.masks[side]
+        theirs = self.masks[side ^ 1]
+        meta = self.meta
+        saved_meta = meta[side]
+        saved_closed = self.closed
+        saved_forced = self.forced
+        best = -_INF
+        for m in self.moves():
+            b = m // 9
+            c = m - b * 9
+            old = mine[b]
+            new = old | 1 << c
+            mine[b] = new
+            closed = saved_closed
+            if WON[new]:
+                won = saved_meta | 1 << b
+                if WON[won]:
+                    # Nothing beats winning now
+                    mine[b] = old
+                    return WIN_SCORE - ply
+                meta[side] = won
+                closed |= 1 << b
+            elif new | theirs[b] == FULL:
+                closed |= 1 << b
+            if closed == FULL:
+                # Every board decided without a meta line
+                score = 0
+            else:
+                self.closed = closed
+                self.forced = -1 if closed >> c & 1 else c
+                score = -self.negamax(side ^ 1, depth - 1, -beta, -alpha, ply + 1)
+                self.closed = saved_closed
+                self.forced = saved_forced
+            mine[b] = old
+            meta[side] = saved_meta
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def root(self, side: int, depth: int, moves: Sequence[int]) -> List[Tuple[int, int]]:
+        """(score, move) for each move; exact for the best, upper bounds for the rest."""
+        mine = self.masks[side]
+        theirs = self.masks[side ^ 1]
+        meta = self.meta
+        saved_meta, saved_closed, saved_forced = meta[side], self.closed, self.forced
+        alpha = -_INF
+        out: List[Tuple[int, int]] = []
+        for m in moves:
+            b, c = divmod(m, 9)
+            old = mine[b]
+            new = old | 1 << c
+            mine[b] = new
+            closed = saved_closed
+            if WON[new]:
+                meta[side] = saved_meta | 1 << b
+                closed |= 1 << b
+            elif new | theirs[b] == FULL:
+                closed |= 1 << b
+            if WON[meta[side]]:
+                score = WIN_SCORE
+            elif closed == FULL:
+                score = 0
+            else:
+                self.closed = closed
+                self.forced = -1 if closed >> c & 1 else c
+                score = -self.negamax(side ^ 1, depth - 1, -_INF, -alpha, 1)
+                self.closed = saved_closed
+                self.forced = saved_forced
+            mine[b] = old
+            meta[side] = saved_meta
+            out.append((score, m))
+            alpha = max(alpha, score)
+        return out
+
+
+def search_root(position: Position, side: int, moves: Sequence[int], deadline: float, max_depth: int) -> Dict[str, Any]:
+    """Iterative deepening over the given root moves until deadline, on time.monotonic().
+
+    The deadline is absolute, so a search that waited in the pool queue gets
+    only what is left of the budget, and none at all when it starts after
+    the deadline: then no depth is returned. Otherwise depth 1 always
+    completes, so there is a move to play however little time is left.
+    Returns the best (move, score) per completed depth, and whether the last
+    one is proven, in which case searching deeper would not change it.
+    """
+    start = time.perf_counter()
+    if time.monotonic() >= deadline:
+        return {"depths": [], "proven": False, "nodes": 0, "ms": 0.0}
+    search = _Search(position, float("inf"))
+    order = list(moves)
+    depths: List[Tuple[int, int, int]] = []
+    proven = False
+    depth = 1
+    while depth <= max_depth:
+        try:
+            scored = search.root(side, depth, order)
+        except _Timeout:
+            break
+        scored.sort(key=lambda sm: -sm[0])
+        order = [m for _, m in scored]
+        best_score, best_move = scored[0]
+        depths.append((depth, best_move, best_score))
+        if abs(best_score) >= PROVEN or all(s <= -PROVEN for s, _ in scored):
+            proven = True
+            break
+        # The search object is only unwound cleanly when an iteration completes
+        search.deadline = deadline
+        depth += 1
+    return {"depths": depths, "proven": proven, "nodes": search.nodes, "ms": (time.perf_counter() - start) * 1e3}
+
+
+def combine(results: Sequence[Dict[str, Any]]) -> Tuple[int, int, int]:
+    """(move, score, depth) from root searches that each covered some of the moves.
+
+    Scores are only comparable at equal depth, so the choice is made at the
+    deepest depth every worker completed. A worker whose result is proven
+    stopped early and counts as having reached any depth.
+    """
+    for r in results:
+        depth, move, score = r["depths"][-1]
+        if score >= PROVEN:
+            return move, score, depth
+    open_depths = [r["depths"][-1][0] for r in results if not r["proven"]]
+    depth = min(open_depths) if open_depths else max(r["depths"][-1][0] for r in results)
+    best: Optional[Tuple[int, int, int]] = None
+    for r in results:
+        entry = [d for d in r["depths"] if d[0] <= depth][-1]
+        if best is None or entry[2] > best[1]:
+            best = (entry[1], entry[2], entry[0])
+    assert best is not None
+    return best
+
+
+def _warm_worker() -> None:
+    # Tables are built at import; a first tiny search fills the common cache keys
+    search_root(((0,) * 9, (0,) * 9, -1), 0, list(range(81)), time.monotonic() + 0.05, 2)
+
+
+def _split(moves: Sequence[int], parts: int) -> List[List[int]]:
+    # Round robin, so each worker gets a mix of boards
+    return [list(moves[i::parts]) for i in range(parts) if moves[i::parts]]
+
+
+@dataclass
+class _SearchStats:
+    searches: int = 0
+    depth_total: int = 0
+    depth_min: Optional[int] = None
+    depth_max: int = 0
+    ms_total: float = 0.0
+    ms_max: float = 0.0
+    over_budget: int = 0
+    late_workers: int = 0
+    fallbacks: int = 0
+    nodes: int = 0
+
+
+class UltimateRandomStrategy(Strategy):
+    @traced("strategy.ultimate_random")
+    def select_move(self, board: UltimateBoard, me: Player, budget_s: Optional[float] = None) -> int:  # type: ignore[override]
+        # Instant, so any budget is met
+        choices = board.legal_moves
+        if not choices:
+            raise RuntimeError("No available moves")
+        return random.choice(choices)
+
+
+class UltimateSearchStrategy(Strategy):
+    """Iterative-deepening alpha-beta for ultimate games, within a time budget.
+
+    With workers > 1 the root moves are split across a process pool and each
+    worker deepens its share until the budget runs out. Root splitting gives
+    up some pruning between workers, but needs no shared state, and with
+    seven or more moves per position every worker has something to search.
+    The move comes from the deepest depth all workers completed, so the
+    answer arrives within the budget, at whatever depth the hardware
+    reaches. If a worker misses the deadline or fails, its share of the
+    moves is unsearched, so a short inline search picks the move instead.
+    """
+
+    def __init__(self, budget_s: float = 1.0, workers: int = 1, max_depth: int = 64) -> None:
+        self.budget_s = budget_s
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.max_depth = max_depth
+        self._pool = WorkerPool(self.workers, initializer=_warm_worker)
+        self._lock = threading.Lock()
+        self._stats = _SearchStats()
+
+    def start(self) -> None:
+        """Spawn and warm the search processes before traffic arrives."""
+        if self.workers > 1:
+            self._pool.start()
+
+    @traced("strategy.ultimate_search")
+    def select_move(self, board: UltimateBoard, me: Player, budget_s: Optional[float] = None) -> int:  # type: ignore[override]
+        """Search within budget_s, or the configured budget when None."""
+        budget = self.budget_s if budget_s is None else min(budget_s, self.budget_s)
+        position = position_of(board)
+        side = 0 if me is Player.X else 1
+        moves = _Search(position, 0.0).moves()
+        if not moves:
+            raise RuntimeError("No available moves")
+        if len(moves) == 1:
+            return to_move(moves[0])
+        start = time.perf_counter()
+        deadline = time.monotonic() + budget
+        # Deeper than the empty cells left is never needed
+        max_depth = min(self.max_depth, 81 - sum(POPCOUNT[x] + POPCOUNT[o] for x, o in zip(*position[:2])))
+        late = fallback = 0
+        if self.workers > 1:
+            results, late = self._search_parallel(position, side, moves, max_depth, budget, deadline)
+            if not results:
+                fallback = 1
+                results = [search_root(position, side, moves, time.monotonic() + min(budget, 0.05), 2)]
+        else:
+            results = [search_root(position, side, moves, deadline, max_depth)]
+        if not any(r["depths"] for r in results):
+            # The budget was gone before depth 1 started; a move is still owed
+            fallback = 1
+            results = [search_root(position, side, moves, float("inf"), 1)]
+        move, score, depth = combine(results)
+        elapsed_ms = (time.perf_counter() - start) * 1e3
+        nodes = sum(r["nodes"] for r in results)
+        sp = current_span()
+        sp.set("depth", depth)
+        sp.set("score", score)
+        sp.set("nodes", nodes)
+        with self._lock:
+            s = self._stats
+            s.searches += 1
+            s.depth_total += depth
+            s.depth_min = depth if s.depth_min is None else min(s.depth_min, depth)
+            s.depth_max = max(s.depth_max, depth)
+            s.ms_total += elapsed_ms
+            s.ms_max = max(s.ms_max, elapsed_ms)
+            # A tenth over covers scheduling noise; more means the budget did not hold
+            s.over_budget += elapsed_ms > budget * 1.1e3
+            s.late_workers += late
+            s.fallbacks += fallback
+            s.nodes += nodes
+        return to_move(move)
+
+    def _search_parallel(
+        self, position: Position, side: int, moves: List[int], max_depth: int, budget_s: float, deadline: float
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        pool = self._pool.get()
+        # Workers stop a little early to leave room for the round trip back.
+        # The deadline is absolute: a share queued behind another search gets
+        # what is left of the budget, not a fresh one.
+        futures: List[Future] = [
+            pool.submit(search_root, position, side, part, deadline - budget_s * 0.1, max_depth)
+            for part in _split(moves, self.workers)
+        ]
+        done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for f in not_done:
+            f.cancel()
+        results = []
+        late = len(not_done)
+        for f in done:
+            try:
+                result = f.result()
+            except Exception:
+                logger.exception("ultimate_search_worker_failed")
+                continue
+            if result["depths"]:
+                results.append(result)
+            else:
+                # Started after the deadline
+                late += 1
+        if len(results) < len(futures):
+            # Every worker's share is needed for a sound comparison
+            logger.warning("ultimate_search_incomplete", extra={"late": late, "budget_ms": budget_s * 1e3})
+            return [], late
+        return results, 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            s = self._stats
+            n = s.searches
+            return {
+                "budget_ms": self.budget_s * 1e3,
+                "workers": self.workers,
+                "searches": n,
+                "avg_depth": round(s.depth_total / n, 2) if n else 0.0,
+                "min_depth": s.depth_min,
+                "max_depth": s.depth_max,
+                "avg_ms": round(s.ms_total / n, 1) if n else 0.0,
+                "max_ms": round(s.ms_max, 1),
+                "over_budget": s.over_budget,
+                "late_workers": s.late_workers,
+                "fallbacks": s.fallbacks,
+                "nodes_per_s": round(s.nodes / (s.ms_total / 1e3)) if s.ms_total else 0,
+            }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
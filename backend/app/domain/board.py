@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable, List, Optional, Sequence, Tuple
+from dataclasses import FrozenInstanceError
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from app.domain.enums import Player
 from app.domain.exceptions import InvalidBoardError, InvalidMoveError
@@ -34,20 +35,81 @@ WIN_PATTERNS: Tuple[Tuple[int, int, int], ...] = (
 
 ALLOWED_CHARS = {"x", "o", " "}
 
+_PLAYERS = (Player.X, Player.O)
+_EMPTY_STATE = " " * 9
+
+# state -> the one Board for it. Bounded by the 3^9 possible strings.
+_INTERNED: Dict[str, "Board"] = {}
+_intern_lock = Lock()
+
 
-@dataclass(frozen=True)
 class Board:
+    """Immutable board in EXTERNAL_ORDER, interned per state (flyweight).
+
+    Board(state) returns the shared instance for that state, so a state is
+    validated and analysed once per process. winner, fullness, counts and
+    legal moves are computed at interning; successors are filled in on first
+    use, after which with_move is a table lookup.
+    """
+
+    __slots__ = ("state", "_winner", "_full", "_counts", "_legal", "_successors")
+
     state: str  # 9-char string in EXTERNAL_ORDER with 'x', 'o', or ' '
+    _winner: Optional[Player]
+    _full: bool
+    _counts: Tuple[int, int]
+    _legal: Tuple[int, ...]
+    # Index idx * 2 + (0 for x, 1 for o); None until first requested
+    _successors: List[Optional["Board"]]
+
+    def __new__(cls, state: str) -> "Board":
+        board = _INTERNED.get(state)
+        if board is None:
+            board = cls._intern(state)
+        return board
 
-    def __post_init__(self) -> None:
-        if len(self.state) != 9:
+    @classmethod
+    def _intern(cls, state: str) -> "Board":
+        if len(state) != 9:
             raise InvalidBoardError("Board state must be exactly 9 characters long.")
-        if any(c not in ALLOWED_CHARS for c in self.state):
+        if any(c not in ALLOWED_CHARS for c in state):
             raise InvalidBoardError("Board contains invalid characters. Allowed: 'x','o',' '.")
+        board = object.__new__(cls)
+        init = object.__setattr__
+        init(board, "state", state)
+        init(board, "_winner", _compute_winner(state))
+        init(board, "_full", " " not in state)
+        init(board, "_counts", (state.count("x"), state.count("o")))
+        init(board, "_legal", tuple(INDEX_TO_EXTERNAL[i] for i, c in enumerate(state) if c == " "))
+        init(board, "_successors", [None] * 18)
+        with _intern_lock:
+            # Another thread may have interned the same state meanwhile
+            return _INTERNED.setdefault(state, board)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Board):
+            return self.state == other.state
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.state)
+
+    def __repr__(self) -> str:
+        return f"Board(state={self.state!r})"
+
+    def __reduce__(self) -> Tuple[type, Tuple[str]]:
+        # Unpickling and copying go through Board() and land on the interned instance
+        return (Board, (self.state,))
 
     @classmethod
     def empty(cls) -> "Board":
-        return cls(" " * 9)
+        return cls(_EMPTY_STATE)
 
     @classmethod
     def from_string(cls, s: str) -> "Board":
@@ -68,38 +130,39 @@ class Board:
     def is_empty_at(self, position: int) -> bool:
         return self.cell(position) == " "
 
+    @property
+    def legal_moves(self) -> Tuple[int, ...]:
+        """Empty positions in EXTERNAL_ORDER; shared, allocation-free."""
+        return self._legal
+
     def available_positions(self) -> List[int]:
-        return [INDEX_TO_EXTERNAL[i] for i, c in enumerate(self.state) if c == " "]
+        return list(self._legal)
 
     def with_move(self, position: int, player: Player) -> "Board":
         idx = EXTERNAL_TO_INDEX.get(position)
         if idx is None:
             raise InvalidMoveError("Position must be one of 1..9 in numpad layout.")
-        if self.state[idx] != " ":
-            raise InvalidMoveError("Cell is already occupied.")
-        cells = list(self.state)
-        cells[idx] = player.value
-        return Board("".join(cells))
+        slot = idx * 2 + (player is Player.O)
+        nxt = self._successors[slot]
+        if nxt is None:
+            if self.state[idx] != " ":
+                raise InvalidMoveError("Cell is already occupied.")
+            nxt = Board(self.state[:idx] + player.value + self.state[idx + 1 :])
+            # Benign race: concurrent writers store the same interned instance
+            self._successors[slot] = nxt
+        return nxt
 
     def is_full(self) -> bool:
-        return " " not in self.state
+        return self._full
 
     def winner(self) -> Optional[Player]:
-        for a, b, c in WIN_PATTERNS:
-            trio = self.state[a] + self.state[b] + self.state[c]
-            if trio == "xxx":
-                return Player.X
-            if trio == "ooo":
-                return Player.O
-        return None
+        return self._winner
 
     def is_draw(self) -> bool:
-        return self.winner() is None and self.is_full()
+        return self._winner is None and self._full
 
     def counts(self) -> Tuple[int, int]:
-        x_count = self.state.count("x")
-        o_count = self.state.count("o")
-        return x_count, o_count
+        return self._counts
 
     def pretty(self) -> str:
         # For debugging: returns a 3x3 representation in EXTERNAL_ORDER
@@ -109,3 +172,45 @@ class Board:
             " ".join(self.state[6:9]),
         ]
         return "\n".join(lines)
+
+
+def _compute_winner(state: str) -> Optional[Player]:
+    for a, b, c in WIN_PATTERNS:
+        mark = state[a]
+        if mark != " " and mark == state[b] == state[c]:
+            return Player.X if mark == "x" else Player.O
+    return None
+
+
+def interned_sizes() -> Dict[str, int]:
+    """How many boards are interned and how many successor links are filled in."""
+    with _intern_lock:
+        boards = list(_INTERNED.values())
+    return {
+        "boards": len(boards),
+        "successor_links": sum(1 for b in boards for s in b._successors if s is not None),
+    }
+
+
+def preload_boards() -> int:
+    """Intern every board reachable in play, with its successors filled in.
+
+    Covers games started by either player. Returns the number of interned
+    boards; moves between them afterwards allocate nothing.
+    """
+    seen = set()
+    stack = [Board.empty()]
+    while stack:
+        board = stack.pop()
+        if board.state in seen:
+            continue
+        seen.add(board.state)
+        if board.winner() is not None or board.is_full():
+            continue
+        x, o = board.counts()
+        # Either side may move first, so both may be to move when counts are equal
+        movers = _PLAYERS if x == o else ((Player.O,) if x > o else (Player.X,))
+        for pos in board.legal_moves:
+            for player in movers:
+                stack.append(board.with_move(pos, player))
+    return len(_INTERNED)
@@ -23,3 +23,8 @@ class GameStatus(str, Enum):
     X_WON = "x_won"
     O_WON = "o_won"
     DRAW = "draw"
+
+
+class GameMode(str, Enum):
+    CLASSIC = "classic"
+    ULTIMATE = "ultimate"  # 3x3 grid of boards, see app.domain.ultimate
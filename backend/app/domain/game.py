@@ -2,26 +2,31 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import List, Optional, Sequence, Union
 
 from app.domain.board import Board
-from app.domain.enums import Difficulty, GameStatus, Player
+from app.domain.enums import Difficulty, GameMode, GameStatus, Player
+from app.domain.ultimate import UltimateBoard
+
+AnyBoard = Union[Board, UltimateBoard]
 
 
 @dataclass
 class Game:
     id: str
-    board: Board
+    board: AnyBoard  # UltimateBoard when mode is ULTIMATE
     next_player: Player
     difficulty: Difficulty
     status: GameStatus
     human_symbol: Player
     computer_symbol: Player
-    moves: List[int] = field(default_factory=list)  # positions in numpad layout 1..9
+    # Positions in numpad layout 1..9; board * 10 + cell in ultimate games
+    moves: List[int] = field(default_factory=list)
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    mode: GameMode = GameMode.CLASSIC
 
-    def with_board(self, board: Board) -> "Game":
+    def with_board(self, board: AnyBoard) -> "Game":
         self.board = board
         self.updated_at = datetime.now(timezone.utc)
         # update status
@@ -62,17 +67,31 @@ class Game:
         difficulty: Difficulty,
         first_player_is_human: bool,
         human_symbol: Player = Player.X,
+        mode: GameMode = GameMode.CLASSIC,
     ) -> "Game":
         human_symbol = Player(human_symbol)
         computer_symbol = human_symbol.other
         next_player = human_symbol if first_player_is_human else computer_symbol
         return Game(
             id=game_id,
-            board=Board.empty(),
+            board=UltimateBoard.empty() if mode == GameMode.ULTIMATE else Board.empty(),
             next_player=next_player,
             difficulty=difficulty,
             status=GameStatus.IN_PROGRESS,
             human_symbol=human_symbol,
             computer_symbol=computer_symbol,
             moves=[],
+            mode=mode,
         )
+
+
+def load_board(mode: str, state: str, moves: Sequence[int]) -> AnyBoard:
+    """Board for a stored game; an ultimate position also needs its last move."""
+    if mode == GameMode.ULTIMATE.value:
+        return UltimateBoard.from_string(state, moves[-1] if moves else None)
+    return Board.from_string(state)
+
+
+def as_utc(ts: datetime) -> datetime:
+    """ts, with a naive datetime taken to be UTC, comparable with game timestamps."""
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
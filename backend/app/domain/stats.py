@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from app.domain.board import EXTERNAL_TO_INDEX
+from app.domain.enums import GameMode, GameStatus
+from app.domain.game import Game
+
+# Results are recorded from the human player's point of view
+RESULT_WIN = "win"
+RESULT_LOSS = "loss"
+RESULT_DRAW = "draw"
+RESULTS = (RESULT_WIN, RESULT_DRAW, RESULT_LOSS)
+
+
+@dataclass(frozen=True)
+class OutcomeKey:
+    """Dimensions of one finished game in the outcome rollup."""
+
+    difficulty: str
+    first_player: str  # human | computer
+    human_symbol: str
+    opening_move: int  # numpad position 1..9
+    result: str  # win | draw | loss
+
+
+def outcome_key_from(
+    difficulty: str,
+    status: str,
+    human_symbol: str,
+    board: str,
+    moves: Optional[Sequence[int]],
+) -> Optional[OutcomeKey]:
+    """Build the rollup key from raw column values; None for unfinished games."""
+    if status == GameStatus.IN_PROGRESS.value or not moves:
+        return None
+    opening = moves[0]
+    # The opening mark never changes, so it tells who moved first
+    first_symbol = board[EXTERNAL_TO_INDEX[opening]]
+    if status == GameStatus.DRAW.value:
+        result = RESULT_DRAW
+    elif status == f"{human_symbol}_won":
+        result = RESULT_WIN
+    else:
+        result = RESULT_LOSS
+    return OutcomeKey(
+        difficulty=difficulty,
+        first_player="human" if first_symbol == human_symbol else "computer",
+        human_symbol=human_symbol,
+        opening_move=opening,
+        result=result,
+    )
+
+
+def outcome_key(game: Game) -> Optional[OutcomeKey]:
+    # The rollup dimensions (opening move 1..9) describe classic games only
+    if game.mode != GameMode.CLASSIC:
+        return None
+    return outcome_key_from(
+        game.difficulty.value,
+        game.status.value,
+        game.human_symbol.value,
+        game.board.to_string(),
+        game.moves,
+    )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from app.domain.board import EXTERNAL_ORDER, EXTERNAL_TO_INDEX, Board
+from app.domain.enums import Player
+from app.domain.exceptions import InvalidBoardError, InvalidMoveError
+
+# Ultimate tic-tac-toe: a 3x3 grid of boards. Sub-boards and the cells inside
+# them both use the numpad layout, and a move is encoded as board * 10 + cell
+# (57 = cell 7 of the centre board), so moves fit the same integer lists as
+# classic games. The cell played picks the board the opponent must play in
+# next; if that board is already decided, they may play in any open board.
+#
+# The state string is the nine sub-board states concatenated in
+# EXTERNAL_ORDER (top-left board first), 81 characters.
+
+STATE_LENGTH = 81
+
+_EMPTY_BOARDS: Tuple[Board, ...] = (Board.empty(),) * 9
+
+
+def encode_move(board: int, cell: int) -> int:
+    if board not in EXTERNAL_TO_INDEX or cell not in EXTERNAL_TO_INDEX:
+        raise InvalidMoveError("Board and cell must be one of 1..9 in numpad layout.")
+    return board * 10 + cell
+
+
+def decode_move(move: int) -> Tuple[int, int]:
+    board, cell = divmod(move, 10)
+    if board not in EXTERNAL_TO_INDEX or cell not in EXTERNAL_TO_INDEX:
+        raise InvalidMoveError("Ultimate moves are board * 10 + cell, both 1..9 in numpad layout.")
+    return board, cell
+
+
+@dataclass(frozen=True, slots=True)
+class UltimateBoard:
+    """Immutable meta-game state built from interned Boards.
+
+    Each sub-board is a shared Board flyweight, so a position costs nine
+    references plus the meta board, whatever the game length. The meta board
+    is a Board too: the winner of each sub-board in its cell, a drawn
+    sub-board left empty, so the meta winner is Board.winner().
+    """
+
+    boards: Tuple[Board, ...]  # nine sub-boards, indexed like EXTERNAL_ORDER
+    meta: Board
+    active: Optional[int] = None  # numpad board the next move must use; None = any open board
+
+    @classmethod
+    def empty(cls) -> "UltimateBoard":
+        return cls(_EMPTY_BOARDS, Board.empty())
+
+    @classmethod
+    def from_string(cls, s: str, last_move: Optional[int] = None) -> "UltimateBoard":
+        """Rebuild a position from its state string and the last move played."""
+        if len(s) != STATE_LENGTH:
+            raise InvalidBoardError("Ultimate board state must be exactly 81 characters long.")
+        boards = tuple(Board.from_string(s[i : i + 9]) for i in range(0, STATE_LENGTH, 9))
+        meta = Board.empty()
+        for idx, sub in enumerate(boards):
+            w = sub.winner()
+            if w is not None:
+                meta = meta.with_move(EXTERNAL_ORDER[idx], w)
+        active = None
+        if last_move is not None:
+            _, cell = decode_move(last_move)
+            if not _decided(boards[EXTERNAL_TO_INDEX[cell]]):
+                active = cell
+        return cls(boards, meta, active)
+
+    def to_string(self) -> str:
+        return "".join(b.state for b in self.boards)
+
+    def sub_board(self, board: int) -> Board:
+        idx = EXTERNAL_TO_INDEX.get(board)
+        if idx is None:
+            raise InvalidMoveError("Board must be one of 1..9 in numpad layout.")
+        return self.boards[idx]
+
+    def open_boards(self) -> Tuple[int, ...]:
+        """Numpad boards the next move may use."""
+        if self.active is not None:
+            return (self.active,)
+        return tuple(EXTERNAL_ORDER[i] for i, b in enumerate(self.boards) if not _decided(b))
+
+    @property
+    def legal_moves(self) -> Tuple[int, ...]:
+        """Encoded moves (board * 10 + cell) allowed next."""
+        return tuple(b * 10 + c for b in self.open_boards() for c in self.sub_board(b).legal_moves)
+
+    def with_move(self, move: int, player: Player) -> "UltimateBoard":
+        board, cell = decode_move(move)
+        if self.active is not None and board != self.active:
+            raise InvalidMoveError(f"Must play in board {self.active}.")
+        idx = EXTERNAL_TO_INDEX[board]
+        sub = self.boards[idx]
+        if _decided(sub):
+            raise InvalidMoveError("Board is already decided.")
+        sub = sub.with_move(cell, player)
+        boards = self.boards[:idx] + (sub,) + self.boards[idx + 1 :]
+        meta = self.meta
+        if sub.winner() is not None:
+            meta = meta.with_move(board, player)
+        active = None if _decided(boards[EXTERNAL_TO_INDEX[cell]]) else cell
+        return UltimateBoard(boards, meta, active)
+
+    def is_full(self) -> bool:
+        """Every sub-board is decided, so no move is left."""
+        return all(_decided(b) for b in self.boards)
+
+    def winner(self) -> Optional[Player]:
+        return self.meta.winner()
+
+    def is_draw(self) -> bool:
+        return self.meta.winner() is None and self.is_full()
+
+    def counts(self) -> Tuple[int, int]:
+        x = o = 0
+        for b in self.boards:
+            bx, bo = b.counts()
+            x += bx
+            o += bo
+        return x, o
+
+    def pretty(self) -> str:
+        # For debugging: the 9x9 grid, sub-boards separated by bars
+        rows = []
+        for band in range(3):
+            for line in range(3):
+                parts = [" ".join(self.boards[band * 3 + col].state[line * 3 : line * 3 + 3]) for col in range(3)]
+                rows.append(" | ".join(parts))
+            if band < 2:
+                rows.append("------+-------+------")
+        return "\n".join(rows)
+
+
+def _decided(board: Board) -> bool:
+    return board.winner() is not None or board.is_full()
+
@@ -1,4 +1,6 @@
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.exceptions import RequestValidationError
@@ -6,38 +8,119 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.api.routes import api_router
+from app.container import Container
+from app.core.deadline import DeadlineExceeded, DeadlineMiddleware
 from app.core.logging import configure_logging
-from app.core.settings import Settings
+from app.core.settings import Settings, get_settings
 from app.core.middleware import RequestLoggingMiddleware
 
-settings = Settings.from_env()
-configure_logging(settings.log_level)
 
-app = FastAPI(title=settings.app_name, version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    container: Container = app.state.container
+    container.warm_up()
+    try:
+        yield
+    finally:
+        container.close()
 
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# Request logging
-app.add_middleware(RequestLoggingMiddleware)
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Build the application.
 
-# Routers
-app.include_router(api_router)
+    Heavy singletons (DB engine, repositories, strategies) live on
+    app.state.container and are built by the lifespan, not at import time.
+    """
+    settings = settings or get_settings()
+    configure_logging(settings.log_level)
+
+    app = FastAPI(title=settings.app_name, version="0.1.0", lifespan=lifespan)
+    app.state.container = Container(settings)
+
+    if settings.idempotency_enabled:
+        # Innermost, so replayed responses still get CORS headers and a log line
+        from app.core.idempotency import IdempotencyMiddleware
+
+        container = app.state.container
+        app.add_middleware(IdempotencyMiddleware, get_idempotency=lambda: container.idempotency)
+
+    # CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Request logging
+    app.add_middleware(RequestLoggingMiddleware)
+
+    # Routers
+    app.include_router(api_router)
+
+    if settings.profile_enabled:
+        # Not installed at all when disabled, so the default path pays nothing
+        from app.api.debug import profiles_router
+        from app.core.profiling import ProfilingMiddleware
+
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=app.state.container.profiles,
+            sample_rate=settings.profile_sample_rate,
+            interval_s=settings.profile_interval_ms / 1000.0,
+        )
+        app.include_router(profiles_router)
+
+    if settings.trace_enabled:
+        # Without the middleware no span is ever current, and every span() is a no-op
+        from app.api.debug import traces_router
+        from app.core.tracing import TracingMiddleware
+
+        app.add_middleware(
+            TracingMiddleware,
+            store=app.state.container.traces,
+            sample_rate=settings.trace_sample_rate,
+        )
+        app.include_router(traces_router)
+
+    if settings.capture_enabled:
+        # Outermost, so latencies are what clients saw; see benchmarks.replay
+        from app.core.capture import CaptureMiddleware
+
+        app.add_middleware(CaptureMiddleware, capture=app.state.container.capture)
+
+    if settings.memory_debug_enabled:
+        from app.api.debug import memory_router
+
+        app.include_router(memory_router)
+
+    # Outermost, so the budget is measured from arrival
+    app.add_middleware(
+        DeadlineMiddleware,
+        stats=app.state.container.deadlines,
+        header=settings.deadline_header,
+        default_s=settings.deadline_default_ms / 1000.0,
+        reserve_s=settings.deadline_reserve_ms / 1000.0,
+    )
+
+    # Error handlers
+    app.add_exception_handler(HTTPException, http_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(DeadlineExceeded, deadline_exception_handler)
+    return app
 
 
-# Error handlers
-@app.exception_handler(HTTPException)
 async def http_exception_handler(_request: Request, exc: HTTPException):
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
 
 
-@app.exception_handler(RequestValidationError)
+async def deadline_exception_handler(request: Request, exc: DeadlineExceeded):
+    request.app.state.container.deadlines.exceeded(exc.stage)
+    logging.getLogger(__name__).warning("deadline_exceeded", extra={"stage": exc.stage, "path": request.url.path})
+    return JSONResponse(status_code=504, content={"detail": "deadline_exceeded"})
+
+
 async def validation_exception_handler(_request: Request, exc: RequestValidationError):
     logging.getLogger(__name__).debug("validation_error", extra={"errors": exc.errors()})
     return JSONResponse(
@@ -47,3 +130,6 @@ async def validation_exception_handler(_request: Request, exc: RequestValidation
             "errors": exc.errors(),
         },
     )
+
+
+app = create_app()
@@ -1,9 +1,59 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-from app.domain.game import Game
+from app.domain.game import Game, as_utc
+from app.domain.stats import OutcomeKey
+
+# Keyset position in the (created_at, id) ordering
+PageKey = Tuple[datetime, str]
+
+
+@dataclass(frozen=True)
+class GameListQuery:
+    statuses: Tuple[str, ...] = ()
+    difficulties: Tuple[str, ...] = ()
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    def __post_init__(self) -> None:
+        # Query strings may carry naive times; games are stamped in UTC
+        if self.created_from is not None:
+            object.__setattr__(self, "created_from", as_utc(self.created_from))
+        if self.created_to is not None:
+            object.__setattr__(self, "created_to", as_utc(self.created_to))
+
+
+@dataclass(frozen=True, slots=True)
+class GameListRow:
+    """One game of a listing: its stored columns, without moves."""
+
+    id: str
+    board: str
+    next_player: str
+    difficulty: str
+    status: str
+    human_symbol: str
+    created_at: datetime
+    updated_at: datetime
+    mode: str
+
+    @classmethod
+    def of(cls, game: Game) -> "GameListRow":
+        return cls(
+            id=game.id,
+            board=game.board.to_string(),
+            next_player=game.next_player.value,
+            difficulty=game.difficulty.value,
+            status=game.status.value,
+            human_symbol=game.human_symbol.value,
+            created_at=game.created_at,
+            updated_at=game.updated_at,
+            mode=game.mode.value,
+        )
 
 
 class GameRepository(ABC):
@@ -14,3 +64,72 @@ class GameRepository(ABC):
     @abstractmethod
     def save(self, game: Game) -> Game:
         raise NotImplementedError
+
+    def get_version(self, game_id: str) -> Optional[datetime]:
+        """Return the game's updated_at without needing the full game.
+
+        Used for conditional reads; implementations should override this with
+        a cheaper lookup than get().
+        """
+        game = self.get(game_id)
+        return game.updated_at if game else None
+
+    @abstractmethod
+    def list_page(
+        self,
+        query: GameListQuery,
+        after: Optional[PageKey],
+        limit: int,
+    ) -> List[GameListRow]:
+        """Games newest first by (created_at, id), strictly after the given key."""
+        raise NotImplementedError
+
+
+class StatsRepository(ABC):
+    """Finished-game outcome rollup (see app.domain.stats.OutcomeKey)."""
+
+    @abstractmethod
+    def increment(self, counts: Mapping[OutcomeKey, int]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def counts(self) -> List[Tuple[OutcomeKey, int]]:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """A response kept under an Idempotency-Key; status is None while the first request runs."""
+
+    fingerprint: str
+    status: Optional[int] = None
+    content_type: Optional[str] = None
+    body: bytes = b""
+
+
+class IdempotencyStore(ABC):
+    """Responses of idempotent POSTs, by key, for a limited time.
+
+    begin claims a key atomically, so of several concurrent requests with the
+    same key exactly one runs; the rest see the pending entry.
+    """
+
+    # Whether calls do I/O and must stay off the event loop
+    blocking: bool = False
+
+    @abstractmethod
+    def begin(self, key: str, fingerprint: str, lock_s: float) -> Optional[StoredResponse]:
+        """Claim key for lock_s seconds and return None, or return the entry already there."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, key: str, response: StoredResponse, ttl_s: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def release(self, key: str) -> None:
+        """Drop a claim whose request failed, so a retry can run."""
+        raise NotImplementedError
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {}
@@ -1,22 +1,171 @@
 from __future__ import annotations
 
+import sys
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
 from threading import RLock
-from typing import Dict, Optional
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
+from app.core.memory import approx_deep_size
+from app.core.tracing import traced
+from app.domain.board import Board
 from app.domain.game import Game
-from app.repositories.base import GameRepository
+from app.domain.stats import OutcomeKey, outcome_key
+from app.repositories.base import (
+    GameListQuery,
+    GameListRow,
+    GameRepository,
+    IdempotencyStore,
+    PageKey,
+    StatsRepository,
+    StoredResponse,
+)
 
 
-class InMemoryGameRepository(GameRepository):
+class InMemoryStatsRepository(StatsRepository):
     def __init__(self) -> None:
+        self._counts: Counter[OutcomeKey] = Counter()
+        self._lock = RLock()
+
+    def increment(self, counts: Mapping[OutcomeKey, int]) -> None:
+        with self._lock:
+            self._counts.update(counts)
+
+    def counts(self) -> List[Tuple[OutcomeKey, int]]:
+        with self._lock:
+            return list(self._counts.items())
+
+
+class InMemoryGameRepository(GameRepository):
+    def __init__(self, stats: Optional[InMemoryStatsRepository] = None) -> None:
         self._store: Dict[str, Game] = {}
+        # Ids already counted in the rollup; stored games are mutated in place,
+        # so the previous status is not available to detect the transition
+        self._finished: Set[str] = set()
         self._lock = RLock()
+        self.stats = stats or InMemoryStatsRepository()
 
+    @traced("repo.get", backend="memory")
     def get(self, game_id: str) -> Optional[Game]:
         with self._lock:
             return self._store.get(game_id)
 
+    def values(self) -> List[Game]:
+        """Snapshot of stored games (in-memory deployments only)."""
+        with self._lock:
+            return list(self._store.values())
+
+    @traced("repo.list_page", backend="memory")
+    def list_page(
+        self,
+        query: GameListQuery,
+        after: Optional[PageKey],
+        limit: int,
+    ) -> List[GameListRow]:
+        # Full sort is fine for in-memory (development) deployments
+        games = sorted(self.values(), key=lambda g: (g.created_at, g.id), reverse=True)
+        out: List[GameListRow] = []
+        for g in games:
+            if after is not None and (g.created_at, g.id) >= after:
+                continue
+            if query.statuses and g.status.value not in query.statuses:
+                continue
+            if query.difficulties and g.difficulty.value not in query.difficulties:
+                continue
+            if query.created_from and g.created_at < query.created_from:
+                continue
+            if query.created_to and g.created_at >= query.created_to:
+                continue
+            out.append(GameListRow.of(g))
+            if len(out) >= limit:
+                break
+        return out
+
+    @traced("repo.get_version", backend="memory")
+    def get_version(self, game_id: str) -> Optional[datetime]:
+        with self._lock:
+            game = self._store.get(game_id)
+            return game.updated_at if game else None
+
+    def sizes(self) -> Dict[str, object]:
+        """Entry counts and an estimate of the bytes held by stored games."""
+        with self._lock:
+            games = list(self._store.values())
+            finished = len(self._finished)
+            index_bytes = sys.getsizeof(self._store) + sys.getsizeof(self._finished)
+        return {
+            "games": approx_deep_size(games, shared=(Board,)),
+            "index_bytes": index_bytes,
+            "finished_ids": finished,
+            "stats_keys": len(self.stats.counts()),
+        }
+
+    @traced("repo.save", backend="memory")
     def save(self, game: Game) -> Game:
         with self._lock:
             self._store[game.id] = game
+            if game.id not in self._finished:
+                key = outcome_key(game)
+                if key is not None:
+                    self._finished.add(game.id)
+                    self.stats.increment({key: 1})
         return game
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Per-process store: at most max_entries keys, oldest evicted first.
+
+    Retries must reach the same process to be deduplicated, so deployments
+    with several workers use the database store instead.
+    """
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        # key -> (expires at, monotonic clock; entry), in insertion order
+        self._entries: OrderedDict[str, Tuple[float, StoredResponse]] = OrderedDict()
+        self._lock = RLock()
+        self._evicted = 0
+        self._expired = 0
+
+    def begin(self, key: str, fingerprint: str, lock_s: float) -> Optional[StoredResponse]:
+        now = time.monotonic()
+        with self._lock:
+            found = self._entries.get(key)
+            if found is not None:
+                if found[0] > now:
+                    return found[1]
+                del self._entries[key]
+                self._expired += 1
+            self._entries[key] = (now + lock_s, StoredResponse(fingerprint))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evicted += 1
+        return None
+
+    def complete(self, key: str, response: StoredResponse, ttl_s: float) -> None:
+        with self._lock:
+            found = self._entries.get(key)
+            # An evicted or reclaimed claim is not brought back
+            if found is not None and found[1].status is None and found[1].fingerprint == response.fingerprint:
+                self._entries[key] = (time.monotonic() + ttl_s, response)
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            found = self._entries.get(key)
+            if found is not None and found[1].status is None:
+                del self._entries[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._entries.values())
+            evicted, expired = self._evicted, self._expired
+        return {
+            "store": "memory",
+            "entries": len(entries),
+            "max_entries": self.max_entries,
+            "pending": sum(1 for _, r in entries if r.status is None),
+            "body_bytes": sum(len(r.body) for _, r in entries),
+            "evicted": evicted,
+            "expired": expired,
+        }
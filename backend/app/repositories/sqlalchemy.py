@@ -1,15 +1,29 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
 
+from app.core.tracing import traced
 from app.domain.board import Board
-from app.domain.enums import Difficulty, GameStatus, Player
-from app.domain.game import Game
-from app.db.models import GameModel
-from app.repositories.base import GameRepository
+from app.domain.enums import Difficulty, GameMode, GameStatus, Player
+from app.domain.game import Game, load_board
+from app.domain.stats import OutcomeKey, outcome_key
+from app.db.models import GameArchiveModel, GameModel, GameOutcomeStatModel, IdempotencyKeyModel
+from app.repositories.base import (
+    GameListQuery,
+    GameListRow,
+    GameRepository,
+    IdempotencyStore,
+    PageKey,
+    StatsRepository,
+    StoredResponse,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,19 +32,69 @@ class SQLAlchemyGameRepository(GameRepository):
     def __init__(self, session: Session) -> None:
         self.session = session
 
+    @traced("repo.get", backend="sqlalchemy")
     def get(self, game_id: str) -> Optional[Game]:
         logger.debug("repo_get_game", extra={"game_id": game_id})
         model = self.session.get(GameModel, game_id)
         if not model:
-            logger.debug("repo_get_game_not_found", extra={"game_id": game_id})
-            return None
+            archived = self._get_archived(game_id)
+            if archived is None:
+                logger.debug("repo_get_game_not_found", extra={"game_id": game_id})
+            return archived
         domain = self._to_domain(model)
         logger.debug("repo_get_game_ok", extra={"game_id": game_id, "status": domain.status.value})
         return domain
 
+    @traced("repo.get_version", backend="sqlalchemy")
+    def get_version(self, game_id: str) -> Optional[datetime]:
+        # Single-column primary key lookup; avoids loading and mapping the row
+        version = self.session.execute(
+            select(GameModel.updated_at).where(GameModel.id == game_id)
+        ).scalar_one_or_none()
+        if version is None:
+            version = self.session.execute(
+                select(GameArchiveModel.finished_at).where(GameArchiveModel.id == game_id)
+            ).scalar_one_or_none()
+        return version
+
+    @traced("repo.list_page", backend="sqlalchemy")
+    def list_page(
+        self,
+        query: GameListQuery,
+        after: Optional[PageKey],
+        limit: int,
+    ) -> List[GameListRow]:
+        # Keyset on (created_at, id): every page is an index range scan on
+        # ix_games_created_at_id (or the status-prefixed variant), however deep
+        stmt = select(
+            GameModel.id,
+            GameModel.board,
+            GameModel.next_player,
+            GameModel.difficulty,
+            GameModel.status,
+            GameModel.human_symbol,
+            GameModel.created_at,
+            GameModel.updated_at,
+            GameModel.mode,
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(GameModel.created_at, GameModel.id) < tuple_(*after))
+        if query.statuses:
+            stmt = stmt.where(GameModel.status.in_(query.statuses))
+        if query.difficulties:
+            stmt = stmt.where(GameModel.difficulty.in_(query.difficulties))
+        if query.created_from:
+            stmt = stmt.where(GameModel.created_at >= query.created_from)
+        if query.created_to:
+            stmt = stmt.where(GameModel.created_at < query.created_to)
+        stmt = stmt.order_by(GameModel.created_at.desc(), GameModel.id.desc()).limit(limit)
+        return [GameListRow(**row._mapping) for row in self.session.execute(stmt)]
+
+    @traced("repo.save", backend="sqlalchemy")
     def save(self, game: Game) -> Game:
         logger.debug("repo_save_game", extra={"game_id": game.id, "status": game.status.value})
         model = self.session.get(GameModel, game.id)
+        was_finished = model is not None and model.status != GameStatus.IN_PROGRESS.value
         if model is None:
             model = GameModel(
                 id=game.id,
@@ -43,6 +107,7 @@ class SQLAlchemyGameRepository(GameRepository):
                 moves=list(game.moves) if game.moves else [],
                 created_at=game.created_at,
                 updated_at=game.updated_at,
+                mode=game.mode.value,
             )
             self.session.add(model)
             logger.debug("repo_insert_game", extra={"game_id": game.id})
@@ -56,20 +121,205 @@ class SQLAlchemyGameRepository(GameRepository):
             model.moves = list(game.moves) if game.moves else []
             model.updated_at = game.updated_at
             logger.debug("repo_update_game", extra={"game_id": game.id})
+        if not was_finished:
+            # Count the game in the rollup in the same transaction that finishes it
+            key = outcome_key(game)
+            if key is not None:
+                SQLAlchemyStatsRepository(self.session).increment({key: 1})
         # Commit is managed by dependency in get_session
         return game
 
+    def _get_archived(self, game_id: str) -> Optional[Game]:
+        # Finished games older than the archive cutoff live in games_archive
+        model = self.session.execute(
+            select(GameArchiveModel).where(GameArchiveModel.id == game_id)
+        ).scalar_one_or_none()
+        if model is None:
+            return None
+        logger.debug("repo_get_game_archived", extra={"game_id": game_id})
+        return self._archive_to_domain(model)
+
+    @staticmethod
+    def _archive_to_domain(model: GameArchiveModel) -> Game:
+        board = Board.from_string(model.board)
+        moves = list(model.moves or [])
+        human = Player(model.human_symbol)
+        # A finished game keeps the last mover as next_player
+        last_mover = Player(board.cell(moves[-1])) if moves else human
+        return Game(
+            id=model.id,
+            board=board,
+            next_player=last_mover,
+            difficulty=Difficulty(model.difficulty),
+            status=GameStatus(model.status),
+            human_symbol=human,
+            computer_symbol=human.other,
+            moves=moves,
+            created_at=model.created_at,
+            updated_at=model.finished_at,
+        )
+
     @staticmethod
     def _to_domain(model: GameModel) -> Game:
+        moves = list(model.moves or [])
         return Game(
             id=model.id,
-            board=Board.from_string(model.board),
+            board=load_board(model.mode, model.board, moves),
             next_player=Player(model.next_player),
             difficulty=Difficulty(model.difficulty),
             status=GameStatus(model.status),
             human_symbol=Player(model.human_symbol),
             computer_symbol=Player(model.computer_symbol),
-            moves=list(model.moves or []),
+            moves=moves,
             created_at=model.created_at,
             updated_at=model.updated_at,
+            mode=GameMode(model.mode),
         )
+
+
+_STATS_KEY_COLUMNS = ("difficulty", "first_player", "human_symbol", "opening_move", "result")
+
+
+class SQLAlchemyStatsRepository(StatsRepository):
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def increment(self, counts: Mapping[OutcomeKey, int]) -> None:
+        rows: List[Dict[str, Any]] = [
+            {
+                "difficulty": key.difficulty,
+                "first_player": key.first_player,
+                "human_symbol": key.human_symbol,
+                "opening_move": key.opening_move,
+                "result": key.result,
+                "games": n,
+            }
+            for key, n in counts.items()
+            if n
+        ]
+        if not rows:
+            return
+        dialect = self.session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            table = GameOutcomeStatModel.__table__
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(_STATS_KEY_COLUMNS),
+                set_={"games": table.c.games + stmt.excluded.games},
+            )
+            self.session.execute(stmt, rows)
+        else:
+            for row in rows:
+                pk = tuple(row[c] for c in _STATS_KEY_COLUMNS)
+                model = self.session.get(GameOutcomeStatModel, pk, with_for_update=True)
+                if model is None:
+                    self.session.add(GameOutcomeStatModel(**row))
+                else:
+                    model.games += row["games"]
+            self.session.flush()
+        logger.debug("repo_stats_incremented", extra={"rows": len(rows)})
+
+    def counts(self) -> List[Tuple[OutcomeKey, int]]:
+        result = self.session.execute(select(GameOutcomeStatModel.__table__))
+        return [
+            (
+                OutcomeKey(
+                    difficulty=row.difficulty,
+                    first_player=row.first_player,
+                    human_symbol=row.human_symbol,
+                    opening_move=row.opening_move,
+                    result=row.result,
+                ),
+                row.games,
+            )
+            for row in result
+        ]
+
+
+class SQLAlchemyIdempotencyStore(IdempotencyStore):
+    """Idempotency entries in the idempotency_keys table, shared by all workers.
+
+    Each call runs in its own short transaction rather than the request's
+    session: the claim must be visible to concurrent retries before the
+    request does its work, and must survive the request's rollback.
+    """
+
+    blocking = True
+
+    def __init__(self, session_factory: "sessionmaker[Session]", purge_every: int = 1000) -> None:
+        self.session_factory = session_factory
+        # Expired rows are deleted every purge_every completions
+        self.purge_every = purge_every
+        self._completed = 0
+        self._purged = 0
+        self._lock = Lock()
+
+    def begin(self, key: str, fingerprint: str, lock_s: float) -> Optional[StoredResponse]:
+        now = datetime.now(timezone.utc)
+        model = IdempotencyKeyModel
+        with self.session_factory.begin() as db:
+            # An expired entry frees its key for reuse
+            db.execute(delete(model).where(model.key == key, model.expires_at <= now))
+            row = {"key": key, "fingerprint": fingerprint, "expires_at": now + timedelta(seconds=lock_s)}
+            dialect = db.get_bind().dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                if dialect == "postgresql":
+                    from sqlalchemy.dialects.postgresql import insert
+                else:
+                    from sqlalchemy.dialects.sqlite import insert
+                claimed = db.execute(insert(model).values(**row).on_conflict_do_nothing(index_elements=["key"])).rowcount == 1
+            else:
+                try:
+                    with db.begin_nested():
+                        db.add(model(**row))
+                    claimed = True
+                except IntegrityError:
+                    claimed = False
+            if claimed:
+                return None
+            found = db.get(model, key)
+            if found is None:
+                # Released between the insert and the read; the retry will claim it
+                return StoredResponse(fingerprint)
+            return StoredResponse(found.fingerprint, found.status_code, found.content_type, found.body or b"")
+
+    def complete(self, key: str, response: StoredResponse, ttl_s: float) -> None:
+        model = IdempotencyKeyModel
+        with self.session_factory.begin() as db:
+            db.execute(
+                update(model)
+                .where(model.key == key, model.fingerprint == response.fingerprint, model.status_code.is_(None))
+                .values(
+                    status_code=response.status,
+                    content_type=response.content_type,
+                    body=response.body,
+                    expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl_s),
+                )
+            )
+        with self._lock:
+            self._completed += 1
+            purge = self._completed % self.purge_every == 0
+        if purge:
+            self.purge()
+
+    def release(self, key: str) -> None:
+        model = IdempotencyKeyModel
+        with self.session_factory.begin() as db:
+            db.execute(delete(model).where(model.key == key, model.status_code.is_(None)))
+
+    def purge(self) -> int:
+        model = IdempotencyKeyModel
+        with self.session_factory.begin() as db:
+            deleted = db.execute(delete(model).where(model.expires_at <= datetime.now(timezone.utc))).rowcount
+        with self._lock:
+            self._purged += deleted
+        logger.debug("idempotency_keys_purged", extra={"rows": deleted})
+        return deleted
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"store": "db", "completed": self._completed, "purged": self._purged}
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import List, Literal, Optional, TypedDict
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.domain.enums import GameStatus, Player
+
+MAX_POSITIONS = 10_000
+
+
+class AnalysisRequest(BaseModel):
+    positions: List[str] = Field(
+        min_length=1,
+        max_length=MAX_POSITIONS,
+        description="9-char boards in numpad EXTERNAL_ORDER (rows 7 8 9 / 4 5 6 / 1 2 3) with 'x', 'o', ' '",
+    )
+    to_move: Optional[Player] = Field(
+        default=None,
+        description="Side to move when both symbols have the same count (defaults to x); otherwise inferred",
+    )
+
+
+class MoveEvaluation(BaseModel):
+    position: int
+    result: Literal["win", "draw", "loss"]
+    distance: int = Field(description="Plies until the game ends under perfect play, this move included")
+
+
+class PositionAnalysis(BaseModel):
+    board: str
+    to_move: Optional[Player] = None
+    status: Optional[GameStatus] = None
+    result: Optional[Literal["win", "draw", "loss"]] = Field(default=None, description="Value for to_move under perfect play")
+    distance: Optional[int] = None
+    best_moves: List[int] = Field(default_factory=list)
+    moves: List[MoveEvaluation] = Field(default_factory=list)
+    error: Optional[str] = None
+
+
+class AnalysisResponse(BaseModel):
+    results: List[PositionAnalysis]
+    unique_positions: int
+
+
+# Wire shapes for the precompiled serializer; results are cached and shared,
+# so they are dumped without re-validation like game responses.
+class MoveEvaluationPayload(TypedDict):
+    position: int
+    result: str
+    distance: int
+
+
+class PositionAnalysisPayload(TypedDict, total=False):
+    board: str
+    to_move: Optional[str]
+    status: Optional[str]
+    result: Optional[str]
+    distance: Optional[int]
+    best_moves: List[int]
+    moves: List[MoveEvaluationPayload]
+    error: Optional[str]
+
+
+class AnalysisPayload(TypedDict):
+    results: List[PositionAnalysisPayload]
+    unique_positions: int
+
+
+ANALYSIS_ADAPTER: TypeAdapter[AnalysisPayload] = TypeAdapter(AnalysisPayload)
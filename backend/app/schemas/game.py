@@ -5,13 +5,14 @@ from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
-from app.domain.enums import Difficulty, GameStatus, Player
+from app.domain.enums import Difficulty, GameMode, GameStatus, Player
 
 
 class CreateGameRequest(BaseModel):
     difficulty: Difficulty = Field(default=Difficulty.EASY)
     first_player: Literal["human", "computer"] = Field(default="human")
     human_symbol: Player = Field(default=Player.X)
+    mode: GameMode = Field(default=GameMode.CLASSIC)
 
 
 class GameRead(BaseModel):
@@ -22,9 +23,11 @@ class GameRead(BaseModel):
     status: GameStatus
     human_symbol: Player
     computer_symbol: Player
-    moves: List[int]
+    moves: List[int] = Field(description="Numpad positions 1..9; board * 10 + cell in ultimate games")
     created_at: datetime
     updated_at: datetime
+    mode: GameMode
+    active_board: Optional[int] = Field(default=None, description="Ultimate games: the board the next move must use, null when any open board is allowed")
 
 
 class CreateGameResponse(GameRead):
@@ -33,7 +36,25 @@ class CreateGameResponse(GameRead):
 
 class MoveRequest(BaseModel):
     position: int = Field(ge=1, le=9, description="Position in numpad layout 1..9")
+    board: Optional[int] = Field(default=None, ge=1, le=9, description="Ultimate games only: the board played in, numpad layout 1..9")
 
 
 class MoveResponse(GameRead):
-    ai_move: Optional[int] = None
+    ai_move: Optional[int] = Field(default=None, description="Numpad position; board * 10 + cell in ultimate games")
+
+
+class GameSummary(BaseModel):
+    id: str
+    board: str
+    next_player: Player
+    difficulty: Difficulty
+    status: GameStatus
+    human_symbol: Player
+    created_at: datetime
+    updated_at: datetime
+    mode: GameMode
+
+
+class GamePage(BaseModel):
+    items: List[GameSummary]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as cursor to fetch the next page; null on the last page")
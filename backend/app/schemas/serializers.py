@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional, TypedDict
+
+from pydantic import TypeAdapter
+
+from app.domain.game import Game
+from app.domain.ultimate import UltimateBoard
+from app.repositories.base import GameListRow
+
+
+class GamePayload(TypedDict):
+    """Wire shape of GameRead, used for serialization only (never validated)."""
+
+    id: str
+    board: str
+    next_player: str
+    difficulty: str
+    status: str
+    human_symbol: str
+    computer_symbol: str
+    moves: List[int]
+    created_at: datetime
+    updated_at: datetime
+    mode: str
+    active_board: Optional[int]
+
+
+class MovePayload(GamePayload):
+    ai_move: Optional[int]
+
+
+class GameSummaryPayload(TypedDict):
+    """Listing row: the columns a game list needs, without moves."""
+
+    id: str
+    board: str
+    next_player: str
+    difficulty: str
+    status: str
+    human_symbol: str
+    created_at: datetime
+    updated_at: datetime
+    mode: str
+
+
+class GamePagePayload(TypedDict):
+    items: List[GameSummaryPayload]
+    next_cursor: Optional[str]
+
+
+# Serializers are compiled once at import; dumping a dict through them skips
+# model construction and the response_model validation round trip.
+_GAME_ADAPTER: TypeAdapter[GamePayload] = TypeAdapter(GamePayload)
+_MOVE_ADAPTER: TypeAdapter[MovePayload] = TypeAdapter(MovePayload)
+_PAGE_ADAPTER: TypeAdapter[GamePagePayload] = TypeAdapter(GamePagePayload)
+
+
+def game_payload(game: Game) -> GamePayload:
+    return {
+        "id": game.id,
+        "board": game.board.to_string(),
+        "next_player": game.next_player.value,
+        "difficulty": game.difficulty.value,
+        "status": game.status.value,
+        "human_symbol": game.human_symbol.value,
+        "computer_symbol": game.computer_symbol.value,
+        "moves": game.moves,
+        "created_at": game.created_at,
+        "updated_at": game.updated_at,
+        "mode": game.mode.value,
+        "active_board": game.board.active if isinstance(game.board, UltimateBoard) else None,
+    }
+
+
+def dump_payload(payload: GamePayload) -> bytes:
+    return _GAME_ADAPTER.dump_json(payload)
+
+
+def dump_game(game: Game) -> bytes:
+    """Serialize a game to the CreateGameResponse JSON shape."""
+    return _GAME_ADAPTER.dump_json(game_payload(game))
+
+
+def dump_move(game: Game, ai_move: Optional[int]) -> bytes:
+    """Serialize a game to the MoveResponse JSON shape."""
+    payload: MovePayload = {**game_payload(game), "ai_move": ai_move}  # type: ignore[typeddict-item]
+    return _MOVE_ADAPTER.dump_json(payload)
+
+
+def summary_payload(row: GameListRow) -> GameSummaryPayload:
+    return {
+        "id": row.id,
+        "board": row.board,
+        "next_player": row.next_player,
+        "difficulty": row.difficulty,
+        "status": row.status,
+        "human_symbol": row.human_symbol,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "mode": row.mode,
+    }
+
+
+def dump_page(items: List[GameSummaryPayload], next_cursor: Optional[str]) -> bytes:
+    return _PAGE_ADAPTER.dump_json({"items": items, "next_cursor": next_cursor})
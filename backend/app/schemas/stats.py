@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class OutcomeRates(BaseModel):
+    games: int
+    wins: int
+    draws: int
+    losses: int
+    win_rate: float
+    draw_rate: float
+    loss_rate: float
+
+
+class OpeningMoveStats(OutcomeRates):
+    position: int
+    share: float
+
+
+class StatsResponse(BaseModel):
+    """Finished-game outcomes; results are from the human player's point of view."""
+
+    overall: OutcomeRates
+    by_difficulty: Dict[str, OutcomeRates]
+    by_first_player: Dict[str, OutcomeRates]
+    by_human_symbol: Dict[str, OutcomeRates]
+    opening_moves: List[OpeningMoveStats]
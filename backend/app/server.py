@@ -0,0 +1,313 @@
+"""Production launcher: preload once, fork workers that share a listening socket.
+
+The parent imports the app and builds the read-only tables every worker
+needs (solved positions, interned boards, compiled serializers and
+schemas), freezes them out of the GC's reach and then forks. Workers inherit
+those pages copy-on-write instead of each building a private copy.
+Per-worker state that must not cross a fork, such as the DB engine and its
+connection pool, is still built by each worker's lifespan.
+
+Run from backend/:
+
+    uv run python main.py --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.logging import configure_logging
+from app.core.memory import memory_usage
+from app.core.settings import Settings, get_settings
+
+logger = logging.getLogger("app.server")
+
+
+def preload() -> Dict[str, float]:
+    """Build the read-only state workers share; returns timings in ms."""
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    import app.main  # noqa: F401  routes, schemas and compiled serializers
+
+    timings["import_ms"] = (time.perf_counter() - start) * 1e3
+
+    from app.domain.ai.solver import solved_table
+    from app.domain.board import preload_boards
+
+    t = time.perf_counter()
+    solved_table()
+    preload_boards()
+    timings["tables_ms"] = (time.perf_counter() - t) * 1e3
+    return timings
+
+
+def _pick(requested: str, candidates: Dict[str, str], default: str) -> str:
+    if requested != "auto":
+        return requested
+    for name, module in candidates.items():
+        if importlib.util.find_spec(module) is not None:
+            return name
+    return default
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+# A worker that dies sooner than this after forking counts as a failed start
+_MIN_UPTIME_S = 5.0
+_MAX_FAILED_STARTS = 5
+
+
+class _Worker:
+    def __init__(self, pid: int, started: float) -> None:
+        self.pid = pid
+        self.started = started
+
+
+class Launcher:
+    """Parent process: owns the socket, forks workers, restarts crashed ones
+    and drains them on SIGTERM/SIGINT."""
+
+    def __init__(self, args: argparse.Namespace, settings: Settings) -> None:
+        self.args = args
+        self.settings = settings
+        self.workers: Dict[int, _Worker] = {}
+        self.stopping = False
+        self.exit_code = 0
+        self._failed_starts = 0
+        self.sock: Optional[socket.socket] = None
+        self.loop_impl = _pick(args.loop, {"uvloop": "uvloop"}, "asyncio")
+        self.http_impl = _pick(args.http, {"httptools": "httptools"}, "h11")
+
+    def _config(self) -> Any:
+        import uvicorn
+
+        from app.main import app
+
+        return uvicorn.Config(
+            app,
+            loop=self.loop_impl,
+            http=self.http_impl,
+            lifespan="on",
+            log_config=None,
+            log_level=self.settings.log_level.lower(),
+            access_log=False,
+            timeout_graceful_shutdown=self.args.drain_timeout,
+            timeout_keep_alive=self.args.keep_alive,
+        )
+
+    def _serve(self) -> None:
+        """Worker body: run one uvicorn server on the inherited socket."""
+        import uvicorn
+
+        started = time.perf_counter()
+
+        class Server(uvicorn.Server):
+            async def startup(self, sockets: Optional[List[socket.socket]] = None) -> None:
+                await super().startup(sockets=sockets)
+                logger.info(
+                    "worker_ready",
+                    extra={
+                        "pid": os.getpid(),
+                        "startup_ms": round((time.perf_counter() - started) * 1e3, 1),
+                        "memory_kib": memory_usage(),
+                    },
+                )
+
+        Server(self._config()).run(sockets=[self.sock])
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # Own process group: a terminal Ctrl-C reaches only the parent,
+            # which then asks each worker to drain exactly once
+            os.setpgid(0, 0)
+            # Child: default signal handling until uvicorn installs its own
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                self._serve()
+            except BaseException:
+                logger.exception("worker_crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = _Worker(pid, time.monotonic())
+
+    def _on_signal(self, signum: int, _frame: Any) -> None:
+        if not self.stopping:
+            logger.info("server_draining", extra={"signal": signal.Signals(signum).name, "workers": len(self.workers)})
+        self.stopping = True
+
+    def report_memory(self) -> None:
+        rows = {pid: memory_usage(pid) for pid in self.workers}
+        rows = {pid: m for pid, m in rows.items() if m}
+        if not rows:
+            return
+        parent = memory_usage()
+        total_rss = sum(m["rss"] for m in rows.values())
+        total_pss = sum(m["pss"] for m in rows.values())
+        shared = sum(m["shared_clean"] + m["shared_dirty"] for m in rows.values())
+        logger.info(
+            "worker_memory",
+            extra={
+                "workers": {pid: {"rss_kib": m["rss"], "pss_kib": m["pss"]} for pid, m in rows.items()},
+                "parent_rss_kib": parent["rss"] if parent else None,
+                "total_rss_kib": total_rss,
+                "total_pss_kib": total_pss,
+                "shared_fraction": round(shared / total_rss, 3) if total_rss else 0.0,
+            },
+        )
+        if self.args.print_memory:
+            print(f"{'pid':>8} {'rss MiB':>9} {'pss MiB':>9} {'shared MiB':>11} {'private MiB':>12}", flush=True)
+            for pid, m in sorted(rows.items()):
+                print(
+                    f"{pid:>8} {m['rss'] / 1024:>9.1f} {m['pss'] / 1024:>9.1f} "
+                    f"{(m['shared_clean'] + m['shared_dirty']) / 1024:>11.1f} "
+                    f"{(m['private_clean'] + m['private_dirty']) / 1024:>12.1f}",
+                    flush=True,
+                )
+            print(
+                f"{'total':>8} {total_rss / 1024:>9.1f} {total_pss / 1024:>9.1f}"
+                f"   ({shared / total_rss:.0%} of worker RSS is shared)",
+                flush=True,
+            )
+
+    def run(self) -> int:
+        import uvicorn  # noqa: F401  fail here, not in every forked worker
+
+        t0 = time.perf_counter()
+        timings = preload() if self.args.preload else {}
+        # Move everything built so far to the permanent generation: the
+        # collector then never writes to those objects' headers, which would
+        # unshare their pages in every worker.
+        gc.freeze()
+        self.sock = _bind(self.args.host, self.args.port, self.args.backlog)
+        logger.info(
+            "server_starting",
+            extra={
+                "address": f"{self.args.host}:{self.args.port}",
+                "workers": self.args.workers,
+                "loop": self.loop_impl,
+                "http": self.http_impl,
+                "preload": self.args.preload,
+                **{k: round(v, 1) for k, v in timings.items()},
+                "parent_ready_ms": round((time.perf_counter() - t0) * 1e3, 1),
+            },
+        )
+
+        if self.args.workers > 1 and not self.settings.database_url:
+            logger.warning("in_memory_repository_per_worker", extra={"workers": self.args.workers})
+
+        signal.signal(signal.SIGTERM, self._on_signal)
+        signal.signal(signal.SIGINT, self._on_signal)
+        for _ in range(self.args.workers):
+            self._spawn()
+
+        report_at = time.monotonic() + self.args.memory_report_after if self.args.memory_report_after > 0 else None
+        while not self.stopping:
+            self._reap(respawn=True)
+            if report_at is not None and time.monotonic() >= report_at:
+                self.report_memory()
+                report_at = None
+            time.sleep(0.2)
+        return self._drain()
+
+    def _reap(self, respawn: bool) -> None:
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            worker = self.workers.pop(pid, None)
+            if worker is None:
+                continue
+            if respawn and not self.stopping:
+                uptime = time.monotonic() - worker.started
+                logger.warning(
+                    "worker_exited",
+                    extra={"pid": pid, "status": os.waitstatus_to_exitcode(status), "uptime_s": round(uptime, 1)},
+                )
+                self._failed_starts = self._failed_starts + 1 if uptime < _MIN_UPTIME_S else 0
+                if self._failed_starts >= _MAX_FAILED_STARTS:
+                    # Workers cannot start (bad config, DB down at startup); stop instead of fork-looping
+                    logger.error("workers_failing_to_start", extra={"failed_starts": self._failed_starts})
+                    self.stopping = True
+                    self.exit_code = 1
+                    return
+                self._spawn()
+
+    def _drain(self) -> int:
+        # Workers stop accepting, finish in-flight requests for up to
+        # drain_timeout seconds, run their lifespan shutdown and exit.
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.args.drain_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning("worker_killed", extra={"pid": pid})
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        if self.sock is not None:
+            self.sock.close()
+        logger.info("server_stopped")
+        return self.exit_code
+
+
+def parse_args(argv: Optional[List[str]], settings: Settings) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("-w", "--workers", type=int, default=settings.web_concurrency, help="worker processes (WEB_CONCURRENCY)")
+    parser.add_argument("--loop", choices=("auto", "uvloop", "asyncio"), default=settings.server_loop)
+    parser.add_argument("--http", choices=("auto", "httptools", "h11"), default=settings.server_http)
+    parser.add_argument("--drain-timeout", type=float, default=settings.server_drain_timeout_s, help="seconds to finish in-flight requests on shutdown")
+    parser.add_argument("--keep-alive", type=int, default=5, help="idle keep-alive timeout in seconds")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--no-preload", dest="preload", action="store_false", help="skip building shared state in the parent (for comparison)")
+    parser.add_argument("--memory-report-after", type=float, default=10.0, help="log per-worker RSS/PSS this many seconds after start; 0 disables")
+    parser.add_argument("--print-memory", action="store_true", help="also print the memory report as a table")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    settings = get_settings()
+    configure_logging(settings.log_level)
+    args = parse_args(argv, settings)
+    if not hasattr(os, "fork"):
+        sys.exit("app.server needs os.fork; use `uvicorn app.main:app` on this platform")
+    return Launcher(args, settings).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.ai.solver import RESULT_NAMES, evaluate_moves
+from app.domain.board import Board
+from app.domain.enums import GameStatus, Player
+from app.domain.exceptions import InvalidBoardError
+from app.schemas.analysis import AnalysisPayload, PositionAnalysisPayload
+
+
+def _side_to_move(board: Board, tie: Player) -> Optional[Player]:
+    x, o = board.counts()
+    if x == o:
+        return tie
+    if x == o + 1:
+        return Player.O
+    if o == x + 1:
+        return Player.X
+    return None
+
+
+def _reachable_win(board: Board, winner: Player, to_move: Player) -> bool:
+    """Whether the game could have ended in this won board.
+
+    The winner must have made the last move, and some mark of theirs must be
+    one whose removal leaves nobody with a line: otherwise the game was
+    already over before it, or the other side has a line too.
+    """
+    if winner == to_move:
+        return False
+    state, mark = board.state, winner.value
+    return any(
+        c == mark and Board.from_string(state[:i] + " " + state[i + 1 :]).winner() is None
+        for i, c in enumerate(state)
+    )
+
+
+@lru_cache(maxsize=65536)
+def analyze_position(state: str, tie: Player = Player.X) -> PositionAnalysisPayload:
+    """Per-move evaluation of one board; results are shared, do not mutate."""
+    try:
+        board = Board.from_string(state)
+    except InvalidBoardError:
+        return {"board": state, "error": "invalid_board"}
+    to_move = _side_to_move(board, tie)
+    if to_move is None:
+        return {"board": state, "error": "invalid_counts"}
+    winner = board.winner()
+    if winner is not None:
+        if not _reachable_win(board, winner, to_move):
+            return {"board": state, "error": "unreachable"}
+        status = GameStatus.X_WON if winner == Player.X else GameStatus.O_WON
+        return {"board": state, "status": status.value, "best_moves": [], "moves": []}
+    if board.is_full():
+        return {"board": state, "status": GameStatus.DRAW.value, "best_moves": [], "moves": []}
+
+    evaluated = evaluate_moves(state, to_move)
+    # Best value first; among equals, fastest win / slowest loss
+    ranked = sorted(evaluated, key=lambda m: (-m[1], m[2] if m[1] > 0 else -m[2], m[0]))
+    best_value, best_distance = ranked[0][1], ranked[0][2]
+    return {
+        "board": state,
+        "to_move": to_move.value,
+        "status": GameStatus.IN_PROGRESS.value,
+        "result": RESULT_NAMES[best_value],
+        "distance": best_distance,
+        "best_moves": sorted(p for p, v, d in evaluated if (v, d) == (best_value, best_distance)),
+        "moves": [{"position": p, "result": RESULT_NAMES[v], "distance": d} for p, v, d in ranked],
+    }
+
+
+def analyze_batch(positions: List[str], to_move: Optional[Player] = None) -> AnalysisPayload:
+    """Evaluate a batch, computing each distinct board once."""
+    tie = to_move or Player.X
+    unique: Dict[Tuple[str, Player], PositionAnalysisPayload] = {}
+    results: List[PositionAnalysisPayload] = []
+    for state in positions:
+        key = (state, tie)
+        item = unique.get(key)
+        if item is None:
+            item = unique[key] = analyze_position(state, tie)
+        results.append(item)
+    return {"results": results, "unique_positions": len(unique)}
@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.db.models import GameArchiveModel, GameModel
+from app.domain.board import EXTERNAL_TO_INDEX, Board
+from app.domain.enums import Difficulty, GameMode, GameStatus, Player
+from app.domain.exceptions import InvalidBoardError
+from app.domain.stats import OutcomeKey, outcome_key_from
+from app.repositories.sqlalchemy import SQLAlchemyStatsRepository
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = (
+    "id",
+    "board",
+    "next_player",
+    "difficulty",
+    "status",
+    "human_symbol",
+    "computer_symbol",
+    "moves",
+    "created_at",
+    "updated_at",
+)
+_DIFFICULTIES = frozenset(d.value for d in Difficulty)
+_PLAYERS = frozenset(p.value for p in Player)
+_OTHER = {"x": "o", "o": "x"}
+
+
+class RejectedRecord(ValueError):
+    """A source record that does not describe a reachable game."""
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    reject_reasons: Counter[str] = field(default_factory=Counter)
+    elapsed_s: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.inserted / self.elapsed_s if self.elapsed_s else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Reading
+
+
+def read_ndjson(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rec = json.loads(line)
+        except json.JSONDecodeError:
+            rec = None
+        # Surface as a reject rather than aborting the whole import
+        yield rec if isinstance(rec, dict) else {"_error": "invalid_json"}
+
+
+def read_csv(stream: IO[str]) -> Iterator[Dict[str, Any]]:
+    """CSV with the GameRead column names; moves as '7 5 3', '7,5,3' or '[7,5,3]'."""
+    for rec in csv.DictReader(stream):
+        raw = (rec.get("moves") or "").strip().strip("[]{}")
+        try:
+            rec["moves"] = [int(m) for m in raw.replace(",", " ").split()]
+        except ValueError:
+            rec["moves"] = None
+        yield rec
+
+
+def batched(records: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------------------------------------------------------------------------
+# Validation
+
+
+@lru_cache(maxsize=None)
+def _board_facts(state: str) -> Tuple[int, int, str]:
+    """(x count, o count, derived status) for a board, via the Board rules.
+
+    At most 3^9 distinct boards exist, so the cache is bounded and large
+    imports validate most rows with a dict lookup.
+    """
+    board = Board.from_string(state)
+    x, o = board.counts()
+    winner = board.winner()
+    if winner is not None:
+        status = GameStatus.X_WON.value if winner == Player.X else GameStatus.O_WON.value
+    elif board.is_full():
+        status = GameStatus.DRAW.value
+    else:
+        status = GameStatus.IN_PROGRESS.value
+    return x, o, status
+
+
+def _timestamp(value: Any, name: str) -> datetime:
+    if isinstance(value, datetime):
+        ts = value
+    else:
+        try:
+            ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            raise RejectedRecord(f"invalid_{name}")
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def validate_record(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a games row for rec or raise RejectedRecord with a short reason."""
+    if "_error" in rec:
+        raise RejectedRecord(rec["_error"])
+    # moves may be absent for games nobody has played yet
+    missing = [c for c in COLUMNS if c != "moves" and rec.get(c) in (None, "")]
+    if missing:
+        raise RejectedRecord("missing_" + missing[0])
+
+    if rec.get("mode", GameMode.CLASSIC.value) != GameMode.CLASSIC.value:
+        raise RejectedRecord("unsupported_mode")
+
+    game_id = str(rec["id"])
+    if len(game_id) > 36:
+        raise RejectedRecord("invalid_id")
+    state = rec["board"]
+    try:
+        x, o, derived_status = _board_facts(state)
+    except (InvalidBoardError, TypeError):
+        raise RejectedRecord("invalid_board")
+
+    difficulty, status = rec["difficulty"], rec["status"]
+    human, computer, next_player = rec["human_symbol"], rec["computer_symbol"], rec["next_player"]
+    # Checked for str first: a JSON list or object here is unhashable
+    if not isinstance(difficulty, str) or difficulty not in _DIFFICULTIES:
+        raise RejectedRecord("invalid_difficulty")
+    if (
+        not all(isinstance(v, str) for v in (human, computer, next_player))
+        or human not in _PLAYERS
+        or computer != _OTHER.get(human)
+        or next_player not in _PLAYERS
+    ):
+        raise RejectedRecord("invalid_symbols")
+    if status != derived_status:
+        raise RejectedRecord("status_mismatch")
+
+    moves = rec.get("moves") or []
+    if not isinstance(moves, list) or any(not isinstance(m, int) or m not in EXTERNAL_TO_INDEX for m in moves):
+        raise RejectedRecord("invalid_moves")
+    if len(moves) != x + o or len(set(moves)) != len(moves):
+        raise RejectedRecord("moves_mismatch")
+    if moves:
+        # Marks must alternate starting with whoever moved first
+        first = state[EXTERNAL_TO_INDEX[moves[0]]]
+        for i, pos in enumerate(moves):
+            expected = first if i % 2 == 0 else _OTHER[first]
+            if state[EXTERNAL_TO_INDEX[pos]] != expected:
+                raise RejectedRecord("moves_mismatch")
+        last_idx = EXTERNAL_TO_INDEX[moves[-1]]
+        last = state[last_idx]
+        if status != GameStatus.IN_PROGRESS.value:
+            # The game must not already have been over before its last move
+            before = state[:last_idx] + " " + state[last_idx + 1 :]
+            if _board_facts(before)[2] != GameStatus.IN_PROGRESS.value:
+                raise RejectedRecord("moves_after_game_over")
+        expected_next = _OTHER[last] if status == GameStatus.IN_PROGRESS.value else last
+        if next_player != expected_next:
+            raise RejectedRecord("next_player_mismatch")
+
+    created_at = _timestamp(rec["created_at"], "created_at")
+    updated_at = _timestamp(rec["updated_at"], "updated_at")
+    if updated_at < created_at:
+        raise RejectedRecord("timestamps_out_of_order")
+
+    return {
+        "id": game_id,
+        "board": state,
+        "next_player": next_player,
+        "difficulty": difficulty,
+        "status": status,
+        "human_symbol": human,
+        "computer_symbol": computer,
+        "moves": list(moves),
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+
+
+def validate_batch(records: List[Dict[str, Any]], report: ImportReport) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    seen: set[str] = set()
+    for rec in records:
+        try:
+            row = validate_record(rec)
+        except RejectedRecord as e:
+            report.rejected += 1
+            report.reject_reasons[str(e)] += 1
+            continue
+        if row["id"] in seen:
+            report.duplicates += 1
+            continue
+        seen.add(row["id"])
+        rows.append(row)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Loading
+
+
+def _copy_rows(db: Session, rows: List[Dict[str, Any]]) -> List[str]:
+    """PostgreSQL fast path: COPY into a temp staging table, then insert ids not stored yet."""
+    db.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS games_import "
+            "(LIKE games INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+    )
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for r in rows:
+        writer.writerow(
+            (
+                r["id"],
+                r["board"],
+                r["next_player"],
+                r["difficulty"],
+                r["status"],
+                r["human_symbol"],
+                r["computer_symbol"],
+                "{" + ",".join(map(str, r["moves"])) + "}",
+                r["created_at"].isoformat(),
+                r["updated_at"].isoformat(),
+            )
+        )
+    buf.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY games_import ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cursor.close()
+    result = db.execute(
+        text(
+            f"INSERT INTO games ({', '.join(COLUMNS)}) "
+            f"SELECT {', '.join(COLUMNS)} FROM games_import i "
+            "WHERE NOT EXISTS (SELECT 1 FROM games_archive a WHERE a.id = i.id) "
+            "ON CONFLICT (id) DO NOTHING RETURNING id"
+        )
+    )
+    return [r[0] for r in result]
+
+
+def _executemany_rows(db: Session, rows: List[Dict[str, Any]]) -> List[str]:
+    """Portable path (SQLite and others): skip known ids, then one executemany INSERT."""
+    ids = [r["id"] for r in rows]
+    # An archived game was counted in the stats when it finished
+    existing = set(db.execute(select(GameModel.id).where(GameModel.id.in_(ids))).scalars())
+    existing.update(db.execute(select(GameArchiveModel.id).where(GameArchiveModel.id.in_(ids))).scalars())
+    fresh = [r for r in rows if r["id"] not in existing]
+    if fresh:
+        db.execute(insert(GameModel), fresh)
+    return [r["id"] for r in fresh]
+
+
+def load_batch(db: Session, rows: List[Dict[str, Any]], report: ImportReport) -> None:
+    """Insert validated rows in the caller's transaction and update the stats rollup."""
+    if not rows:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        inserted_ids = set(_copy_rows(db, rows))
+    else:
+        inserted_ids = set(_executemany_rows(db, rows))
+    report.inserted += len(inserted_ids)
+    report.duplicates += len(rows) - len(inserted_ids)
+
+    # Imported finished games count in /stats like games finished live
+    outcomes: Counter[OutcomeKey] = Counter()
+    for r in rows:
+        if r["id"] in inserted_ids:
+            key = outcome_key_from(r["difficulty"], r["status"], r["human_symbol"], r["board"], r["moves"])
+            if key is not None:
+                outcomes[key] += 1
+    SQLAlchemyStatsRepository(db).increment(outcomes)
+
+
+def import_records(
+    session_factory: Any,
+    records: Iterable[Dict[str, Any]],
+    *,
+    batch_size: int = 5000,
+    report: Optional[ImportReport] = None,
+) -> ImportReport:
+    """Validate and insert records batch by batch, one transaction per batch."""
+    report = report or ImportReport()
+    start = time.perf_counter()
+    for batch in batched(records, batch_size):
+        report.read += len(batch)
+        rows = validate_batch(batch, report)
+        with session_factory.begin() as db:
+            load_batch(db, rows, report)
+        report.elapsed_s = time.perf_counter() - start
+        logger.info(
+            "import_batch_done",
+            extra={
+                "read": report.read,
+                "inserted": report.inserted,
+                "rejected": report.rejected,
+                "rows_per_s": round(report.rows_per_second),
+            },
+        )
+    report.elapsed_s = time.perf_counter() - start
+    return report
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+
+from app.domain.board import EXTERNAL_TO_INDEX
+from app.domain.enums import GameMode
+from app.domain.game import Game, as_utc
+from app.domain.ultimate import UltimateBoard
+from app.schemas.serializers import GamePayload, dump_payload, game_payload
+
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session
+
+# Flush to the client/file in chunks this large rather than per line
+CHUNK_BYTES = 64 * 1024
+_OTHER = {"x": "o", "o": "x"}
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    statuses: Tuple[str, ...] = ()
+    difficulties: Tuple[str, ...] = ()
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    include_archived: bool = True
+
+    def __post_init__(self) -> None:
+        # Query strings may carry naive times; games are stamped in UTC
+        if self.created_from is not None:
+            object.__setattr__(self, "created_from", as_utc(self.created_from))
+        if self.created_to is not None:
+            object.__setattr__(self, "created_to", as_utc(self.created_to))
+
+    def matches(self, game: Game) -> bool:
+        if self.statuses and game.status.value not in self.statuses:
+            return False
+        if self.difficulties and game.difficulty.value not in self.difficulties:
+            return False
+        if self.created_from and game.created_at < self.created_from:
+            return False
+        if self.created_to and game.created_at >= self.created_to:
+            return False
+        return True
+
+
+def iter_db_payloads(db: "Session", flt: ExportFilter, *, batch_size: int = 1000) -> Iterator[GamePayload]:
+    """Yield wire payloads straight from result rows, hot table then archive.
+
+    yield_per makes the driver use a server-side cursor, so at most
+    batch_size rows are buffered however large the tables are.
+    """
+    from sqlalchemy import select
+
+    from app.db.models import GameArchiveModel, GameModel
+
+    def where(model, stmt):
+        if flt.statuses:
+            stmt = stmt.where(model.status.in_(flt.statuses))
+        if flt.difficulties:
+            stmt = stmt.where(model.difficulty.in_(flt.difficulties))
+        if flt.created_from:
+            stmt = stmt.where(model.created_at >= flt.created_from)
+        if flt.created_to:
+            stmt = stmt.where(model.created_at < flt.created_to)
+        return stmt.execution_options(yield_per=batch_size)
+
+    hot = where(
+        GameModel,
+        select(
+            GameModel.id,
+            GameModel.board,
+            GameModel.next_player,
+            GameModel.difficulty,
+            GameModel.status,
+            GameModel.human_symbol,
+            GameModel.computer_symbol,
+            GameModel.moves,
+            GameModel.created_at,
+            GameModel.updated_at,
+            GameModel.mode,
+        ),
+    )
+    for row in db.execute(hot):
+        active_board = None
+        if row.mode == GameMode.ULTIMATE.value and row.moves:
+            active_board = UltimateBoard.from_string(row.board, row.moves[-1]).active
+        yield {
+            "id": row.id,
+            "board": row.board,
+            "next_player": row.next_player,
+            "difficulty": row.difficulty,
+            "status": row.status,
+            "human_symbol": row.human_symbol,
+            "computer_symbol": row.computer_symbol,
+            "moves": row.moves or [],
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "mode": row.mode,
+            "active_board": active_board,
+        }
+
+    if not flt.include_archived:
+        return
+    archived = where(
+        GameArchiveModel,
+        select(
+            GameArchiveModel.id,
+            GameArchiveModel.board,
+            GameArchiveModel.difficulty,
+            GameArchiveModel.status,
+            GameArchiveModel.human_symbol,
+            GameArchiveModel.moves,
+            GameArchiveModel.created_at,
+            GameArchiveModel.finished_at,
+        ),
+    )
+    for row in db.execute(archived):
+        moves = row.moves or []
+        yield {
+            "id": row.id,
+            "board": row.board,
+            # Finished games keep the last mover as next_player
+            "next_player": row.board[EXTERNAL_TO_INDEX[moves[-1]]] if moves else row.human_symbol,
+            "difficulty": row.difficulty,
+            "status": row.status,
+            "human_symbol": row.human_symbol,
+            "computer_symbol": _OTHER[row.human_symbol],
+            "moves": moves,
+            "created_at": row.created_at,
+            "updated_at": row.finished_at,
+            # Only classic games are archived
+            "mode": GameMode.CLASSIC.value,
+            "active_board": None,
+        }
+
+
+def iter_game_payloads(games: Iterable[Game], flt: ExportFilter) -> Iterator[GamePayload]:
+    for game in games:
+        if flt.matches(game):
+            yield game_payload(game)
+
+
+def ndjson_chunks(payloads: Iterable[GamePayload], *, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    buf: List[bytes] = []
+    size = 0
+    for payload in payloads:
+        line = dump_payload(payload)
+        buf.append(line)
+        buf.append(b"\n")
+        size += len(line) + 1
+        if size >= chunk_bytes:
+            yield b"".join(buf)
+            buf.clear()
+            size = 0
+    if buf:
+        yield b"".join(buf)
+
+
+def gzip_chunks(chunks: Iterable[bytes], *, level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
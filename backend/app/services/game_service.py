@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import copy
+import dataclasses
 import logging
 import uuid
-from typing import Optional, Tuple
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from app.domain.ai.factory import strategy_for
-from app.domain.board import Board
-from app.domain.enums import Difficulty, GameStatus, Player
+from app.core.deadline import Deadline
+from app.core.tracing import span, traced
+from app.domain.ai.base import Strategy
+from app.domain.ai.executor import StrategyExecutor
+from app.domain.ai.factory import strategy_for, ultimate_strategy_for
+from app.domain.ai.resilience import UpstreamLimits
+from app.domain.enums import Difficulty, GameMode, GameStatus, Player
 from app.domain.exceptions import GameOverError, InvalidMoveError
-from app.domain.game import Game
-from app.repositories.base import GameRepository
+from app.domain.game import AnyBoard, Game
+from app.domain.ultimate import UltimateBoard, encode_move
+from app.repositories.base import GameListQuery, GameListRow, GameRepository, PageKey
 
 logger = logging.getLogger(__name__)
 
@@ -21,51 +29,134 @@ class GameService:
         *,
         gemini_api_key: str | None = None,
         gemini_model: str = "gemini-2.0-flash",
+        gemini_limits: UpstreamLimits | None = None,
+        book_path: str | None = None,
+        executor: StrategyExecutor | None = None,
+        ultimate_budget_s: float = 1.0,
+        ultimate_workers: int = 1,
     ) -> None:
         self.repo = repo
         self.gemini_api_key = gemini_api_key
         self.gemini_model = gemini_model
+        self.gemini_limits = gemini_limits
+        self.book_path = book_path
+        self.executor = executor
+        self.ultimate_budget_s = ultimate_budget_s
+        self.ultimate_workers = ultimate_workers
+        self.deadline: Optional[Deadline] = None
 
+    def with_deadline(self, deadline: Optional[Deadline]) -> "GameService":
+        """This service bound to one request's deadline.
+
+        A shallow copy, so the shared in-memory service is never mutated.
+        Past the deadline the service raises DeadlineExceeded at its next
+        checkpoint (before loading, choosing a move or saving) instead of
+        doing work nobody will read; AI moves get at most the time left.
+        """
+        if deadline is None:
+            return self
+        bound = copy.copy(self)
+        bound.deadline = deadline
+        return bound
+
+    def _checkpoint(self, stage: str) -> None:
+        if self.deadline is not None:
+            self.deadline.check(stage)
+
+    def _strategy(self, difficulty: Difficulty) -> Strategy:
+        return strategy_for(
+            difficulty,
+            gemini_api_key=self.gemini_api_key,
+            gemini_model=self.gemini_model,
+            gemini_limits=self.gemini_limits,
+            book_path=self.book_path,
+        )
+
+    def _select_move(self, difficulty: Difficulty, board: AnyBoard, me: Player) -> int:
+        with span("strategy.select_move", difficulty=difficulty.value):
+            if isinstance(board, UltimateBoard):
+                # The search keeps its own budget and process pool
+                strategy = ultimate_strategy_for(difficulty, budget_s=self.ultimate_budget_s, workers=self.ultimate_workers)
+                budget = self.ultimate_budget_s
+                if self.deadline is not None:
+                    budget = self.deadline.cap(budget, "strategy")
+                return strategy.select_move(board, me, budget_s=budget)  # type: ignore[arg-type, call-arg]
+            if self.executor is not None:
+                # Pooled, time-budgeted, with fallback to a cheaper difficulty
+                return self.executor.select_move(difficulty, board, me, deadline=self.deadline)
+            self._checkpoint("strategy")
+            return self._strategy(difficulty).select_move(board, me)
+
+    @traced("service.create_game")
     def create_game(
         self,
         difficulty: Difficulty,
         first_player_is_human: bool,
         human_symbol: Player,
+        mode: GameMode = GameMode.CLASSIC,
     ) -> Game:
         gid = str(uuid.uuid4())
-        game = Game.new(gid, difficulty=difficulty, first_player_is_human=first_player_is_human, human_symbol=human_symbol)
+        game = Game.new(
+            gid,
+            difficulty=difficulty,
+            first_player_is_human=first_player_is_human,
+            human_symbol=human_symbol,
+            mode=mode,
+        )
         # If computer starts, make its opening move
         if not first_player_is_human and game.status == GameStatus.IN_PROGRESS:
-            ai = strategy_for(difficulty, gemini_api_key=self.gemini_api_key, gemini_model=self.gemini_model)
-            pos = ai.select_move(game.board, game.computer_symbol)
+            pos = self._select_move(difficulty, game.board, game.computer_symbol)
             game.apply_move(pos, game.computer_symbol)
             logger.info("ai_opening_move", extra={"game_id": game.id, "pos": pos, "difficulty": difficulty.value})
+        self._checkpoint("save")
         self.repo.save(game)
         return game
 
     def get_game(self, game_id: str) -> Optional[Game]:
+        self._checkpoint("load")
         return self.repo.get(game_id)
 
-    def play_human_move(self, game_id: str, position: int) -> Tuple[Game, Optional[int]]:
+    def list_games(self, query: GameListQuery, after: Optional[PageKey], limit: int) -> List[GameListRow]:
+        self._checkpoint("load")
+        return self.repo.list_page(query, after, limit)
+
+    def get_game_version(self, game_id: str) -> Optional[datetime]:
+        self._checkpoint("load")
+        return self.repo.get_version(game_id)
+
+    @traced("service.play_human_move")
+    def play_human_move(self, game_id: str, position: int, board: Optional[int] = None) -> Tuple[Game, Optional[int]]:
+        self._checkpoint("load")
         game = self.repo.get(game_id)
         if not game:
             raise KeyError("game_not_found")
-        if game.status != GameStatus.IN_PROGRESS:
-            raise GameOverError("game_is_over")
-        if game.next_player != game.human_symbol:
-            # Only allow human move when it's their turn
-            raise InvalidMoveError("not_human_turn")
+        if self.deadline is not None:
+            # The in-memory repository hands out its own object; play on a copy
+            # so a deadline hit halfway leaves the stored game untouched
+            game = dataclasses.replace(game, moves=list(game.moves))
+        with span("game.apply_human_move"):
+            if game.status != GameStatus.IN_PROGRESS:
+                raise GameOverError("game_is_over")
+            if game.next_player != game.human_symbol:
+                # Only allow human move when it's their turn
+                raise InvalidMoveError("not_human_turn")
+            if game.mode == GameMode.ULTIMATE:
+                if board is None:
+                    raise InvalidMoveError("board_required")
+                position = encode_move(board, position)
+            elif board is not None:
+                raise InvalidMoveError("board_not_applicable")
 
-        game.apply_move(position, game.human_symbol)
-        human_move = position
+            game.apply_move(position, game.human_symbol)
 
         ai_move: Optional[int] = None
         # If game still in progress, AI responds
         if game.status == GameStatus.IN_PROGRESS:
-            ai = strategy_for(game.difficulty, gemini_api_key=self.gemini_api_key, gemini_model=self.gemini_model)
-            ai_move = ai.select_move(game.board, game.computer_symbol)
+            ai_move = self._select_move(game.difficulty, game.board, game.computer_symbol)
             game.apply_move(ai_move, game.computer_symbol)
             logger.info("ai_move", extra={"game_id": game.id, "pos": ai_move, "difficulty": game.difficulty.value})
 
+        # Not saved once the client has given up, so a retry finds the game as it left it
+        self._checkpoint("save")
         self.repo.save(game)
         return game, ai_move
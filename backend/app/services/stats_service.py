@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Tuple
+
+from app.domain.stats import RESULT_DRAW, RESULT_LOSS, RESULT_WIN, OutcomeKey
+from app.repositories.base import StatsRepository
+
+
+def _rates(by_result: Dict[str, int]) -> Dict[str, Any]:
+    wins = by_result.get(RESULT_WIN, 0)
+    draws = by_result.get(RESULT_DRAW, 0)
+    losses = by_result.get(RESULT_LOSS, 0)
+    games = wins + draws + losses
+    return {
+        "games": games,
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "win_rate": round(wins / games, 4) if games else 0.0,
+        "draw_rate": round(draws / games, 4) if games else 0.0,
+        "loss_rate": round(losses / games, 4) if games else 0.0,
+    }
+
+
+def summarize(counts: Iterable[Tuple[OutcomeKey, int]]) -> Dict[str, Any]:
+    """Fold rollup rows into per-dimension outcome rates."""
+    overall: Dict[str, int] = defaultdict(int)
+    groups: Dict[str, Dict[Any, Dict[str, int]]] = {
+        "difficulty": defaultdict(lambda: defaultdict(int)),
+        "first_player": defaultdict(lambda: defaultdict(int)),
+        "human_symbol": defaultdict(lambda: defaultdict(int)),
+        "opening_move": defaultdict(lambda: defaultdict(int)),
+    }
+    for key, n in counts:
+        overall[key.result] += n
+        for dim, buckets in groups.items():
+            buckets[getattr(key, dim)][key.result] += n
+
+    total = sum(overall.values())
+    openings: List[Dict[str, Any]] = []
+    for position, by_result in groups["opening_move"].items():
+        entry = _rates(by_result)
+        entry["position"] = position
+        entry["share"] = round(entry["games"] / total, 4) if total else 0.0
+        openings.append(entry)
+    openings.sort(key=lambda e: (-e["games"], e["position"]))
+
+    return {
+        "overall": _rates(overall),
+        "by_difficulty": {k: _rates(v) for k, v in sorted(groups["difficulty"].items())},
+        "by_first_player": {k: _rates(v) for k, v in sorted(groups["first_player"].items())},
+        "by_human_symbol": {k: _rates(v) for k, v in sorted(groups["human_symbol"].items())},
+        "opening_moves": openings,
+    }
+
+
+class StatsService:
+    def __init__(self, repo: StatsRepository) -> None:
+        self.repo = repo
+
+    def summary(self) -> Dict[str, Any]:
+        # The rollup holds at most a few hundred rows regardless of game count
+        return summarize(self.repo.counts())
@@ -0,0 +1,117 @@
+"""Cost of the per-move board work: interned boards vs the previous Board.
+
+The previous Board re-validated its string on every construction, rebuilt
+the string in with_move, and scanned WIN_PATTERNS in every winner() call.
+This benchmark runs the MEDIUM heuristic over every reachable position with
+both implementations. The legacy copy is kept here only for comparison.
+
+Run from backend/:
+
+    uv run python -m benchmarks.bench_board
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from app.domain.ai.medium import CENTER, PRIORITY_CORNERS, PRIORITY_SIDES, HeuristicStrategy
+from app.domain.board import ALLOWED_CHARS, EXTERNAL_TO_INDEX, INDEX_TO_EXTERNAL, WIN_PATTERNS, Board, preload_boards
+from app.domain.enums import Player
+
+
+@dataclass(frozen=True)
+class LegacyBoard:
+    state: str
+
+    def __post_init__(self) -> None:
+        if len(self.state) != 9:
+            raise ValueError("length")
+        if any(c not in ALLOWED_CHARS for c in self.state):
+            raise ValueError("chars")
+
+    def available_positions(self) -> List[int]:
+        return [INDEX_TO_EXTERNAL[i] for i, c in enumerate(self.state) if c == " "]
+
+    def with_move(self, position: int, player: Player) -> "LegacyBoard":
+        idx = EXTERNAL_TO_INDEX[position]
+        cells = list(self.state)
+        cells[idx] = player.value
+        return LegacyBoard("".join(cells))
+
+    def winner(self) -> Optional[Player]:
+        for a, b, c in WIN_PATTERNS:
+            trio = self.state[a] + self.state[b] + self.state[c]
+            if trio == "xxx":
+                return Player.X
+            if trio == "ooo":
+                return Player.O
+        return None
+
+
+def legacy_heuristic(board: LegacyBoard, me: Player) -> int:
+    for pos in board.available_positions():
+        if board.with_move(pos, me).winner() == me:
+            return pos
+    opp = me.other
+    for pos in board.available_positions():
+        if board.with_move(pos, opp).winner() == opp:
+            return pos
+    if CENTER in board.available_positions():
+        return CENTER
+    for pos in PRIORITY_CORNERS + PRIORITY_SIDES:
+        if pos in board.available_positions():
+            return pos
+    return board.available_positions()[0]
+
+
+def _positions() -> List[Tuple[str, Player]]:
+    """(state, side to move) for every non-terminal position reachable from the empty board."""
+    out: List[Tuple[str, Player]] = []
+    seen = set()
+    stack = [(Board.empty(), Player.X), (Board.empty(), Player.O)]
+    while stack:
+        board, me = stack.pop()
+        if (board.state, me) in seen or board.winner() is not None or board.is_full():
+            continue
+        seen.add((board.state, me))
+        out.append((board.state, me))
+        for pos in board.legal_moves:
+            stack.append((board.with_move(pos, me), me.other))
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=5)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    preload_boards()
+    positions = _positions()
+    legacy = [(LegacyBoard(s), me) for s, me in positions]
+    interned = [(Board.from_string(s), me) for s, me in positions]
+    heuristic = HeuristicStrategy()
+    assert [legacy_heuristic(b, me) for b, me in legacy] == [heuristic.select_move(b, me) for b, me in interned]
+
+    def run_legacy() -> None:
+        for b, me in legacy:
+            legacy_heuristic(b, me)
+
+    def run_interned() -> None:
+        for b, me in interned:
+            heuristic.select_move(b, me)
+
+    results = {}
+    for name, fn in (("legacy", run_legacy), ("interned", run_interned)):
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        results[name] = best / args.number / len(positions) * 1e6
+
+    print(f"MEDIUM heuristic over {len(positions)} reachable positions (best of {args.repeat})")
+    print(f"  legacy   : {results['legacy']:8.2f} us/move")
+    print(f"  interned : {results['interned']:8.2f} us/move ({results['legacy'] / results['interned']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
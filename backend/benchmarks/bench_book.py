@@ -0,0 +1,84 @@
+"""Opening a position book and playing from it.
+
+Reports the time to open a book (a header read and an mmap), the cost of one
+lookup, and the cost of choosing a move in positions from random playouts.
+For positions deeper than the book's max_plies the move falls back to
+search, which the "searched" column counts. Build a book first:
+
+    uv run python -m app.cli.build_book --size 4 --k 4 --max-plies 8 --out books/4x4-k4.book
+    uv run python -m benchmarks.bench_book --book books/4x4-k4.book
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import timeit
+from typing import List, Tuple
+
+from app.domain.ai.book import Book, BookStrategy
+
+Position = Tuple[int, int, bool]
+
+
+def playouts(book: Book, games: int, seed: int) -> List[Position]:
+    """Every position, by ply, along random games until someone wins or the board fills."""
+    v = book.variant
+    rng = random.Random(seed)
+    out: List[Position] = []
+    for g in range(games):
+        x = o = 0
+        o_to_move = g % 2 == 1
+        while True:
+            out.append((x, o, o_to_move))
+            legal = [c for c in range(v.cells) if not (x | o) >> c & 1]
+            cell = rng.choice(legal)
+            if o_to_move:
+                o |= 1 << cell
+            else:
+                x |= 1 << cell
+            if v.wins(o if o_to_move else x, cell) or (x | o) == v.full:
+                break
+            o_to_move = not o_to_move
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--book", required=True)
+    parser.add_argument("--games", type=int, default=200, help="random playouts to sample positions from")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    book = Book(args.book)
+    open_ms = (time.perf_counter() - start) * 1e3
+    v = book.variant
+    print(f"{args.book}: {v.name}, {len(book)} entries, max_plies {book.max_plies}, opened in {open_ms:.3f} ms")
+
+    key = v.key(0, 0, False)
+    n = 200_000
+    lookup_us = timeit.timeit(lambda: book.get(key), number=n) / n * 1e6
+    key_us = timeit.timeit(lambda: v.key(0b101, 0b10, False), number=n) / n * 1e6
+    print(f"  canonical key: {key_us:.2f} us   lookup: {lookup_us:.2f} us")
+
+    strategy = BookStrategy(book)
+    positions = playouts(book, args.games, args.seed)
+    by_ply = {}
+    for x, o, o_to_move in positions:
+        ply = bin(x | o).count("1")
+        start = time.perf_counter()
+        strategy.best_cell(x, o, o_to_move)
+        elapsed = time.perf_counter() - start
+        searched = ply + 1 > book.max_plies
+        total, count, n_searched = by_ply.get(ply, (0.0, 0, 0))
+        by_ply[ply] = (total + elapsed, count + 1, n_searched + searched)
+    print(f"  {'ply':>4} {'positions':>10} {'searched':>9} {'avg move us':>12}")
+    for ply in sorted(by_ply):
+        total, count, n_searched = by_ply[ply]
+        print(f"  {ply:>4} {count:>10} {n_searched:>9} {total / count * 1e6:>12.1f}")
+    book.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""HARD move latency while the Gemini upstream is slow or failing.
+
+Drives GeminiStrategy.select_move from many threads against a fake model
+whose latency and error rate are configurable. Nothing goes over the
+network. Reports move latency percentiles, the number of upstream calls
+and the guard counters: shed, timeouts, short-circuited calls and breaker
+state. With --batch-window-ms the batching strategy is measured instead.
+
+Run from backend/:
+
+    uv run python -m benchmarks.bench_gemini_guard --latency 5 --timeout 0.5
+    uv run python -m benchmarks.bench_gemini_guard --latency 0.05 --error-rate 0.5
+    uv run python -m benchmarks.bench_gemini_guard --latency 0.3 --timeout 1 --batch-window-ms 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, List
+
+from app.domain.ai.batching import BatchingGeminiStrategy
+from app.domain.ai.gemini import GeminiStrategy
+from app.domain.ai.resilience import UpstreamLimits
+from app.domain.board import Board
+from app.domain.enums import Player
+from benchmarks.loadgen import percentile
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel: sleeps, then answers or raises.
+
+    Answers the first available position, as a JSON array for batched prompts.
+    """
+
+    def __init__(self, latency_s: float, error_rate: float, seed: int) -> None:
+        self.latency_s = latency_s
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, **_kwargs: Any) -> Any:
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.error_rate
+            jitter = self._rng.uniform(0.8, 1.2)
+        time.sleep(self.latency_s * jitter)
+        if fail:
+            raise RuntimeError("fake upstream error")
+        if "Positions (JSON):" in prompt:
+            items = json.loads(prompt.split("Positions (JSON):\n", 1)[1].split("\n", 1)[0])
+            return SimpleNamespace(text=json.dumps([{"id": i["id"], "position": i["available"][0]} for i in items]))
+        return SimpleNamespace(text=json.dumps({"position": 5}))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=5.0, help="fake upstream latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=0.5, help="per-move deadline (GEMINI_TIMEOUT_S)")
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--breaker-failures", type=int, default=5)
+    parser.add_argument("--breaker-reset", type=float, default=2.0)
+    parser.add_argument("--batch-window-ms", type=float, default=0.0, help="> 0 measures the batching strategy")
+    parser.add_argument("--batch-max-size", type=int, default=8)
+    parser.add_argument("-c", "--callers", type=int, default=32, help="concurrent HARD moves")
+    parser.add_argument("-d", "--duration", type=float, default=6.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    # Every fallback logs a warning; keep the report readable
+    logging.disable(logging.WARNING)
+
+    limits = UpstreamLimits(
+        timeout_s=args.timeout,
+        max_concurrency=args.max_concurrency,
+        breaker_failures=args.breaker_failures,
+        breaker_reset_s=args.breaker_reset,
+        batch_window_s=args.batch_window_ms / 1000.0,
+        batch_max_size=args.batch_max_size,
+    )
+    model = FakeModel(args.latency, args.error_rate, args.seed)
+    cls = BatchingGeminiStrategy if limits.batch_window_s > 0 else GeminiStrategy
+    strategy = cls(api_key="fake", limits=limits, model_factory=lambda _key, _name: model)
+    board = Board.from_string("x        ")
+
+    latencies: List[float] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def caller() -> None:
+        local: List[float] = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            strategy.select_move(board, Player.O)
+            local.append((time.perf_counter() - start) * 1e3)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=caller) for _ in range(args.callers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    values = sorted(latencies)
+    print(
+        f"{args.callers} callers for {args.duration:.0f}s, upstream {args.latency * 1e3:.0f} ms "
+        f"({args.error_rate:.0%} errors), deadline {args.timeout * 1e3:.0f} ms"
+    )
+    print(f"  moves: {len(values)}, upstream calls: {model.calls}")
+    for pct in (50, 95, 99, 100):
+        print(f"  p{pct:<3} {percentile(values, pct):9.2f} ms")
+    print("  guard:", json.dumps(strategy.snapshot()))
+
+
+if __name__ == "__main__":
+    main()
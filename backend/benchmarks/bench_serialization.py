@@ -0,0 +1,83 @@
+"""Per-request serialization cost of the move endpoint.
+
+Compares the previous path (build MoveResponse, let FastAPI re-validate it
+against response_model and encode it through JSONResponse) with the
+precompiled serializer used by app/api/games.py.
+
+Run from backend/:
+
+    uv run python -m benchmarks.bench_serialization
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+
+from fastapi.responses import JSONResponse
+
+from app.api.responses import RawJSONResponse
+from app.domain.enums import Difficulty
+from app.domain.game import Game
+from app.schemas.game import MoveResponse
+from app.schemas.serializers import dump_move
+
+
+def _sample_game() -> Game:
+    game = Game.new("3f1c2a9e-8d8b-4a53-9a57-6c1f7f4e2b10", Difficulty.MEDIUM, first_player_is_human=True)
+    for pos in (7, 5, 9, 8):
+        game.apply_move(pos, game.next_player)
+    return game
+
+
+def legacy_path(game: Game, ai_move: int) -> bytes:
+    # Handler builds the model field by field
+    resp = MoveResponse(
+        id=game.id,
+        board=game.board.to_string(),
+        next_player=game.next_player,
+        difficulty=game.difficulty,
+        status=game.status,
+        human_symbol=game.human_symbol,
+        computer_symbol=game.computer_symbol,
+        moves=game.moves,
+        created_at=game.created_at,
+        updated_at=game.updated_at,
+        ai_move=ai_move,
+    )
+    # FastAPI serialize_response: dump, validate against response_model, dump to JSON-able data
+    content = resp.model_dump(by_alias=True)
+    value = MoveResponse.model_validate(content)
+    data = value.model_dump(mode="json", by_alias=True)
+    return JSONResponse(data).body
+
+
+def fast_path(game: Game, ai_move: int) -> bytes:
+    return RawJSONResponse(dump_move(game, ai_move)).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--number", type=int, default=20000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    game = _sample_game()
+    ai_move = 3
+    # Bodies may differ in whitespace only; the decoded documents must match
+    assert json.loads(legacy_path(game, ai_move)) == json.loads(fast_path(game, ai_move))
+
+    results = {}
+    for name, fn in (("legacy", legacy_path), ("fast", fast_path)):
+        timings = timeit.repeat(lambda: fn(game, ai_move), number=args.number, repeat=args.repeat)
+        results[name] = min(timings) / args.number * 1e6
+
+    saved = results["legacy"] - results["fast"]
+    print(f"move response serialization ({args.number} x {args.repeat}, best run)")
+    print(f"  legacy : {results['legacy']:8.2f} us/request")
+    print(f"  fast   : {results['fast']:8.2f} us/request")
+    print(f"  saved  : {saved:8.2f} us/request ({results['legacy'] / results['fast']:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cold-start cost of the backend: import time and time to first response.
+
+Each sample runs in a fresh interpreter so module caches do not leak between
+runs. Reports `import app.main` wall time, startup (lifespan warm-up) time and
+the time until the first /health response is served.
+
+Run from backend/:
+
+    uv run python -m benchmarks.bench_startup
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+_PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    t2 = time.perf_counter()
+    client.get("/health").raise_for_status()
+    t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "startup_ms": (t2 - t1) * 1e3, "first_response_ms": (t3 - t0) * 1e3}))
+"""
+
+
+def _sample(env_overrides: dict[str, str]) -> dict[str, float]:
+    env = {**os.environ, **env_overrides}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _top_imports(limit: int) -> list[tuple[float, str]]:
+    """Import self time of app.main grouped by top-level package, from `python -X importtime`."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    totals: dict[str, int] = {}
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".", 1)[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+    return sorted(((us / 1000, pkg) for pkg, us in totals.items()), reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10, help="show the N slowest top-level imports")
+    args = parser.parse_args()
+
+    # Measure the in-memory configuration; DB startup is dominated by connect time
+    env = {"DATABASE_URL": "", "LOG_LEVEL": "WARNING"}
+    samples = [_sample(env) for _ in range(args.runs)]
+
+    print(f"cold start over {args.runs} fresh interpreters (median / min)")
+    for key in ("import_ms", "startup_ms", "first_response_ms"):
+        values = [s[key] for s in samples]
+        print(f"  {key:<18} {statistics.median(values):8.1f} / {min(values):8.1f} ms")
+
+    if args.top:
+        print("import time by package")
+        for ms, package in _top_imports(args.top):
+            print(f"  {ms:8.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Ultimate tic-tac-toe search: depth reached and move latency under a budget.
+
+Samples positions from random playouts and asks the HARD engine for a move
+in each, once per worker count. Reports the depth every worker completed,
+move latency percentiles, how often a move overran the budget by more than
+a tenth, and the search rate. More workers should reach deeper in the same
+budget; on a single core they only add IPC and scheduling cost.
+
+    uv run python -m benchmarks.bench_ultimate --budget-ms 1000 --workers 1 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from typing import List
+
+from app.domain.ai.ultimate import UltimateSearchStrategy
+from app.domain.enums import Player
+from app.domain.ultimate import UltimateBoard
+
+
+def playouts(games: int, seed: int) -> List[tuple[UltimateBoard, Player]]:
+    """Every fourth position, with the side to move, along random games."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(games):
+        board = UltimateBoard.empty()
+        player = Player.X
+        ply = 0
+        while board.winner() is None and not board.is_full():
+            if ply % 4 == 0:
+                out.append((board, player))
+            board = board.with_move(rng.choice(board.legal_moves), player)
+            player = player.other
+            ply += 1
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=1000.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--games", type=int, default=3, help="random playouts to sample positions from")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    positions = playouts(args.games, args.seed)
+    print(f"{len(positions)} positions, budget {args.budget_ms:.0f} ms")
+    print(f"  {'workers':>7} {'avg depth':>9} {'min':>4} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'over':>5} {'knodes/s':>9}")
+    for workers in args.workers:
+        engine = UltimateSearchStrategy(budget_s=args.budget_ms / 1000.0, workers=workers)
+        engine.start()
+        times = []
+        try:
+            for board, player in positions:
+                start = time.perf_counter()
+                engine.select_move(board, player)
+                times.append((time.perf_counter() - start) * 1e3)
+        finally:
+            engine.shutdown()
+        snap = engine.snapshot()
+        times.sort()
+        p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+        print(
+            f"  {workers:>7} {snap['avg_depth']:>9.2f} {snap['min_depth'] or 0:>4} {statistics.median(times):>8.1f}"
+            f" {p99:>8.1f} {times[-1]:>8.1f} {snap['over_budget']:>5} {snap['nodes_per_s'] / 1000:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Closed-loop load generator for the game API.
+
+Runs N concurrent virtual users for a fixed duration. Each user repeatedly
+picks a scenario from a weighted mix:
+
+    create  POST /games
+    play    POST /games, then POST /games/{id}/moves with random legal moves
+            until the game is over (difficulty drawn from --difficulty)
+    read    GET /games/{id} for a game created earlier in the run
+    list    GET /games?limit=20
+
+By default the app is driven in process through an ASGI transport with the
+in-memory repository and no Gemini key, so runs are offline and repeatable.
+Pass --url to drive a running server instead. Needs httpx, which is not a
+runtime dependency:
+
+    uv run --with httpx python -m benchmarks.loadgen --concurrency 32 --duration 20
+    uv run --with httpx python -m benchmarks.loadgen --url http://localhost:8000 --mix play=1
+
+Latencies are measured per request and grouped by route template; the
+report gives throughput, p50/p95/p99/max and error counts per endpoint.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.domain.board import EXTERNAL_ORDER
+
+SCENARIOS = ("create", "play", "read", "list")
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+
+    def add(self, elapsed_ms: float, ok: bool) -> None:
+        self.latencies_ms.append(elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+
+@dataclass
+class Recorder:
+    endpoints: Dict[str, EndpointStats] = field(default_factory=lambda: defaultdict(EndpointStats))
+    scenarios: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    failures: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    game_ids: List[str] = field(default_factory=list)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def parse_weights(raw: str, names: Tuple[str, ...], option: str) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in names:
+            raise SystemExit(f"{option}: unknown name {name!r}, expected one of {', '.join(names)}")
+        weights[name] = float(weight) if weight else 1.0
+    if not any(w > 0 for w in weights.values()):
+        raise SystemExit(f"{option}: at least one weight must be positive")
+    return weights
+
+
+class ScenarioFailed(Exception):
+    """A response that leaves the scenario unable to continue."""
+
+
+class VirtualUser:
+    def __init__(self, client: Any, recorder: Recorder, rng: random.Random, difficulties: Dict[str, float]) -> None:
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.difficulties = list(difficulties), list(difficulties.values())
+        self.scenarios = {"create": self.create, "play": self.play, "read": self.read, "list": self.list_games}
+
+    async def request(self, label: str, method: str, url: str, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except Exception:
+            self.recorder.endpoints[label].add((time.perf_counter() - start) * 1e3, ok=False)
+            raise ScenarioFailed(f"{label}: transport error")
+        self.recorder.endpoints[label].add((time.perf_counter() - start) * 1e3, ok=resp.status_code < 400)
+        if resp.status_code >= 400:
+            raise ScenarioFailed(f"{label}: {resp.status_code}")
+        return resp
+
+    async def create(self, difficulty: Optional[str] = None) -> Dict[str, Any]:
+        names, weights = self.difficulties
+        body = {
+            "difficulty": difficulty or self.rng.choices(names, weights)[0],
+            "first_player": self.rng.choice(("human", "computer")),
+            "human_symbol": self.rng.choice(("x", "o")),
+        }
+        game = (await self.request("POST /games", "POST", "/games", json=body)).json()
+        self.recorder.game_ids.append(game["id"])
+        return game
+
+    async def play(self) -> None:
+        game = await self.create()
+        while game["status"] == "in_progress":
+            free = [EXTERNAL_ORDER[i] for i, cell in enumerate(game["board"]) if cell == " "]
+            resp = await self.request(
+                "POST /games/{id}/moves",
+                "POST",
+                f"/games/{game['id']}/moves",
+                json={"position": self.rng.choice(free)},
+            )
+            game = resp.json()
+
+    async def read(self) -> None:
+        if not self.recorder.game_ids:
+            await self.create()
+        game_id = self.rng.choice(self.recorder.game_ids)
+        await self.request("GET /games/{id}", "GET", f"/games/{game_id}")
+
+    async def list_games(self) -> None:
+        await self.request("GET /games", "GET", "/games", params={"limit": 20})
+
+    async def run(self, mix: Dict[str, float], deadline: float) -> None:
+        names, weights = list(mix), list(mix.values())
+        while time.perf_counter() < deadline:
+            scenario = self.rng.choices(names, weights)[0]
+            try:
+                await self.scenarios[scenario]()
+            except ScenarioFailed:
+                self.recorder.failures[scenario] += 1
+            else:
+                self.recorder.scenarios[scenario] += 1
+
+
+async def _run(args: argparse.Namespace) -> Tuple[Recorder, float]:
+    import httpx
+
+    mix = parse_weights(args.mix, SCENARIOS, "--mix")
+    difficulties = parse_weights(args.difficulty, DIFFICULTIES, "--difficulty")
+    recorder = Recorder()
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        else:
+            from app.core.settings import Settings
+            from app.main import create_app
+
+            # In-memory repository and no Gemini key: offline and self-contained
+            app = create_app(Settings(log_level=args.log_level))
+            # Importing app.main already configured logging from the environment
+            logging.getLogger().setLevel(args.log_level.upper())
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            client = httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=args.timeout)
+        await stack.enter_async_context(client)
+
+        rng = random.Random(args.seed)
+        users = [
+            VirtualUser(client, recorder, random.Random(rng.random()), difficulties)
+            for _ in range(args.concurrency)
+        ]
+        if args.warmup > 0:
+            await asyncio.gather(*(u.run(mix, time.perf_counter() + args.warmup) for u in users))
+            kept_ids = recorder.game_ids
+            recorder = Recorder(game_ids=kept_ids)
+            for u in users:
+                u.recorder = recorder
+
+        start = time.perf_counter()
+        await asyncio.gather(*(u.run(mix, start + args.duration) for u in users))
+        elapsed = time.perf_counter() - start
+    return recorder, elapsed
+
+
+def build_report(recorder: Recorder, elapsed: float, args: argparse.Namespace) -> Dict[str, Any]:
+    endpoints: Dict[str, Any] = {}
+    total = errors = 0
+    for label, stats in sorted(recorder.endpoints.items()):
+        values = sorted(stats.latencies_ms)
+        total += len(values)
+        errors += stats.errors
+        endpoints[label] = {
+            "requests": len(values),
+            "errors": stats.errors,
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3) if values else 0.0,
+        }
+    return {
+        "target": args.url or "in-process",
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1),
+        "scenarios": dict(sorted(recorder.scenarios.items())),
+        "scenario_failures": dict(sorted(recorder.failures.items())),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['target']}: {report['concurrency']} users for {report['duration_s']:.1f}s, "
+        f"{report['requests']} requests, {report['rps']:.1f} req/s, {report['errors']} errors"
+    )
+    print(f"  scenarios completed: {report['scenarios']}")
+    if report["scenario_failures"]:
+        print(f"  scenarios failed:    {report['scenario_failures']}")
+    header = f"  {'endpoint':<24} {'reqs':>8} {'errs':>6} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+    print(header)
+    for label, e in report["endpoints"].items():
+        print(
+            f"  {label:<24} {e['requests']:>8} {e['errors']:>6} {e['rps']:>9.1f} "
+            f"{e['p50_ms']:>8.2f}ms {e['p95_ms']:>7.2f}ms {e['p99_ms']:>7.2f}ms {e['max_ms']:>7.2f}ms"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="base URL of a running server; default drives the app in process")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before the run")
+    parser.add_argument("--mix", default="create=1,play=3,read=4,list=1", help="scenario weights, e.g. play=1,read=2")
+    parser.add_argument("--difficulty", default="easy=1,medium=1,hard=1", help="difficulty weights for new games")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="WARNING", help="app log level for in-process runs")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        sys.exit("httpx is required: uv run --with httpx python -m benchmarks.loadgen")
+
+    recorder, elapsed = asyncio.run(_run(args))
+    report = build_report(recorder, elapsed, args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Replay captured production traffic against one or more builds.
+
+Reads capture files written with CAPTURE_ENABLED (see app.core.capture) and
+sends every captured game's requests again at their recorded times,
+optionally sped up. Games run concurrently, as they did in production; the
+requests of one game are sent in order, each one after the previous
+response, so a slow build falls behind its schedule and the report shows
+how far (lag).
+
+AI replies differ between runs, so a recorded move may be illegal in the
+replayed game. It is then swapped for a legal move picked by a seeded
+random generator; moves recorded after a game that has now ended are
+skipped. Both are counted. Recorded failures (invalid moves, bad input)
+are sent unchanged.
+
+By default the app is driven in process with the in-memory repository,
+like benchmarks.loadgen. Pass --url once per running build to compare
+them; they are replayed one after another and the report ends with the
+differences against the first. Needs httpx:
+
+    uv run --with httpx python -m benchmarks.replay captures/*.ndjson.gz --speed 10
+    uv run --with httpx python -m benchmarks.replay captures/*.ndjson.gz \\
+        --url http://localhost:8000 --url http://localhost:8001 --save run.json
+    uv run --with httpx python -m benchmarks.replay captures/*.ndjson.gz --url http://localhost:8001 --baseline run.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.capture import CREATE, GET, MOVE, read_capture
+from app.domain.board import Board
+from app.domain.ultimate import UltimateBoard
+from benchmarks.loadgen import percentile
+
+OPS = (CREATE, MOVE, GET)
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    t_ms: float
+    op: str
+    status: int
+    latency_ms: float
+    body: Optional[Dict[str, Any]]
+
+
+@dataclass
+class Script:
+    """The captured requests of one game, in arrival order."""
+
+    events: List[Event] = field(default_factory=list)
+
+
+def load(paths: List[str]) -> Tuple[List[Script], float]:
+    """Game scripts from capture files, on one timeline, and its length in ms.
+
+    Each file is shifted by its start time, so captures from several
+    workers of the same deployment interleave as they did live.
+    """
+    files = []
+    for path in paths:
+        header, records = read_capture(path)
+        files.append((datetime.fromisoformat(header["started_at"]), records))
+    origin = min(started for started, _ in files)
+    scripts: List[Script] = []
+    for started, records in files:
+        shift_ms = (started - origin).total_seconds() * 1e3
+        games: Dict[int, Script] = {}
+        for t_ms, game, op, status, latency_ms, body in records:
+            event = Event(t_ms + shift_ms, op, status, latency_ms, body)
+            if game == 0:
+                # A create that failed: no game follows it
+                scripts.append(Script([event]))
+            else:
+                games.setdefault(game, Script()).events.append(event)
+        scripts.extend(games.values())
+    for script in scripts:
+        script.events.sort(key=lambda e: e.t_ms)
+    scripts.sort(key=lambda s: s.events[0].t_ms)
+    # Start at the first request rather than at capture start
+    first = scripts[0].events[0].t_ms if scripts else 0.0
+    for script in scripts:
+        script.events = [Event(e.t_ms - first, e.op, e.status, e.latency_ms, e.body) for e in script.events]
+    span = max((s.events[-1].t_ms for s in scripts), default=0.0)
+    return scripts, span
+
+
+def legal_moves(game: Dict[str, Any]) -> Tuple[int, ...]:
+    if game.get("mode") == "ultimate":
+        moves = game.get("moves") or []
+        return UltimateBoard.from_string(game["board"], moves[-1] if moves else None).legal_moves
+    return Board.from_string(game["board"]).legal_moves
+
+
+def move_body(game: Dict[str, Any], recorded: Dict[str, Any], rng: random.Random) -> Tuple[Dict[str, Any], bool]:
+    """The recorded move if it is legal in the replayed game, else a legal one (and True)."""
+    legal = legal_moves(game)
+    if game.get("mode") == "ultimate":
+        wanted = (recorded.get("board") or 0) * 10 + (recorded.get("position") or 0)
+        if wanted in legal:
+            return recorded, False
+        board, cell = divmod(rng.choice(legal), 10)
+        return {"position": cell, "board": board}, True
+    if recorded.get("position") in legal:
+        return recorded, False
+    return {"position": rng.choice(legal)}, True
+
+
+@dataclass
+class OpStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    recorded_ms: List[float] = field(default_factory=list)
+    lag_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_mismatches: int = 0
+    substituted: int = 0
+    skipped: int = 0
+
+
+class Replayer:
+    def __init__(self, client: Any, speed: float, seed: int) -> None:
+        self.client = client
+        self.speed = speed
+        self.seed = seed
+        self.ops: Dict[str, OpStats] = defaultdict(OpStats)
+
+    async def run(self, scripts: List[Script]) -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(self.play(i, script, start) for i, script in enumerate(scripts)))
+        return time.perf_counter() - start
+
+    async def play(self, index: int, script: Script, start: float) -> None:
+        rng = random.Random(self.seed * 1_000_003 + index)
+        game: Optional[Dict[str, Any]] = None
+        etag: Optional[str] = None
+        for event in script.events:
+            stats = self.ops[event.op]
+            kwargs: Dict[str, Any] = {}
+            if event.op == CREATE:
+                method, url = "POST", "/games"
+                kwargs["json"] = event.body or {}
+            elif game is None:
+                # The create failed this time, so the game does not exist
+                stats.skipped += 1
+                continue
+            elif event.op == MOVE:
+                method, url = "POST", f"/games/{game['id']}/moves"
+                body = event.body or {}
+                if event.status < 400:
+                    if game["status"] != "in_progress":
+                        stats.skipped += 1
+                        continue
+                    body, swapped = move_body(game, body, rng)
+                    stats.substituted += swapped
+                kwargs["json"] = body
+            else:
+                method, url = "GET", f"/games/{game['id']}"
+                if event.body and event.body.get("if_none_match") and etag:
+                    kwargs["headers"] = {"If-None-Match": etag}
+
+            due = start + event.t_ms / 1000.0 / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            sent = time.perf_counter()
+            stats.lag_ms.append(max(0.0, (sent - due) * 1e3))
+            stats.recorded_ms.append(event.latency_ms)
+            try:
+                resp = await self.client.request(method, url, **kwargs)
+            except Exception:
+                stats.latencies_ms.append((time.perf_counter() - sent) * 1e3)
+                stats.errors += 1
+                continue
+            stats.latencies_ms.append((time.perf_counter() - sent) * 1e3)
+            if resp.status_code >= 500:
+                stats.errors += 1
+            if resp.status_code // 100 != event.status // 100:
+                stats.status_mismatches += 1
+            if resp.status_code == 200:
+                game = resp.json()
+                etag = resp.headers.get("etag", etag)
+            if event.op == CREATE and resp.status_code >= 400:
+                game = None
+
+
+def _pcts(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "p99_ms": round(percentile(values, 99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def build_report(target: str, replayer: Replayer, elapsed: float, games: int, span_ms: float, speed: float) -> Dict[str, Any]:
+    ops: Dict[str, Any] = {}
+    total = errors = 0
+    for op in OPS:
+        stats = replayer.ops.get(op)
+        if stats is None:
+            continue
+        total += len(stats.latencies_ms)
+        errors += stats.errors
+        ops[op] = {
+            "requests": len(stats.latencies_ms),
+            "errors": stats.errors,
+            "status_mismatches": stats.status_mismatches,
+            "substituted": stats.substituted,
+            "skipped": stats.skipped,
+            "rps": round(len(stats.latencies_ms) / elapsed, 1) if elapsed else 0.0,
+            **_pcts(stats.latencies_ms),
+            "recorded": _pcts(stats.recorded_ms),
+            "lag_p99_ms": round(percentile(sorted(stats.lag_ms), 99), 3),
+        }
+    return {
+        "target": target,
+        "speed": speed,
+        "games": games,
+        "scheduled_s": round(span_ms / 1000.0 / speed, 3),
+        "duration_s": round(elapsed, 3),
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "ops": ops,
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['target']}: {report['games']} games at {report['speed']:g}x, {report['requests']} requests in "
+        f"{report['duration_s']:.1f}s (scheduled {report['scheduled_s']:.1f}s), {report['rps']:.1f} req/s, {report['errors']} errors"
+    )
+    print(
+        f"  {'op':<7} {'reqs':>7} {'errs':>5} {'status!=':>8} {'subst':>6} {'skip':>5} {'req/s':>8}"
+        f" {'p50':>9} {'p95':>9} {'p99':>9} {'rec p99':>9} {'lag p99':>9}"
+    )
+    for op, e in report["ops"].items():
+        print(
+            f"  {op:<7} {e['requests']:>7} {e['errors']:>5} {e['status_mismatches']:>8} {e['substituted']:>6} {e['skipped']:>5}"
+            f" {e['rps']:>8.1f} {e['p50_ms']:>7.2f}ms {e['p95_ms']:>7.2f}ms {e['p99_ms']:>7.2f}ms"
+            f" {e['recorded']['p99_ms']:>7.2f}ms {e['lag_p99_ms']:>7.2f}ms"
+        )
+
+
+def _delta(new: float, old: float) -> str:
+    if not old:
+        return "      n/a"
+    return f"{(new - old) / old * 100:>+8.1f}%"
+
+
+def print_comparison(base: Dict[str, Any], other: Dict[str, Any]) -> None:
+    print(f"{other['target']} vs {base['target']}: req/s {_delta(other['rps'], base['rps']).strip()}, errors {other['errors'] - base['errors']:+d}")
+    print(f"  {'op':<7} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} {'lag p99':>9}")
+    for op, e in other["ops"].items():
+        b = base["ops"].get(op)
+        if b is None:
+            continue
+        print(
+            f"  {op:<7} {_delta(e['p50_ms'], b['p50_ms'])} {_delta(e['p95_ms'], b['p95_ms'])} {_delta(e['p99_ms'], b['p99_ms'])}"
+            f" {_delta(e['max_ms'], b['max_ms'])} {_delta(e['lag_p99_ms'], b['lag_p99_ms'])}"
+        )
+
+
+async def _replay(target: Optional[str], scripts: List[Script], args: argparse.Namespace) -> Tuple[Replayer, float]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with AsyncExitStack() as stack:
+        if target:
+            client = httpx.AsyncClient(base_url=target, timeout=args.timeout, limits=limits)
+        else:
+            from app.core.settings import Settings
+            from app.main import create_app
+
+            # In-memory repository and no Gemini key: offline and self-contained
+            app = create_app(Settings(log_level=args.log_level, capture_enabled=False))
+            logging.getLogger().setLevel(args.log_level.upper())
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=args.timeout)
+        await stack.enter_async_context(client)
+        replayer = Replayer(client, args.speed, args.seed)
+        elapsed = await replayer.run(scripts)
+    return replayer, elapsed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("captures", nargs="+", help="capture files (*.ndjson.gz) from CAPTURE_DIR")
+    parser.add_argument("--url", action="append", help="base URL of a running build; repeat to compare builds")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression, e.g. 10 replays an hour in 6 minutes")
+    parser.add_argument("--max-connections", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seeds the moves picked when a recorded one is illegal")
+    parser.add_argument("--log-level", default="WARNING", help="app log level for in-process runs")
+    parser.add_argument("--save", help="write the reports as JSON to this file")
+    parser.add_argument("--baseline", help="a report saved with --save to compare the first target against")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+    args = parser.parse_args(argv)
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        sys.exit("httpx is required: uv run --with httpx python -m benchmarks.replay")
+
+    scripts, span_ms = load(args.captures)
+    if not scripts:
+        sys.exit("no captured requests")
+    reports = []
+    for target in args.url or [None]:
+        replayer, elapsed = asyncio.run(_replay(target, scripts, args))
+        reports.append(build_report(target or "in-process", replayer, elapsed, len(scripts), span_ms, args.speed))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)[0]
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump(reports, fh, indent=2)
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for report in reports:
+        print_report(report)
+    for other in reports[1:]:
+        print_comparison(reports[0], other)
+    if baseline is not None:
+        print_comparison(baseline, reports[0])
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,6 @@ set -e
 echo "[entrypoint] Running Alembic migrations..."
 uv run alembic upgrade head
 
-# Start the FastAPI app
-echo "[entrypoint] Starting Uvicorn..."
-exec uv run uvicorn app.main:app --host 0.0.0.0 --port ${PORT:-8000}
+# Start the FastAPI app: preforked workers (WEB_CONCURRENCY) sharing preloaded state
+echo "[entrypoint] Starting server..."
+exec uv run python main.py --host 0.0.0.0 --port ${PORT:-8000}
@@ -1,6 +1,6 @@
-def main():
-    print("Hello from backend!")
+import sys
 
+from app.server import main
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""add game outcome stats rollup
+
+Revision ID: 5b1e7c3d9a20
+Revises: ac2226857dde
+Create Date: 2026-10-19 09:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c3d9a20'
+down_revision: Union[str, Sequence[str], None] = 'ac2226857dde'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('game_outcome_stats',
+    sa.Column('difficulty', sa.String(length=16), nullable=False),
+    sa.Column('first_player', sa.String(length=8), nullable=False),
+    sa.Column('human_symbol', sa.String(length=1), nullable=False),
+    sa.Column('opening_move', sa.SmallInteger(), nullable=False),
+    sa.Column('result', sa.String(length=8), nullable=False),
+    sa.Column('games', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('difficulty', 'first_player', 'human_symbol', 'opening_move', 'result')
+    )
+    # Existing finished games are loaded with: python -m app.cli.backfill_stats
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('game_outcome_stats')
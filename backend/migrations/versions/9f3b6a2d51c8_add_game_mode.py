@@ -0,0 +1,34 @@
+"""add game mode for ultimate games
+
+Revision ID: 9f3b6a2d51c8
+Revises: e7a91f04b6d2
+Create Date: 2026-10-19 16:20:41.118204
+
+Existing rows become classic games through the server default. Widening a
+varchar on PostgreSQL only updates the catalog; the table is not rewritten.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3b6a2d51c8'
+down_revision: Union[str, Sequence[str], None] = 'e7a91f04b6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('games', sa.Column('mode', sa.String(length=16), server_default='classic', nullable=False))
+    op.alter_column('games', 'board', existing_type=sa.String(length=9), type_=sa.String(length=81), existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Ultimate boards do not fit the narrower column
+    op.execute("DELETE FROM games WHERE mode <> 'classic'")
+    op.alter_column('games', 'board', existing_type=sa.String(length=81), type_=sa.String(length=9), existing_nullable=False)
+    op.drop_column('games', 'mode')
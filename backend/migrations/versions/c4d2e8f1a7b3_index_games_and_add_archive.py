@@ -0,0 +1,76 @@
+"""index games and add games_archive
+
+Revision ID: c4d2e8f1a7b3
+Revises: 5b1e7c3d9a20
+Create Date: 2026-10-19 10:41:07.552931
+
+Set GAMES_ARCHIVE_PARTITIONED=true when running this migration on PostgreSQL
+to create games_archive range-partitioned by finished_at. The archival job
+creates monthly partitions on demand, and retention becomes a DROP of old
+partitions.
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d2e8f1a7b3'
+down_revision: Union[str, Sequence[str], None] = '5b1e7c3d9a20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _partitioned() -> bool:
+    return os.getenv("GAMES_ARCHIVE_PARTITIONED", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_pg = op.get_bind().dialect.name == "postgresql"
+
+    # Build indexes without blocking writes on an already large games table
+    with op.get_context().autocommit_block():
+        op.create_index('ix_games_status_updated_at', 'games', ['status', 'updated_at'], unique=False, postgresql_concurrently=is_pg)
+        op.create_index('ix_games_created_at', 'games', ['created_at'], unique=False, postgresql_concurrently=is_pg)
+
+    if is_pg and _partitioned():
+        # Partition key must be part of the primary key
+        op.execute(
+            """
+            CREATE TABLE games_archive (
+                id VARCHAR(36) NOT NULL,
+                board VARCHAR(9) NOT NULL,
+                difficulty VARCHAR(16) NOT NULL,
+                status VARCHAR(32) NOT NULL,
+                human_symbol VARCHAR(1) NOT NULL,
+                moves INTEGER[],
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                finished_at TIMESTAMP WITH TIME ZONE NOT NULL,
+                PRIMARY KEY (id, finished_at)
+            ) PARTITION BY RANGE (finished_at)
+            """
+        )
+    else:
+        op.create_table('games_archive',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('board', sa.String(length=9), nullable=False),
+        sa.Column('difficulty', sa.String(length=16), nullable=False),
+        sa.Column('status', sa.String(length=32), nullable=False),
+        sa.Column('human_symbol', sa.String(length=1), nullable=False),
+        sa.Column('moves', postgresql.ARRAY(sa.Integer()), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index('ix_games_archive_finished_at', 'games_archive', ['finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_games_archive_finished_at', table_name='games_archive')
+    op.drop_table('games_archive')
+    op.drop_index('ix_games_created_at', table_name='games')
+    op.drop_index('ix_games_status_updated_at', table_name='games')
@@ -0,0 +1,34 @@
+"""keyset indexes for game listing
+
+Revision ID: e7a91f04b6d2
+Revises: c4d2e8f1a7b3
+Create Date: 2026-10-19 14:03:55.270419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a91f04b6d2'
+down_revision: Union[str, Sequence[str], None] = 'c4d2e8f1a7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_pg = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.create_index('ix_games_created_at_id', 'games', ['created_at', 'id'], unique=False, postgresql_concurrently=is_pg)
+        op.create_index('ix_games_status_created_at_id', 'games', ['status', 'created_at', 'id'], unique=False, postgresql_concurrently=is_pg)
+        # Superseded by the (created_at, id) prefix
+        op.drop_index('ix_games_created_at', table_name='games', postgresql_concurrently=is_pg)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_games_created_at', 'games', ['created_at'], unique=False)
+    op.drop_index('ix_games_status_created_at_id', table_name='games')
+    op.drop_index('ix_games_created_at_id', table_name='games')
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.settings import Settings
+from app.main import create_app
+
+
+@pytest.fixture
+def make_client() -> Iterator[Callable[..., TestClient]]:
+    """Build an app from Settings overrides and run its lifespan for the test.
+
+    The defaults give the in-memory repository and no Gemini key, so tests
+    run offline.
+    """
+    clients: List[TestClient] = []
+
+    def make(**overrides: Any) -> TestClient:
+        overrides.setdefault("log_level", "WARNING")
+        client = TestClient(create_app(Settings(**overrides)))
+        client.__enter__()
+        clients.append(client)
+        return client
+
+    yield make
+    for client in reversed(clients):
+        client.__exit__(None, None, None)
+
+
+@pytest.fixture
+def client(make_client: Callable[..., TestClient]) -> TestClient:
+    return make_client()
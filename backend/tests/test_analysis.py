@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def analyse(client: TestClient, *positions: str, to_move: str | None = None) -> list:
+    body = {"positions": list(positions), **({"to_move": to_move} if to_move else {})}
+    response = client.post("/analysis", json=body)
+    assert response.status_code == 200
+    return response.json()["results"]
+
+
+def test_unreachable_boards_are_errors(client: TestClient) -> None:
+    results = analyse(
+        client,
+        "xxxooo   ",  # both sides have a line
+        "xxx oo o ",  # O moved after X had won
+        "ooo xx xx",  # X moved after O had won
+    )
+    assert [r["error"] for r in results] == ["unreachable"] * 3
+    assert all("status" not in r for r in results)
+
+
+def test_won_boards_report_the_winner(client: TestClient) -> None:
+    x_won, o_won = analyse(client, "xxxoo    ", "ooo xx x ")
+    assert x_won["status"] == "x_won" and "error" not in x_won
+    assert o_won["status"] == "o_won" and "error" not in o_won
+    # A double line completed by one move is still a real finish
+    assert analyse(client, "xxxxoooox")[0]["status"] == "x_won"
+
+
+def test_to_move_decides_who_moved_last(client: TestClient) -> None:
+    # Equal counts: with O to start, X made the last and winning move
+    assert analyse(client, "xxx oo o ", to_move="o")[0]["status"] == "x_won"
+    assert analyse(client, "xxx oo o ", to_move="x")[0]["error"] == "unreachable"
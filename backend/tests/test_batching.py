@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from app.domain.ai.batching import BatchingGeminiStrategy, MicroBatcher
+from app.domain.ai.medium import HeuristicStrategy
+from app.domain.ai.resilience import UpstreamLimits
+from app.domain.board import Board
+from app.domain.enums import Player
+
+# Two marks and no threats, so no guardrail overrides the model's answer
+BOARDS = [Board.from_string(s) for s in ("x   o    ", "x       o", " x  o    ", "  x o    ")]
+
+
+class _Response:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class FakeModel:
+    """Answers a batch prompt with answer(items), items as sent in the prompt."""
+
+    def __init__(self, answer: Callable[[List[Dict[str, Any]]], Any]) -> None:
+        self.answer = answer
+        self.prompts: List[List[Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, **kwargs: Any) -> _Response:
+        items = json.loads(re.search(r"Positions \(JSON\):\n(.*)\n", prompt).group(1))
+        with self._lock:
+            self.prompts.append(items)
+        return _Response(json.dumps(self.answer(items)))
+
+
+def last_available(items: List[Dict[str, Any]]) -> List[Dict[str, int]]:
+    return [{"id": it["id"], "position": it["available"][-1]} for it in items]
+
+
+def make_strategy(model: FakeModel, window_s: float = 0.2, max_size: int = 8, move_budget_s: float = 0.0) -> BatchingGeminiStrategy:
+    limits = UpstreamLimits(batch_window_s=window_s, batch_max_size=max_size, move_budget_s=move_budget_s)
+    return BatchingGeminiStrategy("test-key", limits=limits, model_factory=lambda key, name: model)
+
+
+def play_concurrently(strategy: BatchingGeminiStrategy, boards: List[Board]) -> List[int]:
+    with ThreadPoolExecutor(len(boards)) as pool:
+        return list(pool.map(lambda b: strategy.select_move(b, Player.X), boards))
+
+
+def test_parse_batch() -> None:
+    parse = BatchingGeminiStrategy._parse_batch
+    assert parse('[{"id": 0, "position": 5}, {"id": 1, "position": 3}]') == {0: 5, 1: 3}
+    assert parse('{"moves": [{"id": 2, "position": 9}]}') == {2: 9}
+    assert parse('[{"id": "0", "position": 5}, {"id": 1}, 7, {"id": 3, "position": 1}]') == {3: 1}
+    assert parse("not json") == {}
+    assert parse('{"position": 5}') == {}
+
+
+def test_batcher_groups_by_window_and_max_size() -> None:
+    seen: List[List[int]] = []
+
+    def handler(batch) -> None:
+        seen.append([p.item for p in batch])
+        for p in batch:
+            p.future.set_result(p.item * 10)
+
+    batcher: MicroBatcher[int, int] = MicroBatcher(handler, window_s=0.2, max_size=3, workers=2)
+    futures = [batcher.submit(i) for i in range(5)]
+    assert [f.result(timeout=2) for f in futures] == [0, 10, 20, 30, 40]
+    # Full batches go at max_size; the rest waits out the window
+    assert seen == [[0, 1, 2], [3, 4]]
+    snap = batcher.snapshot()
+    assert (snap["batches"], snap["batched_items"], snap["largest_batch"]) == (2, 5, 3)
+
+    time.sleep(0.25)
+    assert batcher.submit(5).result(timeout=2) == 50
+    assert seen[-1] == [5]
+
+
+def test_concurrent_moves_share_one_call_and_fan_out() -> None:
+    model = FakeModel(last_available)
+    strategy = make_strategy(model)
+    # The repeated board takes one slot in the prompt
+    moves = play_concurrently(strategy, BOARDS + [BOARDS[0]])
+    assert len(model.prompts) == 1
+    assert sorted(it["board"] for it in model.prompts[0]) == sorted(b.to_string() for b in BOARDS)
+    assert moves == [b.available_positions()[-1] for b in BOARDS + [BOARDS[0]]]
+
+
+def test_max_size_splits_the_calls() -> None:
+    model = FakeModel(last_available)
+    strategy = make_strategy(model, max_size=2)
+    moves = play_concurrently(strategy, BOARDS)
+    assert sorted(len(items) for items in model.prompts) == [2, 2]
+    assert moves == [b.available_positions()[-1] for b in BOARDS]
+
+
+def test_bad_or_missing_answers_fall_back_per_game() -> None:
+    def answer(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        out: List[Dict[str, Any]] = []
+        for it in items:
+            board = it["board"]
+            if board == BOARDS[1].to_string():
+                continue  # no answer for this id
+            if board == BOARDS[2].to_string():
+                out.append({"id": it["id"], "position": 5})  # already taken
+            else:
+                out.append({"id": it["id"], "position": it["available"][-1]})
+        return {"moves": out}
+
+    strategy = make_strategy(FakeModel(answer))
+    moves = play_concurrently(strategy, BOARDS)
+    heuristic = HeuristicStrategy()
+    assert moves[0] == BOARDS[0].available_positions()[-1]
+    assert moves[3] == BOARDS[3].available_positions()[-1]
+    for i in (1, 2):
+        assert moves[i] == heuristic.select_move(BOARDS[i], Player.X)
+
+
+def test_wait_is_bounded_by_the_move_budget() -> None:
+    release = threading.Event()
+
+    def hang(items: List[Dict[str, Any]]) -> Optional[list]:
+        release.wait(5)
+        return last_available(items)
+
+    strategy = make_strategy(FakeModel(hang), window_s=0.01, move_budget_s=0.3)
+    try:
+        start = time.monotonic()
+        move = strategy.select_move(BOARDS[0], Player.X)
+        # Well before window + GEMINI_TIMEOUT_S + slack (2.51 s)
+        assert time.monotonic() - start < 1.0
+        assert move == HeuristicStrategy().select_move(BOARDS[0], Player.X)
+    finally:
+        release.set()
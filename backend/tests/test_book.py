@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+
+from app.domain.ai.book import Book, BookStrategy, build, variant, write_book
+from app.domain.ai.solver import evaluate_moves, solved_table
+from app.domain.board import Board
+from app.domain.enums import Player
+
+
+def masks(state: str) -> Tuple[int, int]:
+    x = o = 0
+    for idx, cell in enumerate(state):
+        if cell == "x":
+            x |= 1 << idx
+        elif cell == "o":
+            o |= 1 << idx
+    return x, o
+
+
+@pytest.fixture(scope="module")
+def book_3x3(tmp_path_factory: pytest.TempPathFactory) -> Book:
+    v = variant(3, 3)
+    entries, _ = build(v)
+    path = tmp_path_factory.mktemp("books") / "3x3-k3.book"
+    write_book(str(path), v, entries)
+    book = Book(str(path))
+    assert len(book) == len(entries)
+    yield book
+    book.close()
+
+
+def test_book_matches_the_solved_table(book_3x3: Book) -> None:
+    table = solved_table()
+    found = 0
+    for (state, to_move), expected in table.items():
+        x, o = masks(state)
+        hit = book_3x3.lookup(x, o, to_move == "o")
+        # The builder stops at a win in one, so a few positions only reachable
+        # past a missed win are left to the runtime search
+        if hit is not None:
+            assert hit == expected, (state, to_move)
+            found += 1
+    assert found > 0.95 * len(table)
+    assert book_3x3.lookup(0, 0, False) == table[(" " * 9, "x")]
+
+
+def test_book_strategy_plays_perfectly(book_3x3: Book) -> None:
+    strategy = BookStrategy(book_3x3)
+    for (state, to_move), (value, dist) in solved_table().items():
+        board = Board.from_string(state)
+        me = Player(to_move)
+        pos = strategy.select_move(board, me)
+        scored = {p: (v, d) for p, v, d in evaluate_moves(state, me)}
+        assert scored[pos] == (value, dist), (state, to_move)
+
+
+def test_partial_book_leaves_deep_positions_to_the_search(tmp_path: Path) -> None:
+    v = variant(3, 3)
+    entries, _ = build(v, max_plies=2)
+    path = tmp_path / "partial.book"
+    write_book(str(path), v, entries, max_plies=2)
+    book = Book(str(path))
+    try:
+        assert book.max_plies == 2
+        state = "xo x     "  # three stones: past the book
+        x, o = masks(state)
+        assert book.lookup(x, o, True) is None
+        pos = BookStrategy(book).select_move(Board.from_string(state), Player.O)
+        values = {p: value for p, value, _ in evaluate_moves(state, Player.O)}
+        assert values[pos] == max(values.values())
+    finally:
+        book.close()
+
+
+def test_truncated_book_is_refused(tmp_path: Path) -> None:
+    v = variant(3, 3)
+    entries, _ = build(v, max_plies=1)
+    path = tmp_path / "short.book"
+    write_book(str(path), v, entries, max_plies=1)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="truncated"):
+        Book(str(path))
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import io
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.db.models import GameArchiveModel, GameModel, GameOutcomeStatModel
+from app.domain.board import EXTERNAL_ORDER
+from app.services.bulk_import import ImportReport, import_records, read_ndjson, validate_batch
+
+CREATED = "2024-01-01T00:00:00+00:00"
+
+
+def won_by_x(game_id: str) -> Dict[str, Any]:
+    """x takes the first row of EXTERNAL_ORDER while o answers in the second."""
+    row, other = EXTERNAL_ORDER[:3], EXTERNAL_ORDER[3:5]
+    moves = [row[0], other[0], row[1], other[1], row[2]]
+    board = "xxxoo    "
+    return {
+        "id": game_id,
+        "board": board,
+        "next_player": "x",
+        "difficulty": "easy",
+        "status": "x_won",
+        "human_symbol": "x",
+        "computer_symbol": "o",
+        "moves": moves,
+        "created_at": CREATED,
+        "updated_at": CREATED,
+    }
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    engine.dispose()
+
+
+def test_read_ndjson_rejects_non_objects() -> None:
+    stream = io.StringIO('[1, 2]\n"text"\n{"id": "a"}\nnot json\n\n')
+    assert list(read_ndjson(stream)) == [
+        {"_error": "invalid_json"},
+        {"_error": "invalid_json"},
+        {"id": "a"},
+        {"_error": "invalid_json"},
+    ]
+
+
+def test_unhashable_fields_are_rejected() -> None:
+    records: List[Dict[str, Any]] = [
+        {**won_by_x("a"), "difficulty": ["easy"]},
+        {**won_by_x("b"), "human_symbol": {"x": 1}},
+        won_by_x("c"),
+    ]
+    report = ImportReport()
+    rows = validate_batch(records, report)
+    assert [r["id"] for r in rows] == ["c"]
+    assert report.reject_reasons == {"invalid_difficulty": 1, "invalid_symbols": 1}
+
+
+def test_archived_games_are_not_imported_again(session_factory) -> None:
+    ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    rec = won_by_x("archived")
+    with session_factory.begin() as db:
+        db.add(
+            GameArchiveModel(
+                id="archived",
+                board=rec["board"],
+                difficulty="easy",
+                status="x_won",
+                human_symbol="x",
+                moves=rec["moves"],
+                created_at=ts,
+                finished_at=ts,
+            )
+        )
+
+    report = import_records(session_factory, [rec, won_by_x("fresh")])
+    assert (report.inserted, report.duplicates) == (1, 1)
+    with session_factory() as db:
+        assert list(db.execute(select(GameModel.id)).scalars()) == ["fresh"]
+        assert sum(db.execute(select(GameOutcomeStatModel.games)).scalars()) == 1
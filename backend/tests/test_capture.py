@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import os
+
+from app.core import capture as capture_module
+from app.core.capture import TrafficCapture, read_capture, sanitize
+
+
+def _files(directory) -> list:
+    return sorted(p for p in os.listdir(directory) if p.endswith(".ndjson.gz"))
+
+
+def test_sanitize_keeps_only_whitelisted_scalars() -> None:
+    raw = b'{"difficulty": "hard", "first_player": "human", "secret": "x", "mode": ["a"]}'
+    assert sanitize("create", raw) == {"difficulty": "hard", "first_player": "human"}
+    assert sanitize("move", b'{"position": 5, "board": true}') == {"position": 5}
+    assert sanitize("move", b"[1, 2]") is None
+    assert sanitize("get", b'{"position": 5}') is None
+
+
+def test_file_is_opened_by_the_serving_process(tmp_path, monkeypatch) -> None:
+    capture = TrafficCapture(str(tmp_path))
+    # Building the app (as the launcher does before forking) writes nothing
+    assert _files(tmp_path) == []
+    assert capture.snapshot()["path"] is None
+
+    capture.record(capture.elapsed_ms(), capture.add_game("a"), "create", 200, 1.0, None)
+    parent_path = capture.snapshot()["path"]
+    capture._writer.close()
+
+    # A forked worker gets its own writer, file and game numbers
+    pid = os.getpid()
+    monkeypatch.setattr(capture_module.os, "getpid", lambda: pid + 1)
+    t_ms = capture.elapsed_ms()  # the middleware's first call on every request
+    assert capture.game_number("a") is None
+    capture.record(t_ms, capture.add_game("b"), "create", 200, 1.0, None)
+    child_path = capture.snapshot()["path"]
+    capture.close()
+
+    assert child_path != parent_path
+    assert sorted(os.path.join(tmp_path, f) for f in _files(tmp_path)) == sorted([parent_path, child_path])
+    for path in (parent_path, child_path):
+        header, records = read_capture(path)
+        assert header["v"] == 1
+        assert [r[1:3] for r in records] == [[1, "create"]]
+
+
+def test_game_requests_are_recorded(make_client, tmp_path) -> None:
+    client = make_client(capture_enabled=True, capture_dir=str(tmp_path))
+    game = client.post("/games", json={"difficulty": "easy", "secret": "x"}).json()
+    client.post(f"/games/{game['id']}/moves", json={"position": 5})
+    client.get(f"/games/{game['id']}", headers={"If-None-Match": '"x"'})
+    client.get("/games")
+    client.post("/games", json={"difficulty": "nope"})
+    client.app.state.container.capture.close()
+
+    (name,) = _files(tmp_path)
+    _, records = read_capture(os.path.join(tmp_path, name))
+    rows = sorted(records, key=lambda r: r[0])
+    assert [(r[1], r[2], r[3], r[5]) for r in rows] == [
+        (1, "create", 200, {"difficulty": "easy"}),
+        (1, "move", 200, {"position": 5}),
+        (1, "get", 200, {"if_none_match": True}),
+        (0, "create", 422, {"difficulty": "nope"}),
+    ]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.game_service import GameService
+
+HEADER = "X-Request-Timeout-Ms"
+
+
+def by_stage(client: TestClient) -> Dict[str, int]:
+    return client.get("/metrics").json()["deadlines"]["by_stage"]
+
+
+def test_spent_budget_is_refused_on_arrival(client: TestClient) -> None:
+    resp = client.post("/games", json={}, headers={HEADER: "0"})
+    assert (resp.status_code, resp.json()["detail"]) == (504, "deadline_exceeded")
+    assert by_stage(client) == {"arrival": 1}
+    # Unparseable budgets are ignored rather than refused
+    assert client.post("/games", json={}, headers={HEADER: "soon"}).status_code == 200
+
+
+def test_budget_spent_waiting_stops_before_any_work(client: TestClient) -> None:
+    resp = client.post("/games", json={}, headers={HEADER: "0.000001"})
+    assert resp.status_code == 504
+    assert by_stage(client) == {"queued": 1}
+    assert client.get("/games").json()["items"] == []
+
+
+def test_move_without_time_for_the_strategy(make_client: Callable[..., TestClient]) -> None:
+    # Everything the client will wait is kept back to save and answer
+    client = make_client(deadline_reserve_ms=10_000)
+    game = client.post("/games", json={}).json()
+    resp = client.post(f"/games/{game['id']}/moves", json={"position": 5}, headers={HEADER: "5000"})
+    assert resp.status_code == 504
+    assert by_stage(client) == {"strategy": 1}
+    assert client.get(f"/games/{game['id']}").json()["moves"] == []
+
+
+def test_move_past_its_deadline_is_not_saved(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    game = client.post("/games", json={}).json()
+
+    def slow_move(self: GameService, difficulty: Any, board: Any, me: Any) -> int:
+        time.sleep(0.3)
+        return 1
+
+    monkeypatch.setattr(GameService, "_select_move", slow_move)
+    resp = client.post(f"/games/{game['id']}/moves", json={"position": 5}, headers={HEADER: "150"})
+    assert resp.status_code == 504
+    assert by_stage(client) == {"save": 1}
+    # The retry finds the game as it was before the move
+    assert client.get(f"/games/{game['id']}").json()["moves"] == []
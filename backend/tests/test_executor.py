@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Optional
+
+import pytest
+
+from app.core.deadline import Deadline
+from app.domain.ai import executor as executor_module
+from app.domain.ai.base import Strategy
+from app.domain.ai.executor import StrategyExecutor, StrategyOptions
+from app.domain.board import Board
+from app.domain.enums import Difficulty, Player
+
+BOARD = Board.from_string("x   o    ")
+
+
+class Stub(Strategy):
+    """Plays a fixed move, after waiting on release (if any) or raising error."""
+
+    def __init__(self, move: int, release: Optional[threading.Event] = None, error: bool = False) -> None:
+        self.move = move
+        self.release = release
+        self.error = error
+        self.calls = 0
+
+    def select_move(self, board: Board, me: Player) -> int:
+        self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        if self.error:
+            raise RuntimeError("stub failed")
+        return self.move
+
+
+@pytest.fixture
+def stubs(monkeypatch) -> Dict[Difficulty, Stub]:
+    table = {Difficulty.HARD: Stub(9), Difficulty.MEDIUM: Stub(6), Difficulty.EASY: Stub(3)}
+    monkeypatch.setattr(executor_module, "strategy_for", lambda difficulty, **_: table[difficulty])
+    return table
+
+
+def make_executor(workers: int = 2, budget_s: float = 0.05) -> StrategyExecutor:
+    return StrategyExecutor(StrategyOptions(), {Difficulty.HARD: budget_s, Difficulty.MEDIUM: budget_s}, workers=workers)
+
+
+def test_move_within_budget_is_played(stubs) -> None:
+    executor = make_executor(budget_s=1.0)
+    try:
+        assert executor.select_move(Difficulty.HARD, BOARD, Player.X) == 9
+        hard = executor.snapshot()["difficulties"]["hard"]
+        assert (hard["calls"], hard["timeouts"], hard["errors"], hard["fallbacks"]) == (1, 0, 0, 0)
+    finally:
+        executor.shutdown()
+
+
+def test_overrun_falls_back_to_the_cheaper_difficulty(stubs) -> None:
+    release = threading.Event()
+    stubs[Difficulty.HARD].release = release
+    executor = make_executor()
+    try:
+        assert executor.select_move(Difficulty.HARD, BOARD, Player.X) == 6
+        hard = executor.snapshot()["difficulties"]["hard"]
+        assert (hard["timeouts"], hard["errors"], hard["fallbacks"]) == (1, 0, 1)
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_deadline_shortens_the_budget(stubs) -> None:
+    release = threading.Event()
+    stubs[Difficulty.HARD].release = release
+    executor = make_executor(budget_s=5.0)
+    try:
+        start = time.monotonic()
+        assert executor.select_move(Difficulty.HARD, BOARD, Player.X, Deadline.after(0.05)) == 6
+        assert time.monotonic() - start < 1.0
+        hard = executor.snapshot()["difficulties"]["hard"]
+        assert (hard["deadline_capped"], hard["timeouts"]) == (1, 1)
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_failure_falls_back_down_the_chain(stubs) -> None:
+    stubs[Difficulty.HARD].error = True
+    executor = make_executor()
+    try:
+        assert executor.select_move(Difficulty.HARD, BOARD, Player.X) == 6
+        assert executor.snapshot()["difficulties"]["hard"]["errors"] == 1
+
+        stubs[Difficulty.MEDIUM].error = True
+        assert executor.select_move(Difficulty.HARD, BOARD, Player.X) == 3
+        stubs[Difficulty.EASY].error = True
+        # With every strategy failing, the first legal move is played
+        assert executor.select_move(Difficulty.HARD, BOARD, Player.X) == BOARD.legal_moves[0]
+    finally:
+        executor.shutdown()
+
+
+def test_cancelled_queued_move_leaves_the_queue_depth_exact(stubs) -> None:
+    release = threading.Event()
+    stubs[Difficulty.HARD].release = release
+    executor = make_executor(workers=1)
+    try:
+        # The first move occupies the only worker past its budget...
+        assert executor.select_move(Difficulty.HARD, BOARD, Player.X) == 6
+        # ...so the second waits in the queue until it times out and is cancelled
+        assert executor.select_move(Difficulty.HARD, BOARD, Player.X) == 6
+        assert stubs[Difficulty.HARD].calls == 1
+        snap = executor.snapshot()
+        assert (snap["queue_depth"], snap["max_queue_depth"], snap["running"]) == (0, 1, 1)
+        assert snap["difficulties"]["hard"]["timeouts"] == 2
+
+        release.set()
+        end = time.monotonic() + 5
+        while executor.snapshot()["running"] and time.monotonic() < end:
+            time.sleep(0.01)
+        snap = executor.snapshot()
+        assert (snap["queue_depth"], snap["running"]) == (0, 0)
+    finally:
+        release.set()
+        executor.shutdown()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.export as export_api
+
+
+def test_export_accepts_naive_bounds(client: TestClient) -> None:
+    created = {client.post("/games", json={}).json()["id"] for _ in range(3)}
+
+    resp = client.get("/export/games", params={"created_from": "2020-01-01T00:00:00"})
+    assert resp.status_code == 200
+    assert {json.loads(line)["id"] for line in resp.text.splitlines()} == created
+
+    resp = client.get("/export/games", params={"created_to": "2020-01-01T00:00:00"})
+    assert resp.status_code == 200
+    assert resp.text == ""
+
+
+def test_export_failure_does_not_end_the_response(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    for _ in range(3):
+        client.post("/games", json={})
+    real = export_api.iter_game_payloads
+
+    def failing(games, flt):
+        for i, payload in enumerate(real(games, flt)):
+            if i == 2:
+                raise RuntimeError("export broke")
+            yield payload
+
+    monkeypatch.setattr(export_api, "iter_game_payloads", failing)
+    sent: List[Dict[str, Any]] = []
+    received: List[bool] = []
+
+    async def receive() -> Dict[str, Any]:
+        if received:
+            # The client stays connected
+            await asyncio.Event().wait()
+        received.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/export/games",
+        "raw_path": b"/export/games",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    # The error must reach the server, which then drops the connection
+    # rather than finishing the chunked body
+    with pytest.raises(RuntimeError, match="export broke"):
+        asyncio.run(client.app(scope, receive, send))
+    assert not any(m["type"] == "http.response.body" and not m.get("more_body", False) for m in sent)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.api.games import decode_cursor, encode_cursor
+
+
+def test_list_games_accepts_naive_bounds(client: TestClient) -> None:
+    created = [client.post("/games", json={}).json()["id"] for _ in range(3)]
+
+    resp = client.get("/games", params={"created_from": "2020-01-01T00:00:00"})
+    assert resp.status_code == 200
+    assert {g["id"] for g in resp.json()["items"]} == set(created)
+
+    resp = client.get("/games", params={"created_to": "2020-01-01T00:00:00"})
+    assert resp.status_code == 200
+    assert resp.json()["items"] == []
+
+
+def test_list_games_accepts_naive_cursor(client: TestClient) -> None:
+    for _ in range(3):
+        client.post("/games", json={})
+    first = client.get("/games", params={"limit": 1}).json()
+    created_at, game_id = decode_cursor(first["next_cursor"])
+    naive = encode_cursor((created_at.replace(tzinfo=None), game_id))
+
+    resp = client.get("/games", params={"limit": 5, "cursor": naive})
+    assert resp.status_code == 200
+    assert len(resp.json()["items"]) == 2
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.idempotency import request_fingerprint, store_key
+from app.core.settings import Settings
+from app.db.base import Base
+from app.main import create_app
+from app.repositories.base import StoredResponse
+from app.repositories.memory import InMemoryIdempotencyStore
+from app.repositories.sqlalchemy import SQLAlchemyIdempotencyStore
+
+JSON = {"content-type": "application/json"}
+
+
+def create(client: TestClient, key: str, body: bytes = b'{"difficulty": "easy"}'):
+    return client.post("/games", content=body, headers={**JSON, "Idempotency-Key": key})
+
+
+def test_repeat_replays_the_stored_response(client: TestClient) -> None:
+    first = create(client, "k1")
+    assert first.status_code == 200
+    assert "idempotent-replayed" not in first.headers
+
+    again = create(client, "k1")
+    assert again.status_code == 200
+    assert again.headers["idempotent-replayed"] == "true"
+    assert again.content == first.content
+    assert len(client.get("/games").json()["items"]) == 1
+
+    game_id = first.json()["id"]
+    move = {**JSON, "Idempotency-Key": "k1"}
+    played = client.post(f"/games/{game_id}/moves", content=b'{"position": 5}', headers=move)
+    # The same key on another path is another request
+    assert played.status_code == 200
+    assert client.post(f"/games/{game_id}/moves", content=b'{"position": 5}', headers=move).content == played.content
+
+
+def test_reused_key_with_another_body_is_rejected(client: TestClient) -> None:
+    assert create(client, "k2").status_code == 200
+    resp = create(client, "k2", b'{"difficulty": "hard"}')
+    assert (resp.status_code, resp.json()["detail"]) == (422, "idempotency_key_reused")
+    assert create(client, "x" * 256).status_code == 400
+
+
+def test_repeat_while_the_first_runs_gets_409(client: TestClient) -> None:
+    body = b'{"difficulty": "easy"}'
+    store = client.app.state.container.idempotency.store
+    # Claimed, as by a first request that has not answered yet
+    assert store.begin(store_key("POST", "/games", "k3"), request_fingerprint("POST", "/games", b"", body), 60) is None
+
+    resp = create(client, "k3", body)
+    assert (resp.status_code, resp.json()["detail"]) == (409, "request_in_progress")
+    assert resp.headers["retry-after"] == "1"
+
+
+def test_entries_expire_after_the_ttl(make_client: Callable[..., TestClient]) -> None:
+    client = make_client(idempotency_ttl_s=0.05)
+    first = create(client, "k4")
+    time.sleep(0.1)
+    again = create(client, "k4")
+    assert "idempotent-replayed" not in again.headers
+    assert again.json()["id"] != first.json()["id"]
+
+
+def test_memory_store_evicts_the_oldest_key() -> None:
+    store = InMemoryIdempotencyStore(max_entries=2)
+    for key in ("a", "b", "c"):
+        assert store.begin(key, "f", 60) is None
+    assert store.snapshot()["evicted"] == 1
+    # a was evicted: it can be claimed again, and completing the old claim does nothing
+    store.complete("a", StoredResponse("f", 200, None, b"old"), 60)
+    assert store.begin("a", "f", 60) is None
+    assert store.begin("c", "f", 60) == StoredResponse("f")
+
+
+def test_db_store_round_trip() -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    store = SQLAlchemyIdempotencyStore(sessionmaker(bind=engine))
+    # Long paths and keys still fit: entries are stored under a digest
+    key = store_key("POST", "/games/" + "g" * 36 + "/moves", "k" * 255)
+    assert len(key) == 64
+
+    assert store.begin(key, "f", 60) is None
+    assert store.begin(key, "f", 60) == StoredResponse("f")
+    store.complete(key, StoredResponse("f", 200, "application/json", b"{}"), 60)
+    assert store.begin(key, "f", 60) == StoredResponse("f", 200, "application/json", b"{}")
+    store.release(key)  # only drops pending claims
+    assert store.begin(key, "f", 60).status == 200
+    engine.dispose()
+
+
+def test_db_store_is_built_by_the_lifespan(tmp_path) -> None:
+    app = create_app(
+        Settings(log_level="WARNING", database_url=f"sqlite:///{tmp_path / 'games.db'}", idempotency_store="db")
+    )
+    container = app.state.container
+    # As under app.server: nothing touches the database before a worker starts
+    assert "idempotency" not in container.__dict__ and "engine" not in container.__dict__
+
+    with TestClient(app) as client:
+        assert "idempotency" in container.__dict__
+        Base.metadata.create_all(container.engine)
+        first = create(client, "k1")
+        assert first.status_code == 200
+        assert create(client, "k1").headers["idempotent-replayed"] == "true"
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.domain.enums import Difficulty, GameMode
+from app.domain.game import Game
+from app.repositories.base import GameListQuery, GameListRow
+from app.repositories.memory import InMemoryGameRepository
+from app.repositories.sqlalchemy import SQLAlchemyGameRepository
+
+
+def games() -> list[Game]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    out = []
+    for i in range(5):
+        mode = GameMode.ULTIMATE if i == 2 else GameMode.CLASSIC
+        game = Game.new(f"g{i}", Difficulty.EASY if i % 2 else Difficulty.HARD, True, mode=mode)
+        game.created_at = game.updated_at = start + timedelta(minutes=i)
+        out.append(game)
+    return out
+
+
+def columns(rows: list[GameListRow]) -> list[tuple]:
+    return [(r.id, r.board, r.next_player, r.difficulty, r.status, r.human_symbol, r.mode) for r in rows]
+
+
+def test_list_page_returns_the_same_rows_from_both_repositories() -> None:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    memory = InMemoryGameRepository()
+    with Session(engine) as session:
+        sql = SQLAlchemyGameRepository(session)
+        for game in games():
+            memory.save(game)
+            sql.save(game)
+        session.commit()
+
+        query = GameListQuery(difficulties=("hard",), created_from=datetime(2024, 1, 1))
+        for repo in (memory, sql):
+            first = repo.list_page(query, None, 2)
+            assert all(isinstance(r, GameListRow) for r in first)
+            assert [r.id for r in first] == ["g4", "g2"]
+            assert first[1].mode == "ultimate"
+            rest = repo.list_page(query, (first[-1].created_at, first[-1].id), 2)
+            assert [r.id for r in rest] == ["g0"]
+        # SQLite hands timestamps back naive, so compare the other columns
+        assert columns(memory.list_page(GameListQuery(), None, 10)) == columns(sql.list_page(GameListQuery(), None, 10))
+    engine.dispose()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+
+from app.core import tracing as tracing_module
+from app.core.tracing import OTLPFileExporter, Span, Trace
+
+
+def _trace(name: str) -> Trace:
+    trace = Trace(os.urandom(16).hex())
+    trace.root = Span(trace, name, None, {"http.target": "/games"})
+    with trace.root:
+        pass
+    return trace
+
+
+def _exporter_threads() -> int:
+    return sum(t.name == "trace-exporter" for t in threading.enumerate())
+
+
+def test_exporter_starts_its_thread_in_the_exporting_process(tmp_path, monkeypatch) -> None:
+    before = _exporter_threads()
+    path = tmp_path / "otlp.jsonl"
+    exporter = OTLPFileExporter(str(path), service_name="test")
+    # Building the app (as the launcher does before forking) starts nothing
+    assert _exporter_threads() == before
+
+    exporter.export(_trace("GET /a"))
+    assert _exporter_threads() == before + 1
+    exporter.close()
+
+    # A forked worker starts its own thread and appends to the same file
+    pid = os.getpid()
+    monkeypatch.setattr(tracing_module.os, "getpid", lambda: pid + 1)
+    exporter.export(_trace("GET /b"))
+    exporter.close()
+
+    lines = path.read_text().splitlines()
+    names = [json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] for line in lines]
+    assert names == ["GET /a", "GET /b"]
+    assert exporter.exported == 2
+
+
+def test_traced_requests_are_exported(make_client, tmp_path) -> None:
+    path = tmp_path / "traces" / "otlp.jsonl"
+    client = make_client(trace_enabled=True, trace_sample_rate=1.0, trace_export_path=str(path))
+    client.post("/games", json={"difficulty": "easy"})
+    client.get("/health")
+    client.app.state.container.traces.close()
+    assert len(path.read_text().splitlines()) == 2
+    assert client.get("/metrics").json()["tracing"]["exported"] == 2
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import random
+import time
+from typing import Dict, Optional, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.domain.ai.ultimate import (
+    PROVEN,
+    WIN_SCORE,
+    UltimateSearchStrategy,
+    _Search,
+    combine,
+    position_of,
+    search_root,
+    to_move,
+)
+from app.domain.board import EXTERNAL_ORDER
+from app.domain.enums import Player
+from app.domain.exceptions import InvalidBoardError, InvalidMoveError
+from app.domain.ultimate import UltimateBoard, decode_move, encode_move
+
+
+def test_search_started_after_its_deadline_returns_no_depth() -> None:
+    position = position_of(UltimateBoard.empty())
+    moves = _Search(position, 0.0).moves()
+    result = search_root(position, 0, moves, time.monotonic() - 0.01, 8)
+    assert result["depths"] == []
+    assert result["nodes"] == 0
+
+
+def test_search_completes_depth_one_with_time_left() -> None:
+    position = position_of(UltimateBoard.empty())
+    moves = _Search(position, 0.0).moves()
+    start = time.monotonic()
+    result = search_root(position, 0, moves, start + 0.05, 64)
+    assert result["depths"][0][0] == 1
+    assert time.monotonic() - start < 0.5
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_select_move_without_time_still_plays_a_legal_move(workers: int) -> None:
+    strategy = UltimateSearchStrategy(budget_s=1.0, workers=workers)
+    try:
+        board = UltimateBoard.empty().with_move(encode_move(5, 5), Player.X)
+        move = strategy.select_move(board, Player.O, budget_s=1e-6)
+        assert move in board.legal_moves
+        assert strategy.snapshot()["fallbacks"] == 1
+    finally:
+        strategy.shutdown()
+
+
+def random_position(rng: random.Random, max_plies: int) -> Tuple[UltimateBoard, Player, Optional[int]]:
+    board, player, last = UltimateBoard.empty(), Player.X, None
+    for _ in range(max_plies):
+        if board.winner() is not None or board.is_full():
+            break
+        last = rng.choice(board.legal_moves)
+        board = board.with_move(last, player)
+        player = player.other
+    return board, player, last
+
+
+def exact_value(board: UltimateBoard, player: Player, memo: Dict[Tuple[str, Optional[int], Player], int]) -> int:
+    """1, 0 or -1 for the side to move under perfect play, by plain minimax."""
+    key = (board.to_string(), board.active, player)
+    if key in memo:
+        return memo[key]
+    best = -1
+    for move in board.legal_moves:
+        child = board.with_move(move, player)
+        if child.winner() is not None:
+            best = 1
+            break
+        value = 0 if child.is_full() else -exact_value(child, player.other, memo)
+        best = max(best, value)
+        if best == 1:
+            break
+    memo[key] = best
+    return best
+
+
+def playable_cells(board: UltimateBoard) -> int:
+    return sum(b.state.count(" ") for b in board.boards if b.winner() is None)
+
+
+def test_move_encoding() -> None:
+    assert encode_move(5, 7) == 57
+    assert decode_move(57) == (5, 7)
+    for bad in ((0, 1), (1, 10)):
+        with pytest.raises(InvalidMoveError):
+            encode_move(*bad)
+    for bad in (7, 50, 100):
+        with pytest.raises(InvalidMoveError):
+            decode_move(bad)
+    for m in range(81):
+        b, c = divmod(m, 9)
+        assert to_move(m) == EXTERNAL_ORDER[b] * 10 + EXTERNAL_ORDER[c]
+
+
+def test_from_string_rebuilds_the_active_board() -> None:
+    rng = random.Random(3)
+    for plies in range(1, 60, 3):
+        board, _, last = random_position(rng, plies)
+        rebuilt = UltimateBoard.from_string(board.to_string(), last)
+        assert rebuilt == board
+        assert rebuilt.legal_moves == board.legal_moves
+    assert UltimateBoard.from_string(" " * 81).active is None
+
+    # Sent to a board that is already won: any open board may be played
+    state = list(" " * 81)
+    state[0:3] = "xxx"  # top row of board 7
+    board = UltimateBoard.from_string("".join(state), 57)
+    assert board.active is None
+    assert 7 not in board.open_boards()
+    with pytest.raises(InvalidBoardError):
+        UltimateBoard.from_string(" " * 80)
+
+
+def test_combine_picks_the_deepest_common_depth() -> None:
+    deeper = {"depths": [(1, 1, 5), (2, 1, 3), (3, 1, 10)], "proven": False}
+    shallower = {"depths": [(1, 2, 4), (2, 2, 7)], "proven": False}
+    assert combine([deeper, shallower]) == (2, 7, 2)
+
+    # A proven loss stopped early but counts as reaching every depth
+    lost = {"depths": [(1, 3, -WIN_SCORE + 2)], "proven": True}
+    assert combine([lost, shallower]) == (2, 7, 2)
+
+    won = {"depths": [(1, 4, WIN_SCORE - 1)], "proven": True}
+    assert combine([deeper, won]) == (4, WIN_SCORE - 1, 1)
+
+
+def test_search_agrees_with_exact_minimax_on_random_endgames() -> None:
+    rng = random.Random(11)
+    checked = 0
+    memo: Dict[Tuple[str, Optional[int], Player], int] = {}
+    while checked < 150:
+        # Play at random until at most 8 cells are left to play in
+        board, player = UltimateBoard.empty(), Player.X
+        while board.winner() is None and not board.is_full() and playable_cells(board) > 8:
+            board = board.with_move(rng.choice(board.legal_moves), player)
+            player = player.other
+        if board.winner() is not None or board.is_full():
+            continue
+        empties = playable_cells(board)
+        position = position_of(board)
+        side = 0 if player is Player.X else 1
+        moves = _Search(position, 0.0).moves()
+        result = search_root(position, side, moves, time.monotonic() + 60, empties)
+        _, move, score = result["depths"][-1]
+        expected = exact_value(board, player, memo)
+        assert (score >= PROVEN) - (score <= -PROVEN) == expected
+        child = board.with_move(to_move(move), player)
+        played = 1 if child.winner() is not None else 0 if child.is_full() else -exact_value(child, player.other, memo)
+        assert played == expected
+        checked += 1
+
+
+def test_move_endpoint_validates_board(client: TestClient) -> None:
+    game = client.post("/games", json={"mode": "ultimate", "difficulty": "easy"}).json()
+    moves_url = f"/games/{game['id']}/moves"
+
+    resp = client.post(moves_url, json={"position": 5})
+    assert (resp.status_code, resp.json()["detail"]) == (400, "board_required")
+    assert client.post(moves_url, json={"position": 5, "board": 0}).status_code == 422
+    assert client.post(moves_url, json={"position": 5, "board": 10}).status_code == 422
+
+    resp = client.post(moves_url, json={"position": 7, "board": 5})
+    assert resp.status_code == 200
+    played = resp.json()
+    assert played["moves"][0] == 57
+    # The reply goes into board 7, and the human is sent on from there
+    ai_board, ai_cell = decode_move(played["ai_move"])
+    assert ai_board == 7
+    assert played["active_board"] == ai_cell
+
+    wrong = next(b for b in range(1, 10) if b != ai_cell)
+    resp = client.post(moves_url, json={"position": 1, "board": wrong})
+    assert resp.status_code == 400
+
+    classic = client.post("/games", json={}).json()
+    resp = client.post(f"/games/{classic['id']}/moves", json={"position": 5, "board": 5})
+    assert (resp.status_code, resp.json()["detail"]) == (400, "board_not_applicable")
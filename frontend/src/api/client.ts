@@ -37,7 +37,8 @@ export async function createGame(payload: CreateGameRequest): Promise<CreateGame
 }
 
 export async function getGame(gameId: string): Promise<CreateGameResponse> {
-  return request<CreateGameResponse>(`/games/${gameId}`);
+  // Revalidate through the HTTP cache: the backend answers If-None-Match with 304
+  return request<CreateGameResponse>(`/games/${gameId}`, { cache: 'no-cache' });
 }
 
 export async function postMove(gameId: string, payload: MoveRequest): Promise<MoveResponse> {